@@ -0,0 +1,935 @@
+"""
+Interfaz Streamlit común a calculo_ratio.py y calculo_ratio_pad.py.
+
+Toda la lógica de cálculo y formateo vive en el paquete 'ratios'; este
+módulo solo construye los widgets y muestra los resultados.
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from ratios import activos, causas, historial, metricas
+from ratios.calculo import (
+    CATEGORIAS_DIRECTAS,
+    CATEGORIAS_NO_DIRECTAS,
+    CATEGORIAS_CAM_CD,
+    CATEGORIAS_AYTO,
+    CATEGORIAS_CD_TODAS,
+    coste_por_persona,
+    parametro,
+    verificar_cam_am,
+)
+from ratios.barrido import barrer_ocupacion
+from ratios.cache_resultados import calculo_cacheado
+from ratios.capacidad import ocupacion_maxima
+from ratios.contratacion import optimizar_contratacion
+from ratios.cuadricula import COLUMNA_CENTRO, COLUMNA_OCUPACION, evaluar_cuadricula, leer_pegado
+from ratios.formato import formatear_numero, formatear_ratio, si_cumple_texto, colorear_linea
+from ratios.informes import informe_cacheado
+from ratios.marcas import resolver_marca, perfil_marca
+from ratios.reglas import normativas
+
+# ----------------------------------------------------------------
+# Inyección de CSS para personalizar el botón "Calcular Ratio"
+# ----------------------------------------------------------------
+custom_css = """
+<style>
+div.stButton > button, div.stFormSubmitButton > button {
+    background-color: #2c3e50;
+    color: white;
+    border-radius: 5px;
+    padding: 0.5em 1em;
+    border: none;
+    box-shadow: 2px 2px 5px rgba(0,0,0,0.1);
+    transition: background-color 0.3s ease;
+}
+div.stButton > button:hover, div.stFormSubmitButton > button:hover {
+    background-color: #34495e;
+}
+</style>
+"""
+
+OPCIONES_CALCULO = [
+    "1. Ratio Residencia Orden 2680/2024",
+    "2. Ratio Residencia AM CAM cálculo ratio",
+    "3. Ratio Centro de Día AM CAM (modo prueba)",
+    "4. Ratio Centro de Día Ayto. de Madrid (modo prueba)",
+    "5. Ratio Centro de Día AM CAM y Ayto. de Madrid (modo prueba)",
+    "6. Varios centros a la vez (cuadrícula)"
+]
+
+# Filas vacías con las que arranca la cuadrícula de varios centros
+FILAS_CUADRICULA = 20
+
+# ----------------------------------------------------------------
+# 1) BRANDING Y LOGO
+# ----------------------------------------------------------------
+def cargar_logo(image_path: str, ancho_max: int = None):
+    """
+    Logo {"data_uri", "ancho", "alto"} leído, reducido y codificado una sola
+    vez por proceso (ratios.activos). Devuelve None si hay problema al leer
+    el archivo.
+    """
+    try:
+        return activos.logo_activo(image_path, ancho_max)
+    except Exception as e:
+        st.error(f"No se pudo cargar el logo desde '{image_path}': {e}")
+        return None
+
+def construir_branding_html(logo_data_uri, logo_max_width: int, logo_alt: str,
+                            url: str = "https://www.mayores.ai") -> str:
+    """
+    HTML del branding (si no hay logo, mostramos solo la URL).
+    """
+    if logo_data_uri:
+        return f"""
+    <div style="text-align: center; padding: 10px; margin-bottom: 10px;">
+      <a href="{url}" target="_blank">
+        <img src="{logo_data_uri}" style="max-width: {logo_max_width}px; height: auto;" alt="{logo_alt}">
+      </a>
+    </div>
+    """
+    return f"""
+    <div style="text-align: center; padding: 10px; margin-bottom: 10px; font-size: 20px; color: blue;">
+      <a href="{url}" target="_blank" style="color: blue; text-decoration: none;">
+        {url.split("://")[-1]}
+      </a>
+    </div>
+    """
+
+# ----------------------------------------------------------------
+# 2) MODOS DE CÁLCULO
+# ----------------------------------------------------------------
+CLAVE_ENTRADA_EN_BLOQUE = "entrada_en_bloque"
+
+# Claves de los widgets que han provocado el rerun en curso (ratios.causas)
+CLAVE_CAUSA = "_causa_rerun"
+CLAVE_SESION_INICIADA = "_sesion_iniciada"
+
+_local = threading.local()
+
+def _anotar_causa(clave: str):
+    st.session_state.setdefault(CLAVE_CAUSA, []).append(clave)
+
+def _atribuir(clave: str, evento: str = "on_change") -> dict:
+    """
+    Argumentos key=clave y, si hay métricas, el callback que anota la clave
+    como causa del rerun. Dentro de un formulario solo el botón de envío
+    admite callbacks: el resto de widgets llevan solo la clave.
+    """
+    if not metricas.ACTIVAS or (evento == "on_change" and getattr(_local, "en_formulario", False)):
+        return {"key": clave}
+    return {"key": clave, evento: _anotar_causa, "args": (clave,)}
+
+def _id_sesion() -> str:
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else ""
+
+def _tomar_causa():
+    claves = st.session_state.pop(CLAVE_CAUSA, None)
+    return tuple(dict.fromkeys(claves)) if claves else None
+
+def _causa_del_rerun():
+    causa = _tomar_causa()
+    if causa:
+        return causa
+    if not st.session_state.get(CLAVE_SESION_INICIADA):
+        st.session_state[CLAVE_SESION_INICIADA] = True
+        return "inicio"
+    return "otro"
+
+def _fragmento(funcion):
+    """
+    st.fragment que, cuando se vuelve a ejecutar solo (por uno de sus
+    widgets), registra la causa y la duración de ese rerun parcial.
+    """
+    @functools.wraps(funcion)
+    def medido(*args, **kwargs):
+        causa = _tomar_causa() if metricas.ACTIVAS else None
+        if causa is None:
+            return funcion(*args, **kwargs)
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            causas.registrar(_id_sesion(), causa, time.perf_counter() - inicio, fragmento=True)
+    return st.fragment(medido)
+
+def _entrada_en_bloque() -> bool:
+    return st.session_state.get(CLAVE_ENTRADA_EN_BLOQUE, True)
+
+@contextmanager
+def _formulario(clave: str):
+    """
+    Contenedor de los datos de un modo: con la entrada en bloque, un
+    st.form (editar un campo no provoca rerun; todo se envía junto al
+    pulsar Calcular); si no, los widgets van sueltos como siempre.
+    """
+    if not _entrada_en_bloque():
+        yield
+        return
+    with st.form(clave, border=False):
+        _local.en_formulario = True
+        try:
+            yield
+        finally:
+            _local.en_formulario = False
+
+def _boton_calcular(etiqueta: str, clave: str) -> bool:
+    if _entrada_en_bloque():
+        return st.form_submit_button(etiqueta, **_atribuir(clave, "on_click"))
+    return st.button(etiqueta, **_atribuir(clave, "on_click"))
+
+def _calcular(modo: str, regimen: str, ocupacion: int, *horas: dict, **opciones):
+    """
+    Cálculo del régimen (desde la caché de resultados), medido y contado
+    en las métricas del modo.
+    """
+    metricas.contar("calculos", modo)
+    with metricas.tramo("calculo", modo):
+        return calculo_cacheado(regimen, ocupacion, *horas, **opciones)
+
+def _datos_historial(modo: str, pedir_centro: bool = True):
+    """
+    Centro (si 'pedir_centro') y semana con los que se guarda el cálculo en
+    el historial, dentro del formulario del modo. Sin historial no se pide
+    nada. Las fechas de los informes van aparte, en su propio panel.
+    :return: (centro, semana)
+    """
+    if not historial.ACTIVO:
+        return "", None
+    centro = ""
+    if pedir_centro:
+        centro = st.text_input(
+            "Centro", placeholder="Nombre del centro (para el historial de cumplimiento)",
+            **_atribuir(f"centro_{modo}")
+        ).strip()
+    return centro, st.date_input("Semana del cálculo", value=date.today(), **_atribuir(f"semana_{modo}"))
+
+def _guardar_historial(regimen: str, ocupacion: int, *horas: dict, centro: str = "", semana: date = None):
+    """
+    Encola el cálculo en el historial de cumplimiento (ratios.historial) en
+    la semana de 'semana' (por defecto, la actual); se evalúa y se escribe
+    en segundo plano, sin retrasar la respuesta.
+    """
+    historial.registrar(
+        regimen, int(ocupacion), {cat: h for grupo in horas for cat, h in grupo.items()},
+        centro=centro, semana=semana
+    )
+
+def _descargar_informe(tipo: str, resultado: dict, fecha_inicio, fecha_fin, logo: dict,
+                       etiqueta: str, file_name: str, clave: str):
+    """
+    Botón de descarga del informe, en HTML o comprimido (.html.gz).
+    El informe no se construye en el rerun: se genera (o se toma de la
+    caché por hash de resultado y fechas) solo al pulsar el botón, y la
+    descarga no provoca ningún rerun.
+    """
+    comprimido = st.checkbox("Descargar comprimido (.html.gz)", **_atribuir(clave))
+
+    def informe():
+        with metricas.tramo("descarga", tipo):
+            contenido = informe_cacheado(tipo, resultado, fecha_inicio, fecha_fin, logo, comprimido)
+        metricas.contar("descargas", tipo)
+        metricas.contar("descarga_bytes", tipo, len(contenido) if comprimido else len(contenido.encode("utf-8")))
+        return contenido
+
+    st.download_button(
+        label=etiqueta,
+        data=informe,
+        file_name=f"{file_name}.gz" if comprimido else file_name,
+        mime="application/gzip" if comprimido else "text/html",
+        on_click="ignore"
+    )
+
+def _plan_contratacion(regimen: str, ocupacion: int, horas: dict, clave: str):
+    """
+    Plan de contratación de mínimo coste que cumple todas las comprobaciones
+    del régimen, con coste anual por EJC editable por categoría.
+    """
+    with st.expander("💶 Plan de contratación de mínimo coste"):
+        st.caption("Coste anual por EJC de cada categoría (por defecto, el coste base por persona).")
+        costes = {}
+        columnas = st.columns(3)
+        for i, cat in enumerate(horas):
+            with columnas[i % 3]:
+                costes[cat] = st.number_input(
+                    cat, min_value=0.0, value=float(coste_por_persona()), step=500.0,
+                    format="%.0f", **_atribuir(f"coste_{clave}_{cat}")
+                )
+        plan = optimizar_contratacion(regimen, ocupacion, horas, costes)
+        if not plan["horas_adicionales"]:
+            st.markdown("El centro ya cumple todas las comprobaciones: no es necesario contratar.")
+            return
+        for cat, h in plan["horas_adicionales"].items():
+            st.markdown(f"- **{cat}**: +{formatear_numero(h)} h/sem")
+        st.markdown(
+            f"**Total:** +{formatear_numero(plan['ejc_adicional'])} EJC | "
+            f"**Coste anual adicional:** {formatear_numero(plan['coste_adicional'])} €"
+        )
+
+def _mostrar_ocupacion_maxima(regimen: str, ocupacion: int, horas: dict):
+    """
+    Ocupación máxima con la que se cumple todo con la plantilla actual.
+    """
+    capacidad = ocupacion_maxima(regimen, horas)
+    maxima = capacidad["ocupacion_maxima"]
+    if maxima == 0:
+        st.markdown("🏷️ Con la plantilla actual no se cumple con ninguna ocupación.")
+        return
+    etiquetas = normativas()[regimen].comprobaciones
+    limitantes = ", ".join(etiquetas[nombre].get("etiqueta", nombre) for nombre in capacidad["limitantes"])
+    texto = f"🏷️ **Ocupación máxima admisible con la plantilla actual:** {maxima}"
+    if maxima > ocupacion:
+        texto += f" (se pueden admitir **{maxima - ocupacion}** más)"
+    if limitantes:
+        texto += f". Por encima deja de cumplirse: {limitantes}."
+    st.markdown(texto)
+
+def _barrido_ocupacion(regimen: str, ocupacion: int, horas: dict, clave: str):
+    """
+    Cumplimiento con la plantilla actual para cada ocupación hasta un máximo,
+    y ocupaciones en las que cambia cada comprobación.
+    """
+    with st.expander("📈 Cumplimiento según la ocupación (con la plantilla actual)"):
+        maximo = st.number_input(
+            "Ocupación máxima a analizar", min_value=1, value=max(2 * ocupacion, 100), step=10,
+            format="%d", **_atribuir(f"barrido_{clave}_max")
+        )
+        barrido = barrer_ocupacion(regimen, horas, maximo)
+        tramos = ", ".join(f"{desde}–{hasta}" if desde != hasta else f"{desde}" for desde, hasta in barrido["tramos"])
+        st.markdown(f"**Ocupaciones con las que se cumple todo:** {tramos or 'ninguna'}")
+        etiquetas = {nombre: regla.get("etiqueta", nombre) for nombre, regla in normativas()[regimen].comprobaciones.items()}
+        filas = sorted(
+            (n, etiquetas[nombre], si_cumple_texto(valor))
+            for nombre, cambios in barrido["cambios"].items() if nombre != "cumple"
+            for n, valor in cambios
+        )
+        if filas:
+            st.table([{"Ocupación": n, "Comprobación": etiqueta, "Pasa a": texto} for n, etiqueta, texto in filas])
+        else:
+            st.markdown("Ninguna comprobación cambia en este rango.")
+
+@_fragmento
+def _resultados_orden2680():
+    """
+    Panel de resultados (Orden 2680). Es un fragmento: sus widgets
+    (costes, barrido) solo vuelven a ejecutar este panel.
+    """
+    r2 = st.session_state["orden2680_resultados"]
+    td2 = r2["total_eq_directa"]
+    rd2 = r2["ratio_directa"]
+    rmin2 = r2["ratio_minima"]
+    cumple_orden = (rd2 >= rmin2)
+    st.subheader("📊 Resultados del Cálculo de Ratio (Orden 2680/2024)")
+    st.markdown(
+        f"🔹 Atención Directa → Total EQ: **{formatear_numero(td2)}** | "
+        f"Ratio: **{formatear_numero(rd2)}** por cada residente"
+    )
+    st.markdown(
+        colorear_linea(f"Atención Directa (mínimo {formatear_numero(rmin2)}): {formatear_numero(rd2)} →", cumple_orden),
+        unsafe_allow_html=True
+    )
+    if r2["deficit"] > 0:
+        explanation = (
+            f"La ratio obtenida es {formatear_numero(rd2)}.<br>"
+            f"La ratio mínima es {formatear_numero(rmin2)}.<br>"
+            f"Habría que contratar {formatear_numero(r2['deficit'])} empleados más.<br>"
+            f"<span style='display: inline-block; font-weight: bold; background-color: yellow; padding: 0.2em;'>"
+            f"El coste anual adicional estimado es {formatear_numero(r2['coste_adicional'])} €."
+            f"</span><br>(Coste base por persona: {formatear_numero(r2['coste_por_persona'])} €/año)."
+        )
+        st.markdown(f"<p style='font-size:18px; color:red;'>{explanation}</p>", unsafe_allow_html=True)
+        _plan_contratacion("orden2680", r2["ocupacion"], r2["horas_directas"], "orden2680")
+    else:
+        st.markdown(
+            "<p style='font-size:18px; color:green;'>"
+            "El centro CUMPLE con la ratio mínima requerida."
+            "</p>", unsafe_allow_html=True
+        )
+    _mostrar_ocupacion_maxima("orden2680", r2["ocupacion"], r2["horas_directas"])
+    _barrido_ocupacion("orden2680", r2["ocupacion"], r2["horas_directas"], "orden2680")
+
+@_fragmento
+def _informe_orden2680(logo):
+    """
+    Panel de descarga del informe (Orden 2680). Marcar la casilla o cambiar
+    las fechas solo vuelve a ejecutar este panel.
+    """
+    r2 = st.session_state["orden2680_resultados"]
+    st.subheader("¿Desea generar y descargar el INFORME semanal en HTML? (Orden 2680/2024)")
+    guardar_orden = st.checkbox(
+        "Marcar para indicar periodo y generar/descargar el HTML (Orden 2680/2024)",
+        **_atribuir("informe_orden2680")
+    )
+    if guardar_orden:
+        col1, col2 = st.columns(2)
+        with col1:
+            fecha_i2 = st.date_input("Fecha inicio (Orden 2680)", value=date.today(), **_atribuir("fecha_inicio_orden2680"))
+        with col2:
+            fecha_f2 = st.date_input("Fecha fin (Orden 2680)", value=date.today(), **_atribuir("fecha_fin_orden2680"))
+        _descargar_informe(
+            "orden2680", r2, fecha_i2, fecha_f2, logo,
+            "Generar y Descargar HTML (Orden 2680/2024)",
+            "informe_orden_2680-2024.html",
+            "gzip_orden2680"
+        )
+
+def _modo_orden2680(logo):
+    st.markdown("### Cálculo de RATIO Orden 2680/2024 - Acreditación de centros")
+    with _formulario("formulario_orden2680"):
+        st.subheader("🏥 Ocupación de la Residencia")
+        ocupacion = st.number_input(
+            "Ingrese el número de residentes (plazas ocupadas o autorizadas)",
+            min_value=0,
+            value=0,
+            step=1,
+            format="%d",
+            **_atribuir("ocupacion_orden2680")
+        )
+        centro, semana = _datos_historial("orden2680")
+        st.write("**Ratio mínima de personal de atención directa**, según la norma:")
+        plazas_umbral = parametro("orden2680", "plazas_umbral")
+        st.markdown(
+            f"- **{formatear_numero(parametro('orden2680', 'ratio_minima_sobre_umbral'))}** "
+            f"si la residencia tiene más de {plazas_umbral} plazas autorizadas."
+        )
+        st.markdown(
+            f"- **{formatear_numero(parametro('orden2680', 'ratio_minima_hasta_umbral'))}** "
+            f"si la residencia tiene {plazas_umbral} o menos plazas autorizadas."
+        )
+        horas_directas_2 = {}
+        st.subheader("🔹 Horas semanales de Atención Directa (Orden 2680/2024)")
+        for cat in CATEGORIAS_DIRECTAS:
+            horas_directas_2[cat] = st.number_input(
+                f"{cat} (horas/semana)",
+                min_value=0.0,
+                format="%.2f",
+                **_atribuir(f"directas_2_{cat}")
+            )
+        calcular = _boton_calcular("📌 Calcular Ratio (Orden 2680/2024)", "calcular_orden2680")
+    if calcular:
+        if ocupacion == 0:
+            st.error("⚠️ Debe introducir el número de residentes (mayor que 0).")
+            st.stop()
+        st.session_state["orden2680_calculated"] = True
+        st.session_state["orden2680_resultados"] = _calcular("orden2680", "orden2680", ocupacion, horas_directas_2)
+        _guardar_historial("orden2680", ocupacion, horas_directas_2, centro=centro, semana=semana)
+    if st.session_state.get("orden2680_calculated"):
+        _resultados_orden2680()
+        st.markdown("---")
+        _informe_orden2680(logo)
+
+@_fragmento
+def _resultados_cam_am():
+    """
+    Panel de resultados (CAM AM), como fragmento independiente.
+    """
+    res = st.session_state["cam_resultados"]
+    td = res["total_eq_directa"]
+    tnd = res["total_eq_no_directa"]
+    rd = res["ratio_directa"]
+    rnd = res["ratio_no_directa"]
+    v = verificar_cam_am(res)
+    st.subheader("📊 Resultados del Cálculo de Ratios (CAM AM)")
+    st.markdown(
+        f"🔹 Atención Directa → Total EQ: **{formatear_numero(td)}** | "
+        f"Ratio: **{formatear_numero(rd)}** por cada 100 residentes"
+    )
+    st.markdown(
+        f"🔹 Atención No Directa → Total EQ: **{formatear_numero(tnd)}** | "
+        f"Ratio: **{formatear_numero(rnd)}** por cada 100 residentes"
+    )
+    st.subheader("✅ Verificación de cumplimiento con la CAM")
+    st.markdown(
+        colorear_linea(f"Atención Directa (mínimo {formatear_numero(v['minimo_directa'])}): {formatear_numero(rd/100)} →", v["cumple_directa"]),
+        unsafe_allow_html=True
+    )
+    st.markdown(
+        colorear_linea(f"Atención No Directa (mínimo {formatear_numero(v['minimo_no_directa'])}): {formatear_numero(rnd/100)} →", v["cumple_nodirecta"]),
+        unsafe_allow_html=True
+    )
+    st.markdown(
+        colorear_linea(f"Gerocultores (mínimo {formatear_numero(v['minimo_gero'])}): {formatear_numero(v['ratio_gero'])} →", v["cumple_gero"]),
+        unsafe_allow_html=True
+    )
+    st.subheader("🩺 Cálculo de horas Fisioterapia y Terapia Ocupacional")
+    st.write(f"**Plazas ocupadas:** {res['ocupacion']} residentes")
+    st.markdown(
+        colorear_linea(
+            f"Fisioterapeuta → Horas requeridas/semana: {formatear_numero(v['horas_req_terapia'])} | "
+            f"Horas introducidas: {formatear_numero(v['h_fisio'])} →",
+            v["cumple_fisio"]
+        ),
+        unsafe_allow_html=True
+    )
+    st.markdown(
+        colorear_linea(
+            f"Terapeuta Ocupacional → Horas requeridas/semana: {formatear_numero(v['horas_req_terapia'])} | "
+            f"Horas introducidas: {formatear_numero(v['h_to'])} →",
+            v["cumple_to"]
+        ),
+        unsafe_allow_html=True
+    )
+    st.subheader("🔎 Verificación de requisitos específicos")
+    st.markdown(
+        f"<p style='color:{'green' if v['cumple_ts'] else 'red'};'>"
+        f"Trabajador Social: {formatear_numero(v['horas_ts'])} h/sem → "
+        f"<span style='font-weight:bold;'>{si_cumple_texto(v['cumple_ts'])}</span> (mínimo > 0)"
+        f"</p>",
+        unsafe_allow_html=True
+    )
+    st.markdown(
+        f"<p style='color:{'green' if v['cumple_med'] else 'red'};'>"
+        f"Médico: {formatear_numero(v['horas_med'])} h/sem → "
+        f"<span style='font-weight:bold;'>{si_cumple_texto(v['cumple_med'])}</span> (mínimo {v['minimo_medico']:g}h/sem)"
+        f"</p>",
+        unsafe_allow_html=True
+    )
+    st.markdown(
+        f"<p style='color:{'green' if v['cumple_enf'] else 'red'};'>"
+        f"Enfermería (ATS/DUE): {formatear_numero(v['horas_enf'])} h/sem → "
+        f"<span style='font-weight:bold;'>{si_cumple_texto(v['cumple_enf'])}</span> (mínimo {v['minimo_enfermeria']:g}h/sem)"
+        f"</p>",
+        unsafe_allow_html=True
+    )
+    st.subheader("ℹ️ Información sobre las ratios")
+    dias = parametro("cam_am", "dias_semana")
+    horas_base = parametro("cam_am", "terapia_horas_dia_base")
+    horas_tramo = parametro("cam_am", "terapia_horas_dia_tramo")
+    st.write(f"- **Atención Directa**: Mínimo {formatear_numero(v['minimo_directa'])} (EJC) por residente.")
+    st.write(f"- **Gerocultores**: Mínimo {formatear_numero(v['minimo_gero'])} (EJC) por residente.")
+    st.write(
+        f"- **Fisioterapia y Terapia Ocupacional**: {horas_base:g}h/día ({horas_base * dias:g}h/sem) "
+        f"para 1-{parametro('cam_am', 'terapia_plazas_base')} plazas; +{horas_tramo:g}h/día "
+        f"({horas_tramo * dias:g}h/sem) por cada {parametro('cam_am', 'terapia_tramo_plazas')} plazas o fracción."
+    )
+    st.write("- **Trabajador Social**: Contratación obligatoria (>0).")
+    st.write(f"- **Médico**: Presencia física mínimo {v['minimo_medico']:g}h/sem (lunes-viernes).")
+    st.write(f"- **Enfermería**: 24h/día, 7d/sem (mínimo {v['minimo_enfermeria']:g}h/sem).")
+    st.write(f"- **Atención No Directa**: Mínimo {formatear_numero(v['minimo_no_directa'])} (EJC) por residente.")
+    st.write("- **Psicólogo/a y Animador**: Opcionales en esta normativa.")
+    horas_cam = {**res["horas_directas"], **res["horas_no_directas"]}
+    _plan_contratacion("cam_am", res["ocupacion"], horas_cam, "cam_am")
+    _mostrar_ocupacion_maxima("cam_am", res["ocupacion"], horas_cam)
+    _barrido_ocupacion("cam_am", res["ocupacion"], horas_cam, "cam_am")
+
+@_fragmento
+def _informe_cam_am(logo):
+    """
+    Panel de descarga del informe (CAM AM), como fragmento independiente.
+    """
+    res = st.session_state["cam_resultados"]
+    st.subheader("¿Desea generar y descargar el INFORME semanal en HTML? (CAM AM)")
+    guardar_cam = st.checkbox(
+        "Marcar para indicar periodo y generar/descargar el HTML (CAM AM)",
+        **_atribuir("informe_cam_am")
+    )
+    if guardar_cam:
+        col1, col2 = st.columns(2)
+        with col1:
+            fecha_inicio = st.date_input("Fecha inicio (CAM AM)", value=date.today(), **_atribuir("fecha_inicio_cam_am"))
+        with col2:
+            fecha_fin = st.date_input("Fecha fin (CAM AM)", value=date.today(), **_atribuir("fecha_fin_cam_am"))
+        _descargar_informe(
+            "cam_am", res, fecha_inicio, fecha_fin, logo,
+            "Generar y Descargar HTML (CAM AM)",
+            "informe_cam_am.html",
+            "gzip_cam_am"
+        )
+
+def _modo_cam_am(logo):
+    st.markdown("### Cálculo de RATIO CAM AM - Atención Residencial")
+    with _formulario("formulario_cam_am"):
+        st.subheader("🏥 Ocupación de la Residencia")
+        ocupacion = st.number_input(
+            "Ingrese el número de residentes (plazas ocupadas o autorizadas)",
+            min_value=0,
+            value=0,
+            step=1,
+            format="%d",
+            **_atribuir("ocupacion_cam_am")
+        )
+        centro, semana = _datos_historial("cam_am")
+        st.subheader("🔹 Horas semanales de Atención Directa")
+        horas_directas = {}
+        for cat in CATEGORIAS_DIRECTAS:
+            horas_directas[cat] = st.number_input(
+                f"{cat} (horas/semana)",
+                min_value=0.0,
+                format="%.2f",
+                **_atribuir(f"directas_{cat}")
+            )
+        st.subheader("🔹 Horas semanales de Atención No Directa")
+        horas_no_directas = {}
+        for cat in CATEGORIAS_NO_DIRECTAS:
+            horas_no_directas[cat] = st.number_input(
+                f"{cat} (horas/semana)",
+                min_value=0.0,
+                format="%.2f",
+                **_atribuir(f"nodirectas_{cat}")
+            )
+        calcular = _boton_calcular("📌 Calcular Ratio (CAM AM)", "calcular_cam_am")
+    if calcular:
+        if ocupacion == 0:
+            st.error("⚠️ Debe introducir el número de residentes (mayor que 0).")
+            st.stop()
+        st.session_state["cam_calculated"] = True
+        st.session_state["cam_resultados"] = _calcular("cam_am", "cam_am", ocupacion, horas_directas, horas_no_directas)
+        _guardar_historial("cam_am", ocupacion, horas_directas, horas_no_directas, centro=centro, semana=semana)
+    if st.session_state.get("cam_calculated"):
+        _resultados_cam_am()
+        st.markdown("---")
+        _informe_cam_am(logo)
+
+def _mostrar_resultados_cam_cd(ratio_directa, cumple_ratio, horas_gero, horas_min_gero, cumple_gero,
+                               normativa="cam_cd"):
+    minimo_directa = parametro(normativa, "ratio_min_directa")
+    st.markdown(
+        colorear_linea(
+            f"🔹 **Ratio de Atención Directa**: {formatear_ratio(ratio_directa)} (mínimo {formatear_ratio(minimo_directa)}) →",
+            cumple_ratio
+        ),
+        unsafe_allow_html=True
+    )
+    st.markdown(
+        colorear_linea(
+            f"🔹 **Horas de Gerocultores**: {formatear_numero(horas_gero)} h/sem (mínimo: {formatear_numero(horas_min_gero)}) →",
+            cumple_gero
+        ),
+        unsafe_allow_html=True
+    )
+
+def _mostrar_resultados_ayuntamiento(resultados_ayto: dict):
+    for cat, data_cat in resultados_ayto.items():
+        line_html = colorear_linea(
+            f"🔹 **{cat}**: {formatear_numero(data_cat['aportado'])} h/sem (mínimo: {formatear_numero(data_cat['requerido'])}) →",
+            data_cat["cumple"]
+        )
+        st.markdown(line_html, unsafe_allow_html=True)
+
+def _modo_cam_cd(logo):
+    st.markdown("### Ratio Centro de Día - Normativa CAM (modo prueba)")
+    with _formulario("formulario_cam_cd"):
+        usuarios_cam = st.number_input(
+            "Nº de usuarios (plazas ocupadas CAM)",
+            min_value=0, value=0, step=1, format="%d",
+            **_atribuir("usuarios_cam_cd")
+        )
+        centro, semana = _datos_historial("cam_cd")
+        st.markdown("### Horas semanales de **Atención Directa** (CAM)")
+        horas_cam = {}
+        for cat in CATEGORIAS_CAM_CD:
+            horas_cam[cat] = st.number_input(
+                f"{cat} (h/semana)",
+                min_value=0.0,
+                format="%.2f",
+                **_atribuir(f"cd_cam_{cat}")
+            )
+        calcular = _boton_calcular("📌 Calcular Ratio (CAM)", "calcular_cam_cd")
+    if calcular:
+        if usuarios_cam == 0:
+            st.error("⚠️ Debe introducir un número de usuarios (CAM) mayor que 0.")
+            st.stop()
+        st.subheader("📊 Resultados CAM (Centro de Día)")
+        _mostrar_resultados_cam_cd(*_calcular("cam_cd", "cam_cd", usuarios_cam, horas_cam))
+        _guardar_historial("cam_cd", usuarios_cam, horas_cam, centro=centro, semana=semana)
+
+def _modo_ayuntamiento(logo):
+    st.markdown("### Ratio Centro de Día - Normativa Ayuntamiento de Madrid (modo prueba)")
+    with _formulario("formulario_ayuntamiento"):
+        usuarios_ayto = st.number_input(
+            "Nº de usuarios (plazas ocupadas Ayuntamiento)",
+            min_value=0, value=0, step=1, format="%d",
+            **_atribuir("usuarios_ayto")
+        )
+        centro, semana = _datos_historial("ayuntamiento")
+        horas_ayto = {}
+        st.markdown("### Horas semanales según categorías (Ayuntamiento)")
+        for cat in CATEGORIAS_AYTO:
+            horas_ayto[cat] = st.number_input(
+                f"{cat} (h/semana)",
+                min_value=0.0,
+                format="%.2f",
+                **_atribuir(f"cd_ayto_{cat}")
+            )
+        calcular = _boton_calcular("📌 Calcular Ratio (Ayuntamiento)", "calcular_ayuntamiento")
+    if calcular:
+        if usuarios_ayto == 0:
+            st.error("⚠️ Debe introducir un número de usuarios (Ayuntamiento) mayor que 0.")
+            st.stop()
+        st.subheader("📊 Resultados Ayuntamiento (Centro de Día)")
+        _mostrar_resultados_ayuntamiento(_calcular("ayuntamiento", "ayuntamiento", usuarios_ayto, horas_ayto))
+        _guardar_historial("ayuntamiento", usuarios_ayto, horas_ayto, centro=centro, semana=semana)
+
+def _modo_cam_ayto(logo):
+    st.markdown("### Ratio Centro de Día - Normativa CAM y Ayuntamiento de Madrid (modo prueba)")
+    with _formulario("formulario_cam_ayto"):
+        usuarios_totales = st.number_input(
+            "Nº de usuarios (plazas ocupadas totales)",
+            min_value=0, value=0, step=1, format="%d",
+            **_atribuir("usuarios_cam_ayto")
+        )
+        centro, semana = _datos_historial("cam_ayto")
+        st.markdown("""
+        **Nota**: Con esta opción se aplica el mismo número de usuarios
+        para la normativa CAM y la del Ayuntamiento.
+        **Además**, para la CAM se suman las horas de "Gerocultor (aux. ruta)" a las de "Gerocultor".
+        """)
+        horas_centro = {}
+        st.markdown("### Horas semanales - Personal total del Centro")
+        for cat in CATEGORIAS_CD_TODAS:
+            horas_centro[cat] = st.number_input(
+                f"{cat} (h/semana)",
+                min_value=0.0,
+                format="%.2f",
+                **_atribuir(f"cd_ambos_{cat}")
+            )
+        calcular = _boton_calcular("📌 Calcular Ratio (CAM + Ayuntamiento)", "calcular_cam_ayto")
+    if calcular:
+        if usuarios_totales == 0:
+            st.error("⚠️ Debe introducir un número de usuarios mayor que 0.")
+            st.stop()
+        st.subheader("📊 Resultados CAM")
+        _mostrar_resultados_cam_cd(
+            *_calcular("cam_ayto", "cam_cd", usuarios_totales, horas_centro, sumar_ruta=True), normativa="cam_ayto"
+        )
+        st.subheader("📊 Resultados Ayuntamiento")
+        _mostrar_resultados_ayuntamiento(
+            _calcular("cam_ayto", "ayuntamiento", usuarios_totales, horas_centro, normativa="cam_ayto")
+        )
+        _guardar_historial("cam_ayto", usuarios_totales, horas_centro, centro=centro, semana=semana)
+
+def _cuadricula_vacia(categorias, filas: list = None) -> pd.DataFrame:
+    if filas is None:
+        filas = [
+            {COLUMNA_CENTRO: f"Centro {i}", COLUMNA_OCUPACION: 0, **{cat: 0.0 for cat in categorias}}
+            for i in range(1, FILAS_CUADRICULA + 1)
+        ]
+    return pd.DataFrame(filas, columns=[COLUMNA_CENTRO, COLUMNA_OCUPACION, *categorias])
+
+def _mostrar_resultados_cuadricula(datos: pd.DataFrame, categorias, resultado: dict):
+    n = len(datos)
+    st.markdown(f"**{int(resultado['cumple'].sum())} de {n} centros cumplen.**")
+    if not resultado["valida"].all():
+        st.warning(f"⚠️ {int((~resultado['valida']).sum())} fila(s) sin ocupación (mayor que 0): no se evalúan.")
+    tabla = datos.copy()
+    for etiqueta, cumple in resultado["filas"].items():
+        tabla[etiqueta] = ["✅" if c else "❌" for c in cumple]
+    tabla["Cumple"] = [si_cumple_texto(c) for c in resultado["cumple"]]
+
+    def colores(_):
+        estilos = pd.DataFrame("", index=tabla.index, columns=tabla.columns)
+        for cat, cumple in resultado["celdas"].items():
+            estilos[cat] = ["background-color: #d4edda" if c else "background-color: #f8d7da" for c in cumple]
+        estilos["Cumple"] = ["color: green" if c else "color: red" for c in resultado["cumple"]]
+        return estilos
+
+    st.dataframe(
+        tabla.style.apply(colores, axis=None).format({cat: formatear_numero for cat in categorias}),
+        hide_index=True
+    )
+
+def _modo_cuadricula(logo):
+    """
+    Varios centros a la vez: una fila por centro y una columna por categoría
+    (se puede pegar directamente desde Excel). Todas las filas se evalúan en
+    una sola pasada vectorizada y se marca en verde/rojo cada celda con una
+    comprobación propia (enfermería, médico, mínimos del Ayuntamiento...).
+    """
+    st.markdown("### Varios centros a la vez (cuadrícula)")
+    planes = normativas()
+    regimen = st.selectbox(
+        "Normativa", list(planes), format_func=lambda r: planes[r].titulo, **_atribuir("cuadricula_regimen")
+    )
+    categorias = planes[regimen].categorias
+    clave = f"cuadricula_{regimen}"
+    if clave not in st.session_state:
+        st.session_state[clave] = {"datos": _cuadricula_vacia(categorias), "version": 0}
+    estado = st.session_state[clave]
+
+    with st.expander("📋 Pegar tabla desde Excel"):
+        st.caption(
+            "Columnas: Centro, Ocupación y las horas semanales de cada categoría "
+            "(con cabecera, en cualquier orden; sin cabecera, en el orden de la cuadrícula). "
+            "También se puede pegar directamente sobre la cuadrícula."
+        )
+        texto = st.text_area("Tabla copiada", **_atribuir(f"{clave}_pegado"))
+        if st.button("Cargar en la cuadrícula", **_atribuir(f"{clave}_cargar", "on_click")):
+            try:
+                pegado = leer_pegado(texto, categorias)
+            except ValueError as e:
+                st.error(f"⚠️ {e}")
+            else:
+                estado["datos"] = _cuadricula_vacia(categorias, pegado["filas"])
+                estado["version"] += 1
+                if pegado["ignoradas"]:
+                    st.warning(f"Columnas ignoradas (no son de esta normativa): {', '.join(pegado['ignoradas'])}")
+
+    with _formulario(f"formulario_{clave}"):
+        _, semana = _datos_historial("cuadricula", pedir_centro=False)
+        datos = st.data_editor(
+            estado["datos"],
+            num_rows="dynamic",
+            hide_index=True,
+            **_atribuir(f"{clave}_editor_{estado['version']}"),
+            column_config={
+                COLUMNA_OCUPACION: st.column_config.NumberColumn(min_value=0, step=1, format="%d"),
+                **{cat: st.column_config.NumberColumn(min_value=0.0, format="%.2f") for cat in categorias},
+            }
+        )
+        calcular = _boton_calcular("📌 Evaluar todos los centros", "calcular_cuadricula")
+    if calcular:
+        datos = datos.fillna({COLUMNA_CENTRO: "", COLUMNA_OCUPACION: 0, **{cat: 0.0 for cat in categorias}})
+        if datos.empty:
+            st.error("⚠️ La cuadrícula no tiene ningún centro.")
+            st.stop()
+        metricas.contar("calculos", "cuadricula")
+        with metricas.tramo("calculo", "cuadricula"):
+            resultado = evaluar_cuadricula(
+                regimen,
+                datos[COLUMNA_OCUPACION].to_numpy(dtype="int64"),
+                datos[list(categorias)].to_numpy(dtype="float64")
+            )
+        st.subheader("📊 Resultados por centro")
+        _mostrar_resultados_cuadricula(datos, categorias, resultado)
+        for fila in datos.to_dict("records"):
+            if fila[COLUMNA_OCUPACION] > 0:
+                _guardar_historial(regimen, fila[COLUMNA_OCUPACION], {cat: float(fila[cat]) for cat in categorias},
+                                   centro=str(fila[COLUMNA_CENTRO]).strip(), semana=semana)
+
+def _modo_normativa(plan):
+    """
+    Modo genérico para cualquier normativa declarada en ratios/normativas
+    que no tenga una pantalla propia: pide la ocupación y las horas de sus
+    categorías y muestra una línea por comprobación.
+    """
+    def modo(logo):
+        st.markdown(f"### {plan.titulo}")
+        with _formulario(f"formulario_{plan.id}"):
+            ocupacion = st.number_input(
+                "Nº de usuarios / residentes (plazas ocupadas)",
+                min_value=0, value=0, step=1, format="%d",
+                **_atribuir(f"normativa_{plan.id}_ocupacion")
+            )
+            centro, semana = _datos_historial(f"normativa_{plan.id}")
+            horas = {}
+            st.markdown("### Horas semanales por categoría")
+            for cat in plan.categorias:
+                horas[cat] = st.number_input(
+                    f"{cat} (h/semana)",
+                    min_value=0.0,
+                    format="%.2f",
+                    **_atribuir(f"normativa_{plan.id}_{cat}")
+                )
+            calcular = _boton_calcular(f"📌 Calcular Ratio ({plan.titulo})", f"calcular_{plan.id}")
+        if calcular:
+            if ocupacion == 0:
+                st.error("⚠️ Debe introducir un número de usuarios mayor que 0.")
+                st.stop()
+            resultado = plan.evaluar(ocupacion, horas)
+            _guardar_historial(plan.id, ocupacion, horas, centro=centro, semana=semana)
+            st.subheader("📊 Resultados")
+            for nombre, regla in plan.comprobaciones.items():
+                valor = regla.get("valor")
+                minimo = regla.get("minimo")
+                valor = resultado.get(valor, horas.get(valor))
+                minimo = resultado.get(minimo, plan.parametros.get(minimo, minimo))
+                st.markdown(
+                    colorear_linea(
+                        f"🔹 **{regla.get('etiqueta', nombre)}**: {formatear_numero(valor)} "
+                        f"(mínimo: {formatear_numero(minimo)}) →",
+                        resultado[nombre]
+                    ),
+                    unsafe_allow_html=True
+                )
+    return modo
+
+_REGIMENES_CON_PANTALLA = ("orden2680", "cam_am", "cam_cd", "ayuntamiento", "cam_ayto")
+
+MODOS = dict(zip(OPCIONES_CALCULO, [
+    _modo_orden2680,
+    _modo_cam_am,
+    _modo_cam_cd,
+    _modo_ayuntamiento,
+    _modo_cam_ayto,
+    _modo_cuadricula,
+]))
+
+# Identificador de cada modo en las métricas
+ID_MODOS = dict(zip(OPCIONES_CALCULO, _REGIMENES_CON_PANTALLA + ("cuadricula",)))
+
+# Las normativas sin pantalla propia se añaden al selector con el modo genérico
+for _plan in normativas().values():
+    if _plan.id not in _REGIMENES_CON_PANTALLA:
+        _opcion = f"{len(MODOS) + 1}. {_plan.titulo}"
+        MODOS[_opcion] = _modo_normativa(_plan)
+        ID_MODOS[_opcion] = _plan.id
+
+# ----------------------------------------------------------------
+# 3) APLICACIÓN
+# ----------------------------------------------------------------
+def marca_de_la_sesion() -> str:
+    """
+    Marca de la sesión actual según ?marca=, la cabecera Host o RATIOS_MARCA.
+    """
+    return resolver_marca(st.query_params.to_dict(), st.context.headers.get("Host"))
+
+def ejecutar_app(marca: str = None):
+    """
+    Construye la interfaz completa. Se llama en cada rerun de Streamlit
+    desde los scripts de entrada (calculo_ratio.py / calculo_ratio_pad.py).
+    Cada rerun se mide por fases en ratios.metricas y se atribuye al widget
+    que lo provocó en ratios.causas.
+    :param marca: fuerza una marca; si es None se resuelve por sesión.
+    """
+    if not metricas.ACTIVAS:
+        _construir_app(marca)
+        return
+    causa = _causa_del_rerun()
+    inicio = time.perf_counter()
+    try:
+        with metricas.tramo("rerun"):
+            _construir_app(marca)
+    finally:
+        causas.registrar(_id_sesion(), causa, time.perf_counter() - inicio)
+        metricas.exportar()
+
+def _construir_app(marca: str = None):
+    perfil = perfil_marca(marca or marca_de_la_sesion())
+    st.markdown(custom_css, unsafe_allow_html=True)
+    # El logo se sirve al doble del ancho mostrado para pantallas de alta densidad
+    with metricas.tramo("activos"):
+        activo = cargar_logo(perfil["logo"], 2 * perfil["logo_max_width"]) or {}
+    branding_html = construir_branding_html(
+        activo.get("data_uri"), perfil["logo_max_width"], perfil["logo_alt"], perfil["url"]
+    )
+    # Mismo data URI para la cabecera y los informes
+    logo = {**activo, "max_width": perfil["logo_max_width"], "alt": perfil["logo_alt"], "url": perfil["url"]}
+
+    st.markdown(branding_html, unsafe_allow_html=True)
+    st.markdown("<h2 style='text-align: center;'>📊 Cálculo de ratios Residencias y Centro de Día CAM</h2>", unsafe_allow_html=True)
+
+    opcion_calculo = st.selectbox(
+        "Seleccione el tipo de Ratio que desea calcular:",
+        list(MODOS),
+        **_atribuir("modo_calculo")
+    )
+    st.toggle(
+        "📝 Introducir todos los datos y calcular de una vez",
+        value=True,
+        **_atribuir(CLAVE_ENTRADA_EN_BLOQUE),
+        help="Los campos se envían juntos al pulsar Calcular, sin recargar la página en cada cambio."
+    )
+    modo = ID_MODOS[opcion_calculo]
+    metricas.contar("reruns", modo)
+    with metricas.tramo("modo", modo):
+        MODOS[opcion_calculo](logo)
+
+    st.markdown(branding_html, unsafe_allow_html=True)
@@ -0,0 +1,57 @@
+"""
+Núcleo de cálculo de ratios de personal (residencias y centros de día).
+
+No importa Streamlit ni NumPy al cargarse: el motor por lotes (ratios.lotes)
+se importa bajo demanda para que los procesos de corta vida arranquen rápido.
+"""
+from ratios.calculo import (
+    CATEGORIAS,
+    CATEGORIAS_DIRECTAS,
+    CATEGORIAS_NO_DIRECTAS,
+    CATEGORIAS_CAM_CD,
+    CATEGORIAS_AYTO,
+    CATEGORIAS_CD_TODAS,
+    calcular_equivalentes_jornada_completa,
+    calcular_horas_fisio_to_residencia,
+    calcular_orden2680,
+    calcular_cam_am,
+    verificar_cam_am,
+    calcular_horas_gerocultores_cam,
+    calcular_ratio_cam_cd,
+    calcular_minimos_ayuntamiento,
+    comprobar_cumplimiento_ayuntamiento,
+)
+from ratios.formato import formatear_numero, formatear_ratio, si_cumple_texto, colorear_linea
+
+_PEREZOSOS = {
+    "evaluar_lote": "ratios.lotes",
+    "MatrizHoras": "ratios.lotes",
+}
+
+def __getattr__(nombre):
+    if nombre in _PEREZOSOS:
+        import importlib
+        return getattr(importlib.import_module(_PEREZOSOS[nombre]), nombre)
+    raise AttributeError(f"module 'ratios' has no attribute '{nombre}'")
+
+__all__ = [
+    "CATEGORIAS",
+    "CATEGORIAS_DIRECTAS",
+    "CATEGORIAS_NO_DIRECTAS",
+    "CATEGORIAS_CAM_CD",
+    "CATEGORIAS_AYTO",
+    "CATEGORIAS_CD_TODAS",
+    "calcular_equivalentes_jornada_completa",
+    "calcular_horas_fisio_to_residencia",
+    "calcular_orden2680",
+    "calcular_cam_am",
+    "verificar_cam_am",
+    "calcular_horas_gerocultores_cam",
+    "calcular_ratio_cam_cd",
+    "calcular_minimos_ayuntamiento",
+    "comprobar_cumplimiento_ayuntamiento",
+    "formatear_numero",
+    "formatear_ratio",
+    "si_cumple_texto",
+    "colorear_linea",
+]
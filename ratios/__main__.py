@@ -0,0 +1,5 @@
+import sys
+
+from ratios.cli import main
+
+sys.exit(main())
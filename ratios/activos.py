@@ -0,0 +1,148 @@
+"""
+Activos de imagen (logos) cargados, adaptados y codificados una sola vez
+por proceso.
+
+logo_activo() devuelve el data URI de un logo (y sus dimensiones),
+opcionalmente reducido a un ancho máximo y re-codificado (PNG optimizado
+o WebP) si Pillow está disponible. El resultado se guarda en una caché de proceso compartida por
+todas las sesiones y marcas, y se reutiliza tanto en la cabecera de la
+aplicación como en los informes HTML.
+
+estadisticas() expone contadores acumulados (bytes leídos, tiempo de
+codificación, aciertos/fallos de caché); tras el primer uso de cada logo,
+los bytes leídos y el tiempo de codificación dejan de crecer.
+"""
+import base64
+import io
+import logging
+import os
+import struct
+import threading
+import time
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow es opcional: sin él se sirve la imagen original
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# "png" (reducido y optimizado), "webp" o "original" (bytes tal cual)
+FORMATOS = ("png", "webp", "original")
+
+_MIME = {"png": "image/png", "webp": "image/webp"}
+
+def _validar_formato(formato: str) -> str:
+    """
+    'formato' en minúsculas si es uno de FORMATOS; si no, "original"
+    (con un aviso en el log).
+    """
+    normalizado = formato.strip().lower()
+    if normalizado in FORMATOS:
+        return normalizado
+    logger.warning(
+        "Formato de logo '%s' no soportado (opciones: %s); se sirve la imagen original",
+        formato, ", ".join(FORMATOS)
+    )
+    return "original"
+
+FORMATO_POR_DEFECTO = _validar_formato(os.environ.get("RATIOS_LOGO_FORMATO", "png"))
+
+_cache = {}
+_lock = threading.Lock()
+_estadisticas = {
+    "aciertos": 0,
+    "fallos": 0,
+    "bytes_leidos": 0,
+    "segundos_codificacion": 0.0,
+}
+
+def _dimensiones_png(contenido: bytes):
+    """
+    (ancho, alto) leídos de la cabecera IHDR de un PNG, o None.
+    """
+    if contenido[:8] != b"\x89PNG\r\n\x1a\n" or len(contenido) < 24:
+        return None
+    return struct.unpack(">II", contenido[16:24])
+
+def _adaptar(contenido: bytes, ancho_max: int, formato: str):
+    """
+    Reduce la imagen a 'ancho_max' píxeles de ancho (si es mayor) y la
+    re-codifica. Devuelve (bytes, formato, dimensiones).
+    """
+    if formato == "original" or Image is None:
+        return contenido, "png", _dimensiones_png(contenido)
+    imagen = Image.open(io.BytesIO(contenido))
+    if ancho_max and imagen.width > ancho_max:
+        alto = round(imagen.height * ancho_max / imagen.width)
+        imagen = imagen.resize((ancho_max, alto), Image.LANCZOS)
+    salida = io.BytesIO()
+    if formato == "webp":
+        imagen.save(salida, format="WEBP", lossless=True, method=6)
+    else:
+        imagen.save(salida, format="PNG", optimize=True)
+    adaptado = salida.getvalue()
+    # Si re-codificar no reduce el tamaño, se conserva el original
+    if formato == "png" and len(adaptado) >= len(contenido):
+        return contenido, "png", _dimensiones_png(contenido)
+    return adaptado, formato, imagen.size
+
+def logo_activo(ruta: str, ancho_max: int = None, formato: str = None) -> dict:
+    """
+    {"data_uri", "ancho", "alto"} del logo en 'ruta', reducido a 'ancho_max'
+    píxeles de ancho (None = sin reducir). Ancho y alto son None si no se
+    pueden determinar. Un formato no soportado se sirve como "original".
+    Lanza OSError si el archivo no se puede leer.
+    """
+    formato = _validar_formato(formato) if formato else FORMATO_POR_DEFECTO
+    clave = (ruta, ancho_max, formato)
+    activo = _cache.get(clave)
+    if activo is not None:
+        _estadisticas["aciertos"] += 1
+        return activo
+    with _lock:
+        activo = _cache.get(clave)
+        if activo is not None:
+            _estadisticas["aciertos"] += 1
+            return activo
+        with open(ruta, "rb") as f:
+            contenido = f.read()
+        inicio = time.perf_counter()
+        adaptado, formato_final, dimensiones = _adaptar(contenido, ancho_max, formato)
+        ancho, alto = dimensiones or (None, None)
+        activo = {
+            "data_uri": f"data:{_MIME[formato_final]};base64,{base64.b64encode(adaptado).decode()}",
+            "ancho": ancho,
+            "alto": alto,
+        }
+        segundos = time.perf_counter() - inicio
+        _estadisticas["fallos"] += 1
+        _estadisticas["bytes_leidos"] += len(contenido)
+        _estadisticas["segundos_codificacion"] += segundos
+        logger.info(
+            "Logo '%s' cargado: %d bytes leídos, %d bytes servidos, %.1f ms",
+            ruta, len(contenido), len(adaptado), segundos * 1000
+        )
+        _cache[clave] = activo
+        return activo
+
+def logo_data_uri(ruta: str, ancho_max: int = None, formato: str = None) -> str:
+    """
+    Data URI del logo (ver logo_activo).
+    """
+    return logo_activo(ruta, ancho_max, formato)["data_uri"]
+
+def estadisticas() -> dict:
+    """
+    Copia de los contadores acumulados del proceso, más el número de
+    entradas y bytes en caché.
+    """
+    datos = dict(_estadisticas)
+    datos["entradas"] = len(_cache)
+    datos["bytes_en_cache"] = sum(len(v["data_uri"]) for v in _cache.values())
+    return datos
+
+def limpiar_cache():
+    """Vacía la caché (p. ej. tras sustituir un logo en disco)."""
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,381 @@
+"""
+API HTTP/JSON para integraciones (RR. HH., ERP): "¿cumple el centro X esta
+semana?" sin pasar por la interfaz de Streamlit.
+
+Servidor asíncrono (asyncio, sin dependencias externas) con HTTP/1.1
+keep-alive. Las evaluaciones usan las mismas funciones que el modo por
+lotes (ratios.cli.evaluar_fila), así que el resultado de cada centro es
+la misma fila plana: centro, semana, regimen, ocupacion, cumple, los
+campos del régimen y 'error' si los datos no son válidos.
+
+Rutas:
+  GET  /regimenes           regímenes con sus categorías y campos de salida
+  GET  /salud               {"estado": "ok"}
+  POST /evaluar/<regimen>   un centro: {"ocupacion": 60, "horas": {"Gerocultor": 400, ...},
+                            "centro": "...", "semana": "..."}; 422 si los datos no son válidos
+  POST /lote                muchos centros (cada uno con su 'regimen', o ?regimen=...):
+                            un array JSON o JSONL (Content-Type: application/x-ndjson).
+                            La respuesta se envía en flujo (chunked) según se evalúa,
+                            como array JSON o, con ?formato=jsonl, una línea por centro.
+                            ?extras=contratacion,capacidad añade las columnas de
+                            --contratacion / --ocupacion-maxima del modo por lotes.
+
+Regímenes: orden2680, cam_am, cam_cd, ayuntamiento y cam_ayto (CAM +
+Ayuntamiento, como el modo 5 de la interfaz).
+
+Los cuerpos JSONL se evalúan según llegan (memoria constante); los arrays
+JSON se leen enteros, hasta RATIOS_API_MAX_CUERPO bytes. Los lotes se
+evalúan por trozos fuera del bucle de eventos (en hilos o, con --procesos,
+en un pool de procesos), de modo que un lote grande no bloquea al resto de
+conexiones. Un error en una fila no detiene el lote: va en su columna
+'error'. Un fallo inesperado al atender una petición se registra en el log
+y se responde con 500 (o 400 si lo provocan los datos de entrada).
+
+Uso:
+  python -m ratios.api --puerto 8080
+  curl -s localhost:8080/evaluar/orden2680 -d '{"ocupacion": 60, "horas": {"Gerocultor": 900}}'
+  curl -s localhost:8080/lote?formato=jsonl -H 'Content-Type: application/x-ndjson' \\
+      --data-binary @centros.jsonl
+"""
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from ratios.cli import CAMPOS_EXTRA, evaluar_fila
+from ratios.evaluacion import CAMPOS_REGIMEN, REGIMENES
+from ratios.reglas import normativas
+
+logger = logging.getLogger(__name__)
+
+MAX_CUERPO = int(os.environ.get("RATIOS_API_MAX_CUERPO", str(32 * 2**20)))
+
+# Segundos que una conexión keep-alive puede esperar a la siguiente petición
+TIEMPO_INACTIVO = float(os.environ.get("RATIOS_API_KEEPALIVE", "15"))
+
+# Centros evaluados por trozo del lote (y por trozo de la respuesta)
+TAM_TROZO = 500
+
+# Tamaño máximo de la línea de petición más las cabeceras
+MAX_CABECERA = 64 * 1024
+
+class ErrorHTTP(Exception):
+    def __init__(self, estado: HTTPStatus, mensaje: str = None):
+        super().__init__(mensaje or estado.phrase)
+        self.estado = estado
+
+# ----------------------------------------------------------------
+# EVALUACIÓN
+# ----------------------------------------------------------------
+def _evaluar_una(fila: dict, regimen_defecto: str = None, extras: tuple = ()) -> dict:
+    """
+    evaluar_fila() de una fila del lote; un fallo inesperado también queda
+    como error de esa fila (y en el log) en lugar de cortar el lote.
+    """
+    if "error" in fila and len(fila) == 1:
+        return fila
+    try:
+        return evaluar_fila(fila, regimen_defecto, extras)
+    except Exception as e:
+        logger.exception("Error inesperado evaluando una fila del lote")
+        return {"error": f"Error interno al evaluar la fila ({type(e).__name__})"}
+
+def evaluar_trozo(filas: list, regimen_defecto: str = None, extras: tuple = ()) -> list:
+    """
+    Evalúa un trozo de filas crudas (dicts, o el error de una línea JSONL
+    que no se pudo leer) y devuelve un resultado por fila, en orden.
+    """
+    return [_evaluar_una(fila, regimen_defecto, extras) for fila in filas]
+
+def descripcion_regimenes() -> dict:
+    """
+    {regimen: {"titulo", "categorias", "campos"}} para GET /regimenes.
+    """
+    return {
+        regimen: {"titulo": plan.titulo, "categorias": list(plan.categorias), "campos": list(CAMPOS_REGIMEN[regimen])}
+        for regimen, plan in normativas().items()
+    }
+
+# ----------------------------------------------------------------
+# HTTP
+# ----------------------------------------------------------------
+async def _leer_peticion(reader: asyncio.StreamReader):
+    """
+    Lee la línea de petición y las cabeceras.
+    :return: (método, ruta, consulta, versión, cabeceras) o None si el cliente cerró.
+    """
+    try:
+        cabecera = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), TIEMPO_INACTIVO)
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST)
+        return None
+    except asyncio.LimitOverrunError:
+        raise ErrorHTTP(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+    except asyncio.TimeoutError:
+        return None
+    lineas = cabecera.decode("latin-1").split("\r\n")
+    try:
+        metodo, destino, version = lineas[0].split(" ")
+    except ValueError:
+        raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "Línea de petición no válida")
+    cabeceras = {}
+    for linea in lineas[1:]:
+        if linea:
+            nombre, _, valor = linea.partition(":")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+    partes = urlsplit(destino)
+    return metodo.upper(), partes.path.rstrip("/") or "/", parse_qs(partes.query), version, cabeceras
+
+async def _cuerpo(reader: asyncio.StreamReader, cabeceras: dict):
+    """
+    Genera el cuerpo de la petición por bloques (Content-Length o chunked).
+    """
+    if "chunked" in cabeceras.get("transfer-encoding", "").lower():
+        while True:
+            linea = await reader.readline()
+            try:
+                tam = int(linea.split(b";")[0].strip(), 16)
+            except ValueError:
+                raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "Trozo chunked no válido")
+            if tam == 0:
+                while (await reader.readline()).strip():  # trailers
+                    pass
+                return
+            yield await reader.readexactly(tam)
+            await reader.readexactly(2)
+    else:
+        try:
+            pendiente = int(cabeceras.get("content-length", "0"))
+        except ValueError:
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "Content-Length no válido")
+        while pendiente > 0:
+            bloque = await reader.read(min(pendiente, 2**16))
+            if not bloque:
+                raise asyncio.IncompleteReadError(b"", pendiente)
+            pendiente -= len(bloque)
+            yield bloque
+
+async def _cuerpo_json(reader, cabeceras: dict):
+    partes = []
+    total = 0
+    async for bloque in _cuerpo(reader, cabeceras):
+        total += len(bloque)
+        if total > MAX_CUERPO:
+            raise ErrorHTTP(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"El cuerpo supera {MAX_CUERPO} bytes")
+        partes.append(bloque)
+    try:
+        return json.loads(b"".join(partes) or b"null")
+    except ValueError as e:
+        raise ErrorHTTP(HTTPStatus.BAD_REQUEST, f"JSON no válido: {e}")
+
+async def _filas_jsonl(reader, cabeceras: dict):
+    """
+    Genera las filas de un cuerpo JSONL según llegan; una línea que no es
+    JSON se convierte en {"error": ...} para que salga en su posición.
+    """
+    resto = b""
+    numero = 0
+
+    def fila(linea):
+        try:
+            valor = json.loads(linea)
+        except ValueError as e:
+            return {"error": f"Línea {numero}: JSON no válido ({e})"}
+        return valor if isinstance(valor, dict) else {"error": f"Línea {numero}: se esperaba un objeto"}
+
+    async for bloque in _cuerpo(reader, cabeceras):
+        resto += bloque
+        *lineas, resto = resto.split(b"\n")
+        if len(resto) > MAX_CUERPO:
+            raise ErrorHTTP(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Línea JSONL demasiado larga")
+        for linea in lineas:
+            numero += 1
+            if linea.strip():
+                yield fila(linea)
+    if resto.strip():
+        numero += 1
+        yield fila(resto)
+
+def _cabecera_respuesta(estado: HTTPStatus, tipo: str, mantener: bool, longitud: int = None) -> bytes:
+    lineas = [f"HTTP/1.1 {estado.value} {estado.phrase}", f"Content-Type: {tipo}"]
+    lineas.append(f"Content-Length: {longitud}" if longitud is not None else "Transfer-Encoding: chunked")
+    lineas.append("Connection: keep-alive" if mantener else "Connection: close")
+    return ("\r\n".join(lineas) + "\r\n\r\n").encode("latin-1")
+
+async def _enviar_json(writer, estado: HTTPStatus, datos, mantener: bool):
+    cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+    writer.write(_cabecera_respuesta(estado, "application/json; charset=utf-8", mantener, len(cuerpo)) + cuerpo)
+    await writer.drain()
+
+async def _trozos(filas, tam: int):
+    trozo = []
+    async for fila in filas:
+        trozo.append(fila)
+        if len(trozo) >= tam:
+            yield trozo
+            trozo = []
+    if trozo:
+        yield trozo
+
+async def _iterar(filas):
+    for fila in filas:
+        yield fila
+
+async def _responder_lote(reader, writer, consulta: dict, cabeceras: dict, ejecutor, mantener: bool):
+    """
+    Evalúa el lote por trozos en el ejecutor y envía cada trozo en cuanto
+    está listo (Transfer-Encoding: chunked).
+    """
+    regimen = consulta.get("regimen", [None])[0]
+    if regimen is not None and regimen not in REGIMENES:
+        raise ErrorHTTP(HTTPStatus.BAD_REQUEST, f"Régimen desconocido '{regimen}'. Opciones: {', '.join(REGIMENES)}")
+    extras = tuple(e for valor in consulta.get("extras", []) for e in valor.split(",") if e)
+    desconocidos = [e for e in extras if e not in CAMPOS_EXTRA]
+    if desconocidos:
+        raise ErrorHTTP(HTTPStatus.BAD_REQUEST, f"Extras desconocidos: {', '.join(desconocidos)}. Opciones: {', '.join(CAMPOS_EXTRA)}")
+    jsonl = consulta.get("formato", ["json"])[0] == "jsonl"
+
+    if "ndjson" in cabeceras.get("content-type", "") or "jsonl" in cabeceras.get("content-type", ""):
+        filas = _filas_jsonl(reader, cabeceras)
+    else:
+        datos = await _cuerpo_json(reader, cabeceras)
+        if isinstance(datos, dict) and isinstance(datos.get("centros"), list):
+            datos = datos["centros"]
+        if not isinstance(datos, list):
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "Se esperaba un array de centros (o {\"centros\": [...]})")
+        filas = _iterar([fila if isinstance(fila, dict) else {"error": "Se esperaba un objeto"} for fila in datos])
+
+    tipo = "application/x-ndjson; charset=utf-8" if jsonl else "application/json; charset=utf-8"
+    writer.write(_cabecera_respuesta(HTTPStatus.OK, tipo, mantener))
+    bucle = asyncio.get_running_loop()
+    primero = True
+    try:
+        async for trozo in _trozos(filas, TAM_TROZO):
+            resultados = await bucle.run_in_executor(ejecutor, evaluar_trozo, trozo, regimen, extras)
+            if jsonl:
+                texto = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in resultados)
+            else:
+                texto = ("[" if primero else ",") + ",".join(json.dumps(r, ensure_ascii=False) for r in resultados)
+            primero = False
+            datos = texto.encode("utf-8")
+            writer.write(f"{len(datos):x}\r\n".encode("latin-1") + datos + b"\r\n")
+            await writer.drain()
+    except Exception as e:
+        # La respuesta ya empezó: se corta sin el trozo final para que el
+        # cliente la vea incompleta
+        if not isinstance(e, (ErrorHTTP, ConnectionError)):
+            logger.exception("Error inesperado enviando el lote")
+        writer.transport.abort()
+        raise ConnectionAbortedError
+    cierre = b"" if jsonl else (b"[]" if primero else b"]")
+    writer.write((f"{len(cierre):x}\r\n".encode("latin-1") + cierre + b"\r\n" if cierre else b"") + b"0\r\n\r\n")
+    await writer.drain()
+
+async def _responder(metodo: str, ruta: str, consulta: dict, cabeceras: dict, reader, writer, ejecutor, mantener: bool):
+    if ruta == "/salud" and metodo == "GET":
+        await _enviar_json(writer, HTTPStatus.OK, {"estado": "ok"}, mantener)
+    elif ruta == "/regimenes" and metodo == "GET":
+        await _enviar_json(writer, HTTPStatus.OK, descripcion_regimenes(), mantener)
+    elif ruta.startswith("/evaluar/") and metodo == "POST":
+        regimen = ruta[len("/evaluar/"):]
+        if regimen not in REGIMENES:
+            raise ErrorHTTP(HTTPStatus.NOT_FOUND, f"Régimen desconocido '{regimen}'. Opciones: {', '.join(REGIMENES)}")
+        fila = await _cuerpo_json(reader, cabeceras)
+        if not isinstance(fila, dict):
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "Se esperaba un objeto JSON con 'ocupacion' y 'horas'")
+        resultado = evaluar_fila({**fila, "regimen": regimen})
+        estado = HTTPStatus.UNPROCESSABLE_ENTITY if resultado.get("error") else HTTPStatus.OK
+        await _enviar_json(writer, estado, resultado, mantener)
+    elif ruta == "/lote" and metodo == "POST":
+        await _responder_lote(reader, writer, consulta, cabeceras, ejecutor, mantener)
+    elif ruta in ("/salud", "/regimenes", "/lote") or ruta.startswith("/evaluar/"):
+        raise ErrorHTTP(HTTPStatus.METHOD_NOT_ALLOWED)
+    else:
+        raise ErrorHTTP(HTTPStatus.NOT_FOUND)
+
+async def _atender(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, ejecutor=None):
+    """
+    Atiende las peticiones de una conexión hasta que el cliente la cierra,
+    pide Connection: close o pasa TIEMPO_INACTIVO sin peticiones.
+    """
+    try:
+        while True:
+            peticion = None
+            try:
+                peticion = await _leer_peticion(reader)
+                if peticion is None:
+                    break
+                metodo, ruta, consulta, version, cabeceras = peticion
+                conexion = cabeceras.get("connection", "").lower()
+                mantener = conexion == "keep-alive" if version == "HTTP/1.0" else conexion != "close"
+                await _responder(metodo, ruta, consulta, cabeceras, reader, writer, ejecutor, mantener)
+            except ErrorHTTP as e:
+                # El cuerpo puede no haberse leído entero: se responde y se cierra
+                await _enviar_json(writer, e.estado, {"error": str(e)}, False)
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except (ValueError, TypeError, OverflowError) as e:
+                logger.warning("Petición %s no válida: %s", peticion[:2] if peticion else "", e)
+                await _enviar_json(writer, HTTPStatus.BAD_REQUEST, {"error": f"Datos no válidos: {e}"}, False)
+                break
+            except Exception:
+                logger.exception("Error inesperado atendiendo %s", peticion[:2] if peticion else "la petición")
+                await _enviar_json(writer, HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Error interno del servidor"}, False)
+                break
+            if not mantener:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+async def crear_servidor(host: str = "127.0.0.1", puerto: int = 8080, procesos: int = 1) -> asyncio.AbstractServer:
+    """
+    Arranca el servidor en el bucle de eventos actual y lo devuelve (para
+    pruebas locales: puerto=0 elige un puerto libre). Con procesos > 1 los
+    lotes se evalúan en un pool de procesos.
+    """
+    ejecutor = ProcessPoolExecutor(max_workers=procesos) if procesos > 1 else None
+    return await asyncio.start_server(
+        functools.partial(_atender, ejecutor=ejecutor), host, puerto, limit=MAX_CABECERA
+    )
+
+# ----------------------------------------------------------------
+# LÍNEA DE COMANDOS
+# ----------------------------------------------------------------
+def construir_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m ratios.api",
+        description="API HTTP/JSON de cumplimiento de ratios (un centro o lotes)."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Dirección de escucha.")
+    parser.add_argument("--puerto", type=int, default=8080, help="Puerto de escucha.")
+    parser.add_argument("--procesos", type=int, default=1, help="Procesos para evaluar lotes (1 = hilos del proceso).")
+    return parser
+
+def main(argv=None) -> int:
+    args = construir_parser().parse_args(argv)
+
+    async def servir():
+        servidor = await crear_servidor(args.host, args.puerto, args.procesos)
+        direccion = servidor.sockets[0].getsockname()
+        print(f"API de ratios en http://{direccion[0]}:{direccion[1]}", file=sys.stderr)
+        async with servidor:
+            await servidor.serve_forever()
+
+    try:
+        asyncio.run(servir())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Calendario de ausencias: bajas, vacaciones y permisos (retribuidos o no)
+descontados de las horas contratadas, para que las ratios se calculen
+sobre horas efectivamente trabajadas.
+
+Cada ausencia tiene empleado, fecha de inicio y de fin (ambas incluidas;
+sin fin = baja en curso) y opcionalmente un tipo. Las ausencias de cada
+empleado se ordenan y se fusionan en una sola pasada (las que se solapan o
+son consecutivas forman un único intervalo), así que un día de vacaciones
+que coincide con una baja se descuenta una sola vez.
+
+Después, cada contrato del empleado (ratios.contratos, con columna
+'empleado') se cruza con sus intervalos por búsqueda binaria y cada cruce
+se convierte en un tramo de horas negativas del contrato en esas fechas:
+las horas semanales del contrato se descuentan en proporción a los días
+de ausencia, antes de la conversión a EJC. El coste total es
+O(n log n) en el número de ausencias más O(log m) por contrato, sin bucles
+anidados ausencia × contrato.
+"""
+import csv
+import json
+from bisect import bisect_left
+from datetime import date
+
+from ratios.contratos import _fecha
+
+# Fin de las ausencias sin fecha de fin (baja en curso)
+_SIN_FIN = date.max.toordinal()
+
+# ----------------------------------------------------------------
+# FUSIÓN DE INTERVALOS
+# ----------------------------------------------------------------
+def fusionar(intervalos) -> list:
+    """
+    Ordena y fusiona intervalos [inicio, fin] de días (ordinales, ambos
+    incluidos) que se solapan o son consecutivos.
+    :return: lista ordenada de (inicio, fin) disjuntos y no consecutivos.
+    """
+    fusionados = []
+    for inicio, fin in sorted(intervalos):
+        if fusionados and inicio <= fusionados[-1][1] + 1:
+            if fin > fusionados[-1][1]:
+                fusionados[-1] = (fusionados[-1][0], fin)
+        else:
+            fusionados.append((inicio, fin))
+    return fusionados
+
+def calendario(ausencias) -> dict:
+    """
+    {empleado: (inicios, fines)} con los intervalos fusionados de cada
+    empleado en dos listas ordenadas (ordinales), listas para bisect.
+    :param ausencias: iterable de {"empleado", "inicio" (date), "fin" (date o None)}.
+    """
+    por_empleado = {}
+    for ausencia in ausencias:
+        fin = _SIN_FIN if ausencia["fin"] is None else ausencia["fin"].toordinal()
+        por_empleado.setdefault(ausencia["empleado"], []).append((ausencia["inicio"].toordinal(), fin))
+    resultado = {}
+    for empleado, intervalos in por_empleado.items():
+        fusionados = fusionar(intervalos)
+        resultado[empleado] = ([inicio for inicio, _ in fusionados], [fin for _, fin in fusionados])
+    return resultado
+
+def dias_ausente(intervalos: tuple, inicio: date, fin: date) -> int:
+    """
+    Días entre 'inicio' y 'fin' (incluidos) cubiertos por los intervalos
+    de un empleado (un valor de calendario()).
+    """
+    return sum(hasta - desde + 1 for desde, hasta in _cruces(intervalos, inicio.toordinal(), fin.toordinal()))
+
+def _cruces(intervalos: tuple, desde: int, hasta: int):
+    """
+    Genera la intersección (inicio, fin) de [desde, hasta] con cada
+    intervalo que la corta, empezando por el primero cuyo fin es >= desde.
+    """
+    inicios, fines = intervalos
+    for i in range(bisect_left(fines, desde), len(inicios)):
+        if inicios[i] > hasta:
+            return
+        yield max(inicios[i], desde), min(fines[i], hasta)
+
+# ----------------------------------------------------------------
+# DESCUENTO SOBRE LOS CONTRATOS
+# ----------------------------------------------------------------
+def tramos_ausencia(contratos, ausencias: dict):
+    """
+    Genera, para cada contrato con empleado y ausencias, un tramo por cada
+    intervalo de ausencia dentro del contrato: {"centro", "categoria",
+    "horas", "inicio", "fin"} con las horas del contrato, para
+    Contratos.descontar().
+    :param ausencias: calendario() de ausencias.
+    """
+    for contrato in contratos:
+        intervalos = ausencias.get(contrato.get("empleado"))
+        if intervalos is None:
+            continue
+        fin = _SIN_FIN if contrato["fin"] is None else contrato["fin"].toordinal()
+        for desde, hasta in _cruces(intervalos, contrato["inicio"].toordinal(), fin):
+            yield {
+                "centro": contrato["centro"],
+                "categoria": contrato["categoria"],
+                "horas": contrato["horas"],
+                "inicio": date.fromordinal(desde),
+                "fin": None if hasta == _SIN_FIN else date.fromordinal(hasta),
+            }
+
+def aplicar_ausencias(maestro, ausencias) -> dict:
+    """
+    Descuenta las ausencias de los contratos del maestro (ratios.contratos.
+    Contratos): a partir de aquí sus consultas devuelven horas efectivas.
+    :param ausencias: iterable de ausencias (leer_ausencias) o un calendario().
+    :return: {"empleados" con ausencias, "intervalos" tras fusionar, "tramos"
+              descontados, "sin_contrato" (empleados ausentes sin contrato)}
+    """
+    if not isinstance(ausencias, dict):
+        ausencias = calendario(ausencias)
+    tramos = list(tramos_ausencia(maestro, ausencias))
+    maestro.descontar(tramos)
+    con_contrato = {contrato.get("empleado") for contrato in maestro}
+    return {
+        "empleados": len(ausencias),
+        "intervalos": sum(len(inicios) for inicios, _ in ausencias.values()),
+        "tramos": len(tramos),
+        "sin_contrato": sum(1 for empleado in ausencias if empleado not in con_contrato),
+    }
+
+# ----------------------------------------------------------------
+# LECTURA
+# ----------------------------------------------------------------
+def leer_ausencias(fichero, formato: str = "csv", tipos=None) -> dict:
+    """
+    Lee ausencias de un CSV o JSONL con 'empleado', 'fecha_inicio',
+    'fecha_fin' (vacía = en curso) y opcionalmente 'tipo'. Con 'tipos' solo
+    se leen las de esos tipos (sin distinguir mayúsculas).
+    :return: {"ausencias": [...], "descartados": [(fila, motivo)]}
+    """
+    # Las líneas JSONL se decodifican fila a fila: una línea dañada se descarta
+    filas = csv.DictReader(fichero) if formato == "csv" else (linea for linea in fichero if linea.strip())
+    tipos = {tipo.lower() for tipo in tipos} if tipos else None
+    ausencias = []
+    descartados = []
+    for numero, fila in enumerate(filas, start=1):
+        try:
+            if formato != "csv":
+                fila = json.loads(fila)
+            if not isinstance(fila, dict):
+                raise ValueError("Se esperaba un objeto JSON")
+            tipo = str(fila.get("tipo") or "")
+            if tipos is not None and tipo.lower() not in tipos:
+                continue
+            ausencia = {
+                "empleado": str(fila.get("empleado") or ""),
+                "tipo": tipo,
+                "inicio": _fecha(fila.get("fecha_inicio")),
+                "fin": _fecha(fila.get("fecha_fin")),
+            }
+            if not ausencia["empleado"]:
+                raise ValueError("Falta el empleado")
+            if ausencia["inicio"] is None:
+                raise ValueError("Falta la fecha de inicio")
+            if ausencia["fin"] is not None and ausencia["fin"] < ausencia["inicio"]:
+                raise ValueError(f"La ausencia termina ({ausencia['fin']}) antes de empezar ({ausencia['inicio']})")
+        except (ValueError, TypeError, AttributeError) as e:
+            descartados.append((numero, str(e)))
+            continue
+        ausencias.append(ausencia)
+    return {"ausencias": ausencias, "descartados": descartados}
@@ -0,0 +1,119 @@
+"""
+Barrido de ocupación: para una plantilla fija (horas por categoría), el
+cumplimiento de un régimen con cada ocupación de 1 a N y las ocupaciones
+exactas en las que cambia cada comprobación.
+
+Los mínimos dependen de la ocupación de forma lineal a tramos (fisioterapia
+/TO por cada 25 plazas, gerocultores por cada 35 usuarios, Ayuntamiento por
+cada 30, salto de 0,37 a 0,45 por encima de 50 plazas en la Orden 2680), así
+que el barrido se hace en una sola pasada vectorizada del motor por lotes
+(ratios.lotes) sobre el vector de ocupaciones, con los mismos resultados
+que evaluar_centro para cada ocupación. Las normativas añadidas sin
+equivalente vectorizado se evalúan ocupación a ocupación.
+"""
+import numpy as np
+
+from ratios.calculo import CATEGORIAS
+from ratios.evaluacion import REGIMENES
+from ratios.lotes import MatrizHoras, evaluar_orden2680, evaluar_cam_am, evaluar_cam_cd, evaluar_ayuntamiento
+from ratios.reglas import normativas
+
+# ----------------------------------------------------------------
+# COMPROBACIONES VECTORIZADAS POR RÉGIMEN
+# ----------------------------------------------------------------
+def _orden2680(matriz, ocupacion) -> dict:
+    return {"cumple_ratio": evaluar_orden2680(matriz, ocupacion)["cumple"]}
+
+def _cam_am(matriz, ocupacion) -> dict:
+    detalle = evaluar_cam_am(matriz, ocupacion)["cumple_detalle"]
+    return {
+        "cumple_directa": detalle["directa"],
+        "cumple_no_directa": detalle["no_directa"],
+        "cumple_gero": detalle["gerocultores"],
+        "cumple_fisio": detalle["fisioterapia"],
+        "cumple_to": detalle["terapia_ocupacional"],
+        "cumple_ts": detalle["trabajador_social"],
+        "cumple_med": detalle["medico"],
+        "cumple_enf": detalle["enfermeria"],
+    }
+
+def _cam_cd(matriz, ocupacion, sumar_ruta=False) -> dict:
+    resultado = evaluar_cam_cd(matriz, ocupacion, sumar_ruta=sumar_ruta)
+    return {"cumple_ratio": resultado["cumple_ratio"], "cumple_gero": resultado["cumple_gero"]}
+
+def _ayuntamiento(matriz, ocupacion, normativa="ayuntamiento") -> dict:
+    detalle = evaluar_ayuntamiento(matriz, ocupacion, normativa)["cumple_detalle"]
+    return {f"cumple_{cat}": cumple for cat, cumple in detalle.items()}
+
+def _cam_ayto(matriz, ocupacion) -> dict:
+    return {**_cam_cd(matriz, ocupacion, sumar_ruta=True), **_ayuntamiento(matriz, ocupacion, "cam_ayto")}
+
+VECTORIZADOS = {
+    "orden2680": _orden2680,
+    "cam_am": _cam_am,
+    "cam_cd": _cam_cd,
+    "ayuntamiento": _ayuntamiento,
+    "cam_ayto": _cam_ayto,
+}
+
+def _por_ocupacion(plan, horas: dict, ocupacion) -> dict:
+    resultados = [plan.evaluar(int(n), horas) for n in ocupacion]
+    return {nombre: np.array([r[nombre] for r in resultados], dtype=bool) for nombre in plan.comprobaciones}
+
+# ----------------------------------------------------------------
+# BARRIDO
+# ----------------------------------------------------------------
+def cambios(ocupacion, cumple) -> list:
+    """
+    [(ocupación, nuevo valor)] en las que 'cumple' cambia respecto a la
+    ocupación anterior.
+    """
+    indices = np.flatnonzero(cumple[1:] != cumple[:-1]) + 1
+    return [(int(ocupacion[i]), bool(cumple[i])) for i in indices]
+
+def tramos_cumplimiento(ocupacion, cumple) -> list:
+    """
+    [(desde, hasta)] de ocupaciones consecutivas que cumplen.
+    """
+    bordes = np.diff(np.concatenate(([0], cumple.astype(np.int8), [0])))
+    inicios = np.flatnonzero(bordes == 1)
+    finales = np.flatnonzero(bordes == -1) - 1
+    return [(int(ocupacion[i]), int(ocupacion[j])) for i, j in zip(inicios, finales)]
+
+def barrer_ocupacion(regimen: str, horas: dict, maximo: int, minimo: int = 1) -> dict:
+    """
+    Cumplimiento del régimen para cada ocupación de 'minimo' a 'maximo' con
+    las horas dadas.
+
+    :return: {"regimen", "ocupacion" (array), "cumple" (array),
+              "comprobaciones" {nombre: array}, "cambios" {nombre: [(ocupación, valor)]},
+              "tramos" [(desde, hasta)] en los que se cumple todo}
+    Lanza ValueError si el régimen no existe o el rango no es válido.
+    """
+    plan = normativas().get(regimen)
+    if plan is None:
+        raise ValueError(f"Régimen desconocido '{regimen}'. Opciones: {', '.join(REGIMENES)}")
+    if minimo < 1 or maximo < minimo:
+        raise ValueError("El rango de ocupación debe cumplir 1 <= mínimo <= máximo.")
+    ocupacion = np.arange(minimo, maximo + 1, dtype=np.int64)
+    if regimen in VECTORIZADOS:
+        fila = np.array([[horas.get(cat, 0.0) for cat in CATEGORIAS]], dtype=np.float64)
+        matriz = MatrizHoras(np.broadcast_to(fila, (len(ocupacion), len(CATEGORIAS))))
+        comprobaciones = {
+            nombre: np.broadcast_to(valores, ocupacion.shape)
+            for nombre, valores in VECTORIZADOS[regimen](matriz, ocupacion).items()
+        }
+    else:
+        comprobaciones = _por_ocupacion(plan, horas, ocupacion)
+    cumple = np.logical_and.reduce(list(comprobaciones.values())) if comprobaciones else np.ones_like(ocupacion, dtype=bool)
+    return {
+        "regimen": regimen,
+        "ocupacion": ocupacion,
+        "cumple": cumple,
+        "comprobaciones": comprobaciones,
+        "cambios": {
+            "cumple": cambios(ocupacion, cumple),
+            **{nombre: cambios(ocupacion, valores) for nombre, valores in comprobaciones.items()},
+        },
+        "tramos": tramos_cumplimiento(ocupacion, cumple),
+    }
@@ -0,0 +1,106 @@
+"""
+Caché de resultados de cálculo compartida por todas las sesiones del
+proceso.
+
+calculo_cacheado() devuelve el resultado de un cálculo de ratios (Orden
+2680, CAM AM, CAM Centro de Día, Ayuntamiento) para una ocupación y unas
+horas dadas, y solo lo calcula si no está ya en la caché. La clave es
+(cálculo, ocupación, vector de horas en el orden recibido, opciones): las
+sumas de EJC se hacen en ese orden, así que dos vectores con las mismas
+horas en distinto orden se guardan por separado y el resultado es siempre
+idéntico al del cálculo directo.
+
+La caché es LRU con un máximo de entradas (RATIOS_CACHE_RESULTADOS) y cada
+entrada caduca a los RATIOS_CACHE_TTL segundos. Los resultados se
+comparten entre sesiones: no deben modificarse.
+
+estadisticas() expone los contadores acumulados (aciertos, fallos,
+caducadas, desalojadas) y el número de entradas.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from ratios.calculo import (
+    calcular_orden2680,
+    calcular_cam_am,
+    calcular_ratio_cam_cd,
+    comprobar_cumplimiento_ayuntamiento,
+)
+
+MAX_RESULTADOS = int(os.environ.get("RATIOS_CACHE_RESULTADOS", "4096"))
+TTL_SEGUNDOS = float(os.environ.get("RATIOS_CACHE_TTL", "3600"))
+
+# Cálculo de cada régimen: f(ocupacion, *horas, **opciones)
+CALCULOS = {
+    "orden2680": calcular_orden2680,
+    "cam_am": calcular_cam_am,
+    "cam_cd": calcular_ratio_cam_cd,
+    "ayuntamiento": comprobar_cumplimiento_ayuntamiento,
+}
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_estadisticas = {
+    "aciertos": 0,
+    "fallos": 0,
+    "caducadas": 0,
+    "desalojadas": 0,
+}
+
+def clave_resultado(regimen: str, ocupacion: int, *horas: dict, **opciones) -> tuple:
+    """
+    Clave de caché: régimen, ocupación, (categoría, horas) de cada diccionario
+    en su orden y opciones del cálculo.
+    """
+    return (
+        regimen,
+        int(ocupacion),
+        tuple(tuple((cat, float(h)) for cat, h in grupo.items()) for grupo in horas),
+        tuple(sorted(opciones.items())),
+    )
+
+def calculo_cacheado(regimen: str, ocupacion: int, *horas: dict, **opciones):
+    """
+    Resultado de CALCULOS[regimen](ocupacion, *horas, **opciones), tomado de
+    la caché si ya se calculó (y no ha caducado).
+    Lanza ValueError si el régimen no está en CALCULOS.
+    """
+    calcular = CALCULOS.get(regimen)
+    if calcular is None:
+        raise ValueError(f"No hay cálculo para el régimen '{regimen}'. Opciones: {', '.join(CALCULOS)}")
+    clave = clave_resultado(regimen, ocupacion, *horas, **opciones)
+    ahora = time.monotonic()
+    with _lock:
+        entrada = _cache.get(clave)
+        if entrada is not None:
+            if ahora - entrada[0] < TTL_SEGUNDOS:
+                _cache.move_to_end(clave)
+                _estadisticas["aciertos"] += 1
+                return entrada[1]
+            del _cache[clave]
+            _estadisticas["caducadas"] += 1
+        _estadisticas["fallos"] += 1
+    resultado = calcular(ocupacion, *horas, **opciones)
+    with _lock:
+        _cache[clave] = (ahora, resultado)
+        _cache.move_to_end(clave)
+        while len(_cache) > MAX_RESULTADOS:
+            _cache.popitem(last=False)
+            _estadisticas["desalojadas"] += 1
+    return resultado
+
+def estadisticas() -> dict:
+    """
+    Copia de los contadores acumulados del proceso, más el número de entradas.
+    """
+    with _lock:
+        datos = dict(_estadisticas)
+        datos["entradas"] = len(_cache)
+    return datos
+
+def limpiar_cache():
+    """Vacía la caché (los contadores se conservan)."""
+    with _lock:
+        _cache.clear()
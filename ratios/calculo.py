@@ -0,0 +1,284 @@
+"""
+Funciones de cálculo puras (sin Streamlit) para residencias y centros de día.
+
+Los umbrales de cada normativa (ratios mínimas, horas mínimas, bloques de
+usuarios, coste por persona) no están aquí: se leen de los "parametros" del
+paquete de reglas compilado (ratios/normativas, ver ratios.reglas), de modo
+que editar un paquete cambia también estos cálculos y los de la interfaz.
+"""
+import unicodedata
+
+# ratios.reglas importa este módulo: se usa como reglas.<función>, resuelto
+# al llamar, para que el orden de importación no importe
+from ratios import reglas
+
+# ----------------------------------------------------------------
+# CONSTANTES Y CATEGORÍAS
+# ----------------------------------------------------------------
+HORAS_ANUALES_JORNADA_COMPLETA = 1772
+SEMANAS_AL_ANO = 52.14
+
+CATEGORIAS_DIRECTAS = (
+    "Médico", "ATS/DUE (Enfermería)", "Gerocultor", "Fisioterapeuta",
+    "Terapeuta Ocupacional", "Trabajador Social", "Psicólogo/a",
+    "Animador sociocultural / TASOC", "Director/a"
+)
+CATEGORIAS_NO_DIRECTAS = ("Limpieza", "Cocina", "Mantenimiento")
+CATEGORIAS_CAM_CD = (
+    "Enfermera/o", "Gerocultor", "Fisioterapeuta", "Terapeuta Ocupacional",
+    "Trabajador Social", "Psicólogo/a"
+)
+CATEGORIAS_AYTO = (
+    "Coordinador/a", "Enfermera/o", "Trabajador Social", "Fisioterapeuta",
+    "Terapeuta Ocupacional", "Psicólogo/a", "Gerocultor",
+    "Gerocultor (aux. ruta)", "Conductor/a"
+)
+CATEGORIAS_CD_TODAS = (
+    "Enfermera/o", "Gerocultor", "Fisioterapeuta", "Terapeuta Ocupacional",
+    "Trabajador Social", "Psicólogo/a", "Coordinador/a",
+    "Gerocultor (aux. ruta)", "Conductor/a"
+)
+
+# Unión ordenada de todas las categorías
+CATEGORIAS = tuple(dict.fromkeys(
+    CATEGORIAS_DIRECTAS + CATEGORIAS_NO_DIRECTAS + CATEGORIAS_CAM_CD + CATEGORIAS_AYTO
+))
+
+def _clave_categoria(nombre: str) -> str:
+    """
+    Nombre sin tildes, en minúsculas y con los espacios normalizados.
+    """
+    sin_tildes = unicodedata.normalize("NFKD", nombre).encode("ascii", "ignore").decode("ascii")
+    return " ".join(sin_tildes.lower().split())
+
+_POR_CLAVE = {_clave_categoria(cat): cat for cat in CATEGORIAS}
+
+def resolver_categoria(nombre: str, alias: dict = None):
+    """
+    Categoría de la aplicación que corresponde a 'nombre' (o None si no hay
+    ninguna): primero los alias, después las categorías sin distinguir
+    mayúsculas, tildes ni espacios.
+    """
+    if alias and nombre in alias:
+        return alias[nombre]
+    return _POR_CLAVE.get(_clave_categoria(nombre))
+
+# ----------------------------------------------------------------
+# FUNCIONES COMUNES
+# ----------------------------------------------------------------
+def parametro(regimen: str, nombre: str):
+    """
+    Umbral 'nombre' del paquete de reglas del régimen (ratios.reglas.parametro).
+    """
+    return reglas.parametro(regimen, nombre)
+
+def coste_por_persona() -> float:
+    """
+    Coste anual de referencia por EJC (Orden 2680/2024).
+    """
+    return reglas.parametros("orden2680", "coste_por_persona")[0]
+
+def requisitos_ayuntamiento(normativa: str = "ayuntamiento") -> dict:
+    """
+    {categoría: horas mínimas por bloque de usuarios} de los parámetros
+    'horas_bloque_<categoría>' de la normativa.
+    """
+    return dict(reglas.normativas()[normativa].con_prefijo("horas_bloque_"))
+
+def calcular_equivalentes_jornada_completa(horas_semanales: float) -> float:
+    """
+    Convierte horas semanales en EJC, asumiendo 1772 h/año y ~52.14 sem/año.
+    """
+    horas_anuales = horas_semanales * SEMANAS_AL_ANO
+    return horas_anuales / HORAS_ANUALES_JORNADA_COMPLETA
+
+# ----------------------------------------------------------------
+# RESIDENCIAS (CAM y Orden 2680/2024)
+# ----------------------------------------------------------------
+def calcular_horas_fisio_to_residencia(plazas: int) -> float:
+    """
+    Calcula las horas semanales requeridas para Fisioterapia / Terapia Ocupacional (CAM):
+      - Hasta 50 residentes: 4h/día (20h/sem)
+      - Para cada 25 plazas adicionales (o fracción): +2h/día (10h/sem)
+    (valores del paquete cam_am).
+    """
+    dias_semana, base_horas_diarias, plazas_base, tramo, horas_tramo = reglas.parametros(
+        "cam_am", "dias_semana", "terapia_horas_dia_base", "terapia_plazas_base",
+        "terapia_tramo_plazas", "terapia_horas_dia_tramo"
+    )
+    if plazas <= plazas_base:
+        return base_horas_diarias * dias_semana
+    else:
+        plazas_adicionales = plazas - plazas_base
+        incrementos_enteros = plazas_adicionales // tramo
+        resto = plazas_adicionales % tramo
+        horas_adicionales = incrementos_enteros * horas_tramo + (resto / tramo) * horas_tramo
+        return (base_horas_diarias + horas_adicionales) * dias_semana
+
+def calcular_orden2680(ocupacion: int, horas_directas: dict) -> dict:
+    """
+    Ratio de atención directa según la Orden 2680/2024:
+      - 0,45 EJC/residente si hay más de 50 plazas
+      - 0,37 EJC/residente en otro caso
+    Devuelve el diccionario de resultados que muestran la UI y el informe.
+    """
+    total_eq_directa = sum(calcular_equivalentes_jornada_completa(h) for h in horas_directas.values())
+    ratio_directa = total_eq_directa / ocupacion
+    plazas_umbral, ratio_sobre_umbral, ratio_hasta_umbral, coste = reglas.parametros(
+        "orden2680", "plazas_umbral", "ratio_minima_sobre_umbral", "ratio_minima_hasta_umbral",
+        "coste_por_persona"
+    )
+    ratio_minima = ratio_sobre_umbral if ocupacion > plazas_umbral else ratio_hasta_umbral
+    ejc_requerido = ocupacion * ratio_minima
+    deficit = max(ejc_requerido - total_eq_directa, 0)
+    return {
+        "ocupacion": ocupacion,
+        "horas_directas": horas_directas,
+        "total_eq_directa": total_eq_directa,
+        "ratio_directa": ratio_directa,
+        "ratio_minima": ratio_minima,
+        "ejc_requerido": ejc_requerido,
+        "deficit": deficit,
+        "coste_adicional": deficit * coste,
+        "coste_por_persona": coste
+    }
+
+def calcular_cam_am(ocupacion: int, horas_directas: dict, horas_no_directas: dict) -> dict:
+    """
+    Totales EJC y ratios (por cada 100 residentes) de atención directa
+    y no directa para la normativa CAM AM.
+    """
+    total_eq_directa = sum(calcular_equivalentes_jornada_completa(v) for v in horas_directas.values())
+    total_eq_no_directa = sum(calcular_equivalentes_jornada_completa(v) for v in horas_no_directas.values())
+    return {
+        "ocupacion": ocupacion,
+        "horas_directas": horas_directas,
+        "horas_no_directas": horas_no_directas,
+        "total_eq_directa": total_eq_directa,
+        "total_eq_no_directa": total_eq_no_directa,
+        "ratio_directa": (total_eq_directa / ocupacion) * 100,
+        "ratio_no_directa": (total_eq_no_directa / ocupacion) * 100
+    }
+
+# Clave del resultado de verificar_cam_am -> parámetro del paquete cam_am
+_MINIMOS_CAM_AM = {
+    "minimo_directa": "ratio_min_directa",
+    "minimo_no_directa": "ratio_min_no_directa",
+    "minimo_gero": "ratio_min_gero",
+    "minimo_medico": "horas_min_medico",
+    "minimo_enfermeria": "horas_min_enfermeria",
+}
+
+def verificar_cam_am(res: dict) -> dict:
+    """
+    Comprobaciones de la normativa CAM AM a partir del resultado de calcular_cam_am:
+    directa >= 0,47, no directa >= 0,15, gerocultores >= 0,33, horas de
+    fisioterapia/TO, trabajador social > 0, médico >= 5h y enfermería >= 168h
+    (umbrales del paquete cam_am, devueltos también como 'minimo_*' para
+    mostrarlos).
+    """
+    minimos = dict(zip(_MINIMOS_CAM_AM, reglas.parametros("cam_am", *_MINIMOS_CAM_AM.values())))
+    horas = res["horas_directas"]
+    eq_gerocultores = calcular_equivalentes_jornada_completa(horas.get("Gerocultor", 0))
+    ratio_gero = eq_gerocultores / res["ocupacion"] if res["ocupacion"] else 0
+    horas_req_terapia = calcular_horas_fisio_to_residencia(res["ocupacion"])
+    h_fisio = horas.get("Fisioterapeuta", 0)
+    h_to = horas.get("Terapeuta Ocupacional", 0)
+    horas_ts = horas.get("Trabajador Social", 0)
+    horas_med = horas.get("Médico", 0)
+    horas_enf = horas.get("ATS/DUE (Enfermería)", 0)
+    return {
+        **minimos,
+        "cumple_directa": (res["ratio_directa"] / 100) >= minimos["minimo_directa"],
+        "cumple_nodirecta": (res["ratio_no_directa"] / 100) >= minimos["minimo_no_directa"],
+        "ratio_gero": ratio_gero,
+        "cumple_gero": ratio_gero >= minimos["minimo_gero"],
+        "horas_req_terapia": horas_req_terapia,
+        "h_fisio": h_fisio,
+        "cumple_fisio": h_fisio >= horas_req_terapia,
+        "h_to": h_to,
+        "cumple_to": h_to >= horas_req_terapia,
+        "horas_ts": horas_ts,
+        "cumple_ts": horas_ts > 0,
+        "horas_med": horas_med,
+        "cumple_med": horas_med >= minimos["minimo_medico"],
+        "horas_enf": horas_enf,
+        "cumple_enf": horas_enf >= minimos["minimo_enfermeria"]
+    }
+
+# ----------------------------------------------------------------
+# CENTROS DE DÍA (CAM y Ayuntamiento)
+# ----------------------------------------------------------------
+def calcular_horas_gerocultores_cam(usuarios_cam: int, normativa: str = "cam_cd") -> float:
+    """
+    Centros de día CAM:
+    225 horas semanales de gerocultores por cada 35 usuarios o fracción
+    (valores del paquete 'normativa').
+    """
+    bloque, horas_bloque = reglas.parametros(normativa, "gero_bloque_usuarios", "gero_horas_bloque")
+    bloques_completos = usuarios_cam // bloque
+    resto = usuarios_cam % bloque
+    horas_totales = bloques_completos * horas_bloque + (resto / bloque) * horas_bloque
+    return horas_totales
+
+def calcular_ratio_cam_cd(usuarios_cam: int, horas_dict: dict, sumar_ruta=False):
+    """
+    Devuelve:
+      ratio_directa (EJC/usuario)
+      si_cumple_ratio (bool) => >= 0.23
+      horas_gero (float)
+      horas_min_gero (float)
+      si_cumple_gero (bool)
+    :param sumar_ruta: si True, suma "Gerocultor (aux. ruta)" a "Gerocultor"
+                       y aplica los umbrales del paquete cam_ayto (CAM +
+                       Ayuntamiento) en lugar de los de cam_cd.
+    """
+    normativa = "cam_ayto" if sumar_ruta else "cam_cd"
+    total_ejc_directa = 0.0
+    for cat in CATEGORIAS_CAM_CD:
+        horas_sem = horas_dict.get(cat, 0.0)
+        total_ejc_directa += calcular_equivalentes_jornada_completa(horas_sem)
+    ratio_directa = total_ejc_directa / usuarios_cam if usuarios_cam > 0 else 0
+    cumple_ratio = (ratio_directa >= reglas.parametros(normativa, "ratio_min_directa")[0])
+    horas_min_gero = calcular_horas_gerocultores_cam(usuarios_cam, normativa)
+    if sumar_ruta:
+        horas_gero = horas_dict.get("Gerocultor", 0.0) + horas_dict.get("Gerocultor (aux. ruta)", 0.0)
+    else:
+        horas_gero = horas_dict.get("Gerocultor", 0.0)
+    cumple_gero = (horas_gero >= horas_min_gero)
+    return ratio_directa, cumple_ratio, horas_gero, horas_min_gero, cumple_gero
+
+def calcular_minimos_ayuntamiento(usuarios_ayto: int, normativa: str = "ayuntamiento") -> dict:
+    """
+    Centros de día Ayuntamiento de Madrid:
+    Horas mínimas por bloque de 30 usuarios (o fracción), según los
+    parámetros del paquete 'normativa' ("ayuntamiento" o "cam_ayto").
+    """
+    requisitos = reglas.normativas()[normativa].con_prefijo("horas_bloque_")
+    if usuarios_ayto <= 0:
+        return {cat: 0.0 for cat in requisitos}
+    bloque = reglas.parametros(normativa, "bloque_usuarios")[0]
+    blocks_completos = usuarios_ayto // bloque
+    resto = usuarios_ayto % bloque
+    fraccion = resto / bloque
+    minimos = {}
+    for categoria, horas_por_bloque in requisitos.items():
+        horas_totales = (blocks_completos * horas_por_bloque) + (fraccion * horas_por_bloque)
+        minimos[categoria] = horas_totales
+    return minimos
+
+def comprobar_cumplimiento_ayuntamiento(usuarios_ayto: int, horas_dict: dict, normativa: str = "ayuntamiento") -> dict:
+    """
+    Compara las horas aportadas vs. las horas mínimas (Ayuntamiento) para centros de día.
+    """
+    req = calcular_minimos_ayuntamiento(usuarios_ayto, normativa)
+    resultado = {}
+    for categoria, horas_req in req.items():
+        horas_aportadas = horas_dict.get(categoria, 0.0)
+        cumple = (horas_aportadas >= horas_req)
+        resultado[categoria] = {
+            "requerido": horas_req,
+            "aportado": horas_aportadas,
+            "cumple": cumple
+        }
+    return resultado
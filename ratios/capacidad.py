@@ -0,0 +1,71 @@
+"""
+Ocupación máxima admisible: con una plantilla fija, el mayor número de
+residentes/usuarios con el que se cumplen todas las comprobaciones de un
+régimen ("¿cuántos residentes más podemos admitir esta semana?").
+
+En los regímenes incluidos cada mínimo crece con la ocupación (a tramos:
+salto de 0,37 a 0,45 por encima de 50 plazas en la Orden 2680, +10 h de
+fisioterapia/TO por cada 25 plazas, bloques de 35 y 30 usuarios en centros
+de día) y cada ratio decrece con ella, de modo que, si se cumple con N, se
+cumple con cualquier ocupación menor. La búsqueda avanza por potencias de 2
+hasta el primer incumplimiento y lo acota por bisección: unas pocas decenas
+de llamadas a evaluar_centro, con el mismo resultado que probar una a una.
+Las normativas añadidas, sin esa garantía, se barren hasta el límite.
+"""
+from ratios.evaluacion import REGIMENES, evaluar_centro
+from ratios.reglas import normativas
+
+# Regímenes cuyas comprobaciones son monótonas en la ocupación
+MONOTONOS = ("orden2680", "cam_am", "cam_cd", "ayuntamiento", "cam_ayto")
+
+# Ocupación máxima que se considera en la búsqueda
+LIMITE_OCUPACION = 100000
+
+def _incumplidas(regimen: str, ocupacion: int, horas: dict) -> list:
+    resultado = evaluar_centro(regimen, ocupacion, horas)
+    return [nombre for nombre in normativas()[regimen].comprobaciones if not resultado[nombre]]
+
+def ocupacion_maxima(regimen: str, horas: dict, limite: int = LIMITE_OCUPACION) -> dict:
+    """
+    Mayor ocupación (<= limite) con la que las horas dadas cumplen el régimen.
+
+    :return: {"regimen", "ocupacion_maxima" (0 si no se cumple ni con 1),
+              "limitantes" [comprobaciones que dejan de cumplirse en la
+              ocupación siguiente; vacío si se alcanza el límite],
+              "evaluaciones" (llamadas a evaluar_centro)}
+    Lanza ValueError si el régimen no existe.
+    """
+    if regimen not in REGIMENES:
+        raise ValueError(f"Régimen desconocido '{regimen}'. Opciones: {', '.join(REGIMENES)}")
+    evaluaciones = 0
+
+    def incumplidas(n):
+        nonlocal evaluaciones
+        evaluaciones += 1
+        return _incumplidas(regimen, n, horas)
+
+    if regimen not in MONOTONOS:
+        maxima = max((n for n in range(1, limite + 1) if not incumplidas(n)), default=0)
+    elif incumplidas(1):
+        maxima = 0
+    else:
+        # Avance exponencial hasta el primer fallo; 'bajo' siempre cumple
+        bajo, alto = 1, 2
+        while alto <= limite and not incumplidas(alto):
+            bajo, alto = alto, 2 * alto
+        if alto > limite:
+            # Sin fallos hasta pasar el límite: se acota con el propio límite
+            if bajo < limite and incumplidas(limite):
+                alto = limite
+            else:
+                bajo = alto = limite
+        # Bisección: cumple en 'bajo', falla en 'alto'
+        while alto - bajo > 1:
+            medio = (bajo + alto) // 2
+            if incumplidas(medio):
+                alto = medio
+            else:
+                bajo = medio
+        maxima = bajo
+    limitantes = incumplidas(maxima + 1) if maxima < limite else []
+    return {"regimen": regimen, "ocupacion_maxima": maxima, "limitantes": limitantes, "evaluaciones": evaluaciones}
@@ -0,0 +1,402 @@
+"""
+Prueba de carga de la interfaz: cuántas sesiones simultáneas atiende un
+proceso de Streamlit.
+
+Cada sesión es un usuario simulado que recorre calculo_ratio.py con la API
+de pruebas de Streamlit (streamlit.testing.v1.AppTest, sin navegador):
+abre la aplicación, elige su modo y, en cada iteración, rellena todos los
+campos con valores aleatorios (semilla fija por sesión), pulsa Calcular y,
+en los modos con informe (Orden 2680, CAM AM), marca la casilla del informe
+y lo descarga (ejecuta el callable del botón de descarga, como hace el
+servidor al pulsarlo). En la cuadrícula pega una tabla de centros, la
+carga y la evalúa.
+
+Para cada modo y cada número de sesiones se lanzan N usuarios a la vez (un
+hilo cada uno, con una pausa aleatoria media de --pausa segundos entre
+acciones) y se mide:
+  - latencia de cada rerun (p50/p95/p99 y máximo, en total y por acción),
+    contando la espera hasta que el intérprete queda libre;
+  - latencia de las descargas;
+  - reruns por segundo, CPU del proceso (segundos, uso y ms por rerun);
+  - memoria residente al final, pico y KB por sesión.
+
+AppTest instala un runtime simulado global del proceso durante cada
+ejecución, así que los reruns de todas las sesiones se serializan (igual
+que el código Python de los reruns compite por el GIL en el servidor). Los
+tiempos incluyen el análisis del árbol de elementos que hace AppTest: son
+una cota superior de los del servidor real.
+
+Uso:
+  python -m ratios.carga -o carga.json
+  python -m ratios.carga --modos orden2680 cam_am --sesiones 1 10 50 \\
+      --iteraciones 5 --pausa 2 --objetivo-p95 500
+
+Con --objetivo-p95, el resumen indica por modo el mayor número de sesiones
+probado cuyo p95 de rerun no supera el objetivo (en ms).
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from ratios.reglas import normativas
+from ratios.rendimiento import entorno
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCRIPT_POR_DEFECTO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "calculo_ratio.py")
+
+SEMILLA = 2680
+
+PERCENTILES = (50, 95, 99)
+
+# Centros que se pegan en la cuadrícula en cada iteración
+FILAS_PEGADAS = 20
+
+# Casilla que muestra el panel del informe, en los modos que lo tienen
+CASILLAS_INFORME = {
+    "orden2680": "informe_orden2680",
+    "cam_am": "informe_cam_am",
+}
+
+# Todas las ejecuciones de AppTest se serializan con este lock (el runtime
+# simulado es global); _gestores guarda el gestor de ficheros de la última,
+# que tiene registrados los callables de descarga de ese rerun.
+_lock_runtime = threading.Lock()
+_gestores = {}
+
+# ----------------------------------------------------------------
+# APPTEST
+# ----------------------------------------------------------------
+def _preparar_apptest():
+    """
+    Importa AppTest y hace que cada ejecución deje su MediaFileManager en
+    _gestores (AppTest lo crea y lo descarta en cada run).
+    """
+    from streamlit.testing.v1 import AppTest, app_test
+    from streamlit.runtime.media_file_manager import MediaFileManager
+
+    if not getattr(app_test.MediaFileManager, "_ratios_carga", False):
+        class _Gestor(MediaFileManager):
+            _ratios_carga = True
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                _gestores["ultimo"] = self
+
+        app_test.MediaFileManager = _Gestor
+    return AppTest
+
+def _ejecutar(paso):
+    """
+    Ejecuta 'paso' en exclusiva.
+    :return: (resultado, latencia incluida la espera, tiempo de servicio, gestor de ficheros)
+    """
+    pedido = time.perf_counter()
+    with _lock_runtime:
+        inicio = time.perf_counter()
+        resultado = paso()
+        fin = time.perf_counter()
+        gestor = _gestores.get("ultimo")
+    return resultado, fin - pedido, fin - inicio, gestor
+
+def descubrir_modos(script: str = SCRIPT_POR_DEFECTO, timeout: float = 60) -> dict:
+    """
+    Recorre el selector de modos de la aplicación y devuelve
+    {id del modo: {"opcion", "campos" [(clave, entero)], "calcular"}}; el id
+    sale de la clave del botón Calcular (calcular_<id>). Sirve también de
+    calentamiento (importaciones, cachés de logos y de normativas).
+    """
+    AppTest = _preparar_apptest()
+    at = AppTest.from_file(script, default_timeout=timeout)
+    _ejecutar(at.run)
+    modos = {}
+    for opcion in at.selectbox(key="modo_calculo").options:
+        at.selectbox(key="modo_calculo").set_value(opcion)
+        _ejecutar(at.run)
+        if at.exception:
+            raise ValueError(f"La aplicación falla en el modo '{opcion}': {at.exception[0].message}")
+        calcular = next(b.key for b in at.button if (b.key or "").startswith("calcular_"))
+        modos[calcular[len("calcular_"):]] = {
+            "opcion": opcion,
+            "campos": [(ni.key, isinstance(ni.value, int)) for ni in at.number_input],
+            "calcular": calcular,
+        }
+    return modos
+
+# ----------------------------------------------------------------
+# USUARIO SIMULADO
+# ----------------------------------------------------------------
+def _tabla_pegada(rnd: random.Random, categorias) -> str:
+    filas = [
+        "\t".join([f"Centro {i}", str(rnd.randint(20, 150))] + [f"{rnd.uniform(0, 400):.2f}".replace(".", ",") for _ in categorias])
+        for i in range(1, FILAS_PEGADAS + 1)
+    ]
+    return "\n".join(filas)
+
+def _usuario(script: str, modo: str, datos: dict, indice: int, iteraciones: int, pausa: float,
+             timeout: float, anotar):
+    """
+    Un usuario del modo: abre la aplicación, elige el modo y calcula (y
+    descarga el informe) 'iteraciones' veces. anotar(accion, latencia,
+    servicio, error) recibe cada rerun y cada descarga.
+    :return: la sesión (AppTest), para medir la memoria con todas vivas.
+    """
+    AppTest = _preparar_apptest()
+    rnd = random.Random(f"{SEMILLA}-{modo}-{indice}")
+    at = AppTest.from_file(script, default_timeout=timeout)
+
+    def rerun(accion):
+        _, latencia, servicio, gestor = _ejecutar(at.run)
+        error = at.exception[0].message if at.exception else None
+        anotar(accion, latencia, servicio, error)
+        return gestor
+
+    def pensar():
+        if pausa > 0:
+            time.sleep(rnd.expovariate(1 / pausa))
+
+    rerun("inicio")
+    if at.selectbox(key="modo_calculo").value != datos["opcion"]:
+        pensar()
+        at.selectbox(key="modo_calculo").set_value(datos["opcion"])
+        rerun("modo")
+
+    for iteracion in range(iteraciones):
+        pensar()
+        if modo == "cuadricula":
+            regimen = at.selectbox(key="cuadricula_regimen").value
+            at.text_area(key=f"cuadricula_{regimen}_pegado").input(_tabla_pegada(rnd, normativas()[regimen].categorias))
+            at.button(key=f"cuadricula_{regimen}_cargar").click()
+            rerun("pegar")
+            pensar()
+        else:
+            for clave, entero in datos["campos"]:
+                at.number_input(key=clave).set_value(rnd.randint(20, 150) if entero else round(rnd.uniform(0, 400), 2))
+        at.button(key=datos["calcular"]).click()
+        gestor = rerun("calcular")
+
+        casilla = CASILLAS_INFORME.get(modo)
+        if casilla is None:
+            continue
+        if iteracion == 0:
+            pensar()
+            at.checkbox(key=casilla).check()
+            gestor = rerun("informe")
+        botones = at.get("download_button")
+        if not botones or gestor is None:
+            anotar("descarga", 0.0, 0.0, "No se muestra el botón de descarga")
+            continue
+        pensar()
+        try:
+            _, latencia, servicio, _ = _ejecutar(lambda: gestor.execute_deferred(botones[0].proto.deferred_file_id))
+        except Exception as e:  # MediaFileStorageError si el callable falla
+            anotar("descarga", 0.0, 0.0, str(e))
+        else:
+            anotar("descarga", latencia, servicio, None)
+    return at
+
+# ----------------------------------------------------------------
+# MEDICIÓN
+# ----------------------------------------------------------------
+def _percentiles(segundos: list) -> dict:
+    """
+    {"n", "p50", "p95", "p99", "maximo"} en milisegundos (interpolación lineal).
+    """
+    if not segundos:
+        return {"n": 0}
+    ordenados = sorted(segundos)
+    ultimo = len(ordenados) - 1
+
+    def percentil(q):
+        posicion = ultimo * q / 100
+        i = int(posicion)
+        siguiente = ordenados[min(i + 1, ultimo)]
+        return (ordenados[i] + (siguiente - ordenados[i]) * (posicion - i)) * 1000
+
+    return {"n": len(ordenados), **{f"p{q}": percentil(q) for q in PERCENTILES}, "maximo": ordenados[-1] * 1000}
+
+def _rss_mb() -> float:
+    """Memoria residente actual del proceso (MB)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return _rss_pico_mb()
+
+def _rss_pico_mb() -> float:
+    """Pico de memoria residente del proceso (MB)."""
+    if resource is None:
+        return 0.0
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 2**20 if sys.platform == "darwin" else pico / 1024
+
+def medir(script: str, modo: str, datos: dict, sesiones: int, iteraciones: int = 3,
+          pausa: float = 0.0, timeout: float = 60) -> dict:
+    """
+    Lanza 'sesiones' usuarios simultáneos del modo y resume sus reruns.
+    :return: {"modo", "sesiones", "reruns", "descargas", "errores", "segundos",
+              "reruns_por_segundo", "rerun_ms" {percentiles}, "servicio_ms_medio",
+              "por_accion" {accion: percentiles}, "descarga_ms", "cpu_s", "cpu_uso",
+              "cpu_ms_por_rerun", "rss_mb", "rss_pico_mb", "rss_kb_por_sesion"}
+    """
+    anotaciones = []
+    errores = []
+    lock = threading.Lock()
+
+    def anotar(accion, latencia, servicio, error):
+        with lock:
+            if error is None:
+                anotaciones.append((accion, latencia, servicio))
+            else:
+                errores.append(f"{accion}: {error}")
+
+    vivas = [None] * sesiones
+
+    def lanzar(i):
+        try:
+            vivas[i] = _usuario(script, modo, datos, i, iteraciones, pausa, timeout, anotar)
+        except Exception as e:  # el usuario se abandona, se cuenta como error
+            anotar("sesion", 0.0, 0.0, f"{type(e).__name__}: {e}")
+
+    gc.collect()
+    rss_inicial = _rss_mb()
+    cpu_inicial = time.process_time()
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=lanzar, args=(i,), name=f"ratios-carga-{i}") for i in range(sesiones)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+    cpu = time.process_time() - cpu_inicial
+    gc.collect()
+    rss = _rss_mb()
+    del vivas
+
+    reruns = [(accion, latencia, servicio) for accion, latencia, servicio in anotaciones if accion != "descarga"]
+    descargas = [latencia for accion, latencia, _ in anotaciones if accion == "descarga"]
+    por_accion = {}
+    for accion, latencia, _ in reruns:
+        por_accion.setdefault(accion, []).append(latencia)
+    return {
+        "modo": modo,
+        "sesiones": sesiones,
+        "reruns": len(reruns),
+        "descargas": len(descargas),
+        "errores": errores,
+        "segundos": segundos,
+        "reruns_por_segundo": len(reruns) / segundos if segundos else 0.0,
+        "rerun_ms": _percentiles([latencia for _, latencia, _ in reruns]),
+        "servicio_ms_medio": sum(servicio for _, _, servicio in reruns) * 1000 / len(reruns) if reruns else 0.0,
+        "por_accion": {accion: _percentiles(latencias) for accion, latencias in por_accion.items()},
+        "descarga_ms": _percentiles(descargas),
+        "cpu_s": cpu,
+        "cpu_uso": cpu / segundos if segundos else 0.0,
+        "cpu_ms_por_rerun": cpu * 1000 / len(reruns) if reruns else 0.0,
+        "rss_mb": rss,
+        "rss_pico_mb": _rss_pico_mb(),
+        "rss_kb_por_sesion": max(rss - rss_inicial, 0.0) * 1024 / sesiones,
+    }
+
+def capacidad(resultados: list, objetivo_p95_ms: float) -> dict:
+    """
+    {modo: mayor número de sesiones probado sin errores cuyo p95 de rerun no
+    supera el objetivo (0 si ninguno)}.
+    """
+    maximos = {}
+    for fila in resultados:
+        maximos.setdefault(fila["modo"], 0)
+        if not fila["errores"] and fila["rerun_ms"].get("p95", float("inf")) <= objetivo_p95_ms:
+            maximos[fila["modo"]] = max(maximos[fila["modo"]], fila["sesiones"])
+    return maximos
+
+def ejecutar(script: str = SCRIPT_POR_DEFECTO, modos=None, sesiones=(1, 5, 10, 20), iteraciones: int = 3,
+             pausa: float = 0.0, timeout: float = 60, informar=None) -> dict:
+    """
+    Mide cada modo pedido (todos por defecto) con cada número de sesiones.
+    :return: {"entorno", "parametros", "resultados" [medir(...)]}
+    Lanza ValueError si un modo no existe o un número de sesiones no es positivo.
+    """
+    disponibles = descubrir_modos(script, timeout)
+    modos = list(modos or disponibles)
+    desconocidos = [m for m in modos if m not in disponibles]
+    if desconocidos:
+        raise ValueError(f"Modos desconocidos: {', '.join(desconocidos)}. Opciones: {', '.join(disponibles)}")
+    if any(n < 1 for n in sesiones):
+        raise ValueError("El número de sesiones debe ser mayor que 0")
+    resultados = []
+    for modo in modos:
+        for n in sorted(sesiones):
+            resultados.append(medir(script, modo, disponibles[modo], n, iteraciones, pausa, timeout))
+            if informar:
+                informar(resultados[-1])
+    return {
+        "entorno": entorno(),
+        "parametros": {
+            "script": os.path.abspath(script),
+            "iteraciones": iteraciones,
+            "pausa_s": pausa,
+            "semilla": SEMILLA,
+        },
+        "resultados": resultados,
+    }
+
+# ----------------------------------------------------------------
+# LÍNEA DE COMANDOS
+# ----------------------------------------------------------------
+def construir_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m ratios.carga",
+        description="Prueba de carga de la interfaz: latencia de rerun, CPU y memoria por número de sesiones."
+    )
+    parser.add_argument("-o", "--salida", help="Fichero JSON de resultados.")
+    parser.add_argument("--script", default=SCRIPT_POR_DEFECTO, help="Script de Streamlit (calculo_ratio.py).")
+    parser.add_argument("--modos", nargs="+", help="Modos a probar (por defecto, todos): orden2680, cam_am, ...")
+    parser.add_argument("--sesiones", nargs="+", type=int, default=[1, 5, 10, 20],
+                        help="Números de sesiones simultáneas a probar.")
+    parser.add_argument("--iteraciones", type=int, default=3, help="Cálculos (y descargas) por sesión.")
+    parser.add_argument("--pausa", type=float, default=0.0,
+                        help="Pausa media entre acciones de un usuario, en segundos (0 = sin pausa).")
+    parser.add_argument("--timeout", type=float, default=60, help="Tiempo máximo de un rerun, en segundos.")
+    parser.add_argument("--objetivo-p95", type=float,
+                        help="p95 de rerun admisible (ms): indica cuántas sesiones lo cumplen por modo.")
+    return parser
+
+def main(argv=None) -> int:
+    args = construir_parser().parse_args(argv)
+
+    def informar(fila):
+        rerun = fila["rerun_ms"]
+        print(
+            f"{fila['modo']:14} {fila['sesiones']:4} ses.  {fila['reruns']:5} reruns  "
+            f"p50 {rerun.get('p50', 0):8.1f}  p95 {rerun.get('p95', 0):8.1f}  p99 {rerun.get('p99', 0):8.1f} ms  "
+            f"{fila['reruns_por_segundo']:6.1f} r/s  CPU {fila['cpu_uso']:4.0%} {fila['cpu_ms_por_rerun']:6.1f} ms/r  "
+            f"RSS {fila['rss_mb']:7.1f} MB ({fila['rss_kb_por_sesion']:7.0f} KB/ses.)"
+            + (f"  {len(fila['errores'])} errores" if fila["errores"] else ""),
+            file=sys.stderr
+        )
+
+    try:
+        datos = ejecutar(args.script, args.modos, args.sesiones, args.iteraciones, args.pausa, args.timeout, informar)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if args.objetivo_p95 is not None:
+        datos["capacidad"] = capacidad(datos["resultados"], args.objetivo_p95)
+        for modo, maximo in datos["capacidad"].items():
+            print(f"{modo:14} p95 <= {args.objetivo_p95:.0f} ms hasta {maximo} sesiones", file=sys.stderr)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(datos, f, ensure_ascii=False, indent=2)
+    return 1 if any(fila["errores"] for fila in datos["resultados"]) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Atribución de reruns: qué interacción (la clave del widget que cambió,
+p. ej. 'directas_2_Gerocultor' o 'calcular_cam_am') provocó cada rerun de
+cada sesión y cuánto tardó.
+
+La interfaz anota la clave desde el callback del widget (que Streamlit
+ejecuta antes del rerun) y llama a registrar() al terminar. Con los datos
+acumulados en el proceso:
+  - interacciones(): las causas más caras (tiempo total, medio y máximo,
+    número de reruns y de sesiones);
+  - tormentas(): sesiones con muchos reruns en la última ventana de tiempo
+    y las claves que los provocan.
+
+Causas especiales: 'inicio' (primera carga de la sesión) y 'otro' (rerun
+sin widget anotado: recarga, st.rerun, widget sin clave).
+
+Un rerun provocado por varios widgets a la vez (p. ej. un formulario) se
+anota en cada una de sus claves, de modo que el número de causas está
+acotado por el de widgets. El número de sesiones por causa es un contador:
+cuenta cada sesión la primera vez que provoca esa causa mientras está entre
+las MAX_SESIONES recientes.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Reruns recientes que se guardan por sesión (para detectar tormentas)
+MAX_EVENTOS_POR_SESION = 500
+
+# Sesiones de las que se guarda historial (las menos recientes se descartan)
+MAX_SESIONES = 1000
+
+_lock = threading.Lock()
+_por_causa = {}           # causa -> {"reruns", "segundos", "maximo", "fragmento", "sesiones"}
+_sesiones = OrderedDict()  # sesión -> {"eventos": deque[(instante, causas, segundos)], "causas": set}
+
+def registrar(sesion: str, causa, segundos: float, fragmento: bool = False, instante: float = None):
+    """
+    Anota un rerun de 'sesion' provocado por 'causa' (una clave o una
+    secuencia de claves) que tardó 'segundos'. Con varias claves, el rerun
+    cuenta en cada una. 'fragmento' indica que solo se volvió a ejecutar un
+    fragmento.
+    """
+    instante = time.monotonic() if instante is None else instante
+    claves = (causa,) if isinstance(causa, str) else tuple(dict.fromkeys(causa))
+    with _lock:
+        estado = _sesiones.get(sesion)
+        if estado is None:
+            estado = _sesiones[sesion] = {"eventos": deque(maxlen=MAX_EVENTOS_POR_SESION), "causas": set()}
+            while len(_sesiones) > MAX_SESIONES:
+                _sesiones.popitem(last=False)
+        else:
+            _sesiones.move_to_end(sesion)
+        for clave in claves:
+            datos = _por_causa.get(clave)
+            if datos is None:
+                datos = _por_causa[clave] = {"reruns": 0, "segundos": 0.0, "maximo": 0.0, "fragmento": 0, "sesiones": 0}
+            datos["reruns"] += 1
+            datos["segundos"] += segundos
+            datos["maximo"] = max(datos["maximo"], segundos)
+            datos["fragmento"] += fragmento
+            if clave not in estado["causas"]:
+                estado["causas"].add(clave)
+                datos["sesiones"] += 1
+        estado["eventos"].append((instante, claves, segundos))
+
+def interacciones(limite: int = 10) -> list:
+    """
+    Causas ordenadas de mayor a menor tiempo total de rerun:
+    [{"causa", "reruns", "reruns_fragmento", "sesiones", "ms_total", "ms_medio", "ms_maximo"}]
+    """
+    with _lock:
+        filas = [
+            {
+                "causa": causa,
+                "reruns": datos["reruns"],
+                "reruns_fragmento": datos["fragmento"],
+                "sesiones": datos["sesiones"],
+                "ms_total": datos["segundos"] * 1000,
+                "ms_medio": datos["segundos"] * 1000 / datos["reruns"],
+                "ms_maximo": datos["maximo"] * 1000,
+            }
+            for causa, datos in _por_causa.items()
+        ]
+    filas.sort(key=lambda fila: fila["ms_total"], reverse=True)
+    return filas[:limite]
+
+def tormentas(ventana: float = 60.0, umbral: int = 30, ahora: float = None) -> list:
+    """
+    Sesiones con al menos 'umbral' reruns en los últimos 'ventana' segundos:
+    [{"sesion", "reruns", "ms_total", "causas" [(causa, reruns)] de más a menos}]
+    """
+    ahora = time.monotonic() if ahora is None else ahora
+    with _lock:
+        recientes = {
+            sesion: [(claves, segundos) for instante, claves, segundos in estado["eventos"] if ahora - instante <= ventana]
+            for sesion, estado in _sesiones.items()
+        }
+    resultado = []
+    for sesion, eventos in recientes.items():
+        if len(eventos) < umbral:
+            continue
+        conteo = {}
+        for claves, _ in eventos:
+            for causa in claves:
+                conteo[causa] = conteo.get(causa, 0) + 1
+        resultado.append({
+            "sesion": sesion,
+            "reruns": len(eventos),
+            "ms_total": sum(segundos for _, segundos in eventos) * 1000,
+            "causas": sorted(conteo.items(), key=lambda par: par[1], reverse=True),
+        })
+    resultado.sort(key=lambda fila: fila["reruns"], reverse=True)
+    return resultado
+
+def resumen_por_causa() -> dict:
+    """
+    {causa: (reruns, segundos totales)} para la exportación de métricas.
+    """
+    with _lock:
+        return {causa: (datos["reruns"], datos["segundos"]) for causa, datos in _por_causa.items()}
+
+def reiniciar():
+    """Descarta todo lo acumulado."""
+    with _lock:
+        _por_causa.clear()
+        _sesiones.clear()
@@ -0,0 +1,334 @@
+"""
+Modo por lotes en línea de comandos: lee centros-semana de un CSV o JSONL
+y emite una fila de cumplimiento por cada fila de entrada.
+
+Todo el flujo son generadores, por lo que la memoria es constante sea cual
+sea el tamaño del fichero. Con --procesos N la entrada se reparte en lotes
+entre N procesos manteniendo el orden y un número acotado de lotes en vuelo.
+
+Formato de entrada (una fila por centro-semana):
+  - CSV:   columnas 'regimen', 'ocupacion', opcionalmente 'centro' y 'semana',
+           y una columna por categoría con sus horas semanales
+           (p. ej. 'Gerocultor', 'ATS/DUE (Enfermería)', 'Conductor/a').
+  - JSONL: los mismos campos; las horas pueden ir planas o bajo la clave "horas".
+
+Columnas adicionales opcionales:
+  --contratacion       plan de contratación de mínimo coste (ver
+                       ratios.contratacion): coste y EJC adicionales y horas a
+                       contratar por categoría; --costes indica un JSON
+                       {categoría: coste anual por EJC}.
+  --ocupacion-maxima   ocupación máxima admisible con la plantilla de la fila,
+                       plazas disponibles y comprobaciones limitantes (ver
+                       ratios.capacidad).
+
+Uso:
+  python -m ratios centros.csv -o resultados.jsonl --procesos 4
+  python -m ratios centros.csv -o plan.csv --contratacion --costes costes.json
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import math
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from ratios.calculo import CATEGORIAS, resolver_categoria
+from ratios.capacidad import ocupacion_maxima
+from ratios.contratacion import optimizar_contratacion
+from ratios.evaluacion import REGIMENES, CAMPOS_RESULTADO, evaluar_centro
+from ratios.reglas import normativas
+
+CAMPOS_IDENTIFICACION = ("centro", "semana", "regimen", "ocupacion")
+CAMPOS_SALIDA = CAMPOS_IDENTIFICACION + CAMPOS_RESULTADO + ("error",)
+CAMPOS_EXTRA = {
+    "contratacion": ("coste_contratacion", "ejc_contratacion") + tuple(f"contratar_{cat}" for cat in CATEGORIAS),
+    "capacidad": ("ocupacion_maxima", "plazas_disponibles", "limitantes"),
+}
+
+def campos_salida(extras: tuple = ()) -> tuple:
+    """
+    Columnas de salida con las de cada cálculo adicional ("contratacion", "capacidad").
+    """
+    return CAMPOS_SALIDA + tuple(campo for extra in extras for campo in CAMPOS_EXTRA[extra])
+
+# ----------------------------------------------------------------
+# LECTURA
+# ----------------------------------------------------------------
+def _formato(ruta: str, formato: str = None) -> str:
+    if formato:
+        return formato
+    return "jsonl" if ruta.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+def leer_filas(fichero, formato: str):
+    """
+    Genera diccionarios crudos (uno por fila) a partir de un fichero abierto.
+    """
+    if formato == "csv":
+        yield from csv.DictReader(fichero)
+    else:
+        for linea in fichero:
+            if linea.strip():
+                yield fila_jsonl(linea)
+
+def fila_jsonl(linea) -> dict:
+    """
+    Interpreta una línea JSONL. Si no es JSON válido o no es un objeto
+    devuelve {"error": ...}, que evaluar_fila() deja en la posición de la
+    fila en lugar de detener el lote.
+    """
+    try:
+        fila = json.loads(linea)
+    except ValueError as e:
+        return {"error": f"JSON no válido ({e})"}
+    return fila if isinstance(fila, dict) else {"error": "Se esperaba un objeto JSON"}
+
+def _a_float(valor) -> float:
+    """
+    Convierte una celda a float; vacío = 0 y admite coma decimal ('37,5').
+    Lanza ValueError si el valor no es finito (p. ej. '1e400').
+    """
+    if valor is None or valor == "":
+        return 0.0
+    try:
+        numero = float(valor)
+    except ValueError:
+        numero = float(valor.replace(",", "."))
+    if not math.isfinite(numero):
+        raise ValueError(f"Valor no finito: {valor!r}")
+    return numero
+
+def _a_entero(valor, campo: str) -> int:
+    """
+    Convierte una celda a entero; admite '60' o '60.0', pero no decimales
+    ('60.5') ni valores no finitos, que darían una ocupación inventada.
+    """
+    try:
+        numero = _a_float(valor)
+    except ValueError:
+        numero = math.nan
+    if not numero.is_integer():
+        raise ValueError(f"'{campo}' debe ser un número entero (recibido {valor!r})")
+    return int(numero)
+
+def normalizar_fila(fila: dict, regimen_defecto: str = None) -> dict:
+    """
+    Extrae régimen, ocupación y horas por categoría de una fila cruda; las
+    categorías son las del paquete de reglas del régimen (todas si el
+    régimen no tiene paquete). Las horas van en columnas con el nombre
+    exacto de cada categoría o en un objeto "horas", cuyas claves se
+    reconocen sin distinguir mayúsculas ni tildes (resolver_categoria).
+    Lanza ValueError si la fila no es un objeto, la ocupación no es entera
+    o "horas" no es un objeto de categorías conocidas.
+    """
+    if not isinstance(fila, dict):
+        raise ValueError("Se esperaba un objeto con los datos del centro")
+    regimen = fila.get("regimen") or regimen_defecto
+    plan = normativas().get(regimen) if isinstance(regimen, str) else None
+    categorias = plan.categorias if plan is not None else CATEGORIAS
+    if "horas" in fila:
+        horas = _horas_de_objeto(fila["horas"], categorias)
+    else:
+        horas = {cat: _a_float(fila[cat]) for cat in categorias if cat in fila}
+    return {
+        "centro": fila.get("centro", ""),
+        "semana": fila.get("semana", ""),
+        "regimen": regimen,
+        "ocupacion": _a_entero(fila.get("ocupacion"), "ocupacion"),
+        "horas": horas,
+    }
+
+def _horas_de_objeto(horas_origen, categorias: tuple) -> dict:
+    """
+    {categoría: horas} de un objeto "horas"; las categorías reconocidas que
+    no usa el régimen se ignoran, como en las filas planas.
+    """
+    if not isinstance(horas_origen, dict):
+        raise ValueError(f"'horas' debe ser un objeto {{categoría: horas semanales}} (recibido {type(horas_origen).__name__})")
+    horas = {}
+    for nombre, valor in horas_origen.items():
+        categoria = nombre if nombre in categorias else resolver_categoria(str(nombre))
+        if categoria is None:
+            raise ValueError(f"Categoría desconocida en 'horas': '{nombre}'")
+        if categoria in horas:
+            raise ValueError(f"Categoría repetida en 'horas': '{nombre}' ({categoria})")
+        if categoria in categorias:
+            horas[categoria] = _a_float(valor)
+    return horas
+
+# ----------------------------------------------------------------
+# EVALUACIÓN
+# ----------------------------------------------------------------
+def evaluar_fila(fila: dict, regimen_defecto: str = None, extras: tuple = (), costes: dict = None) -> dict:
+    """
+    Evalúa una fila cruda. Los errores de datos no detienen el lote:
+    se informan en la columna 'error' de esa fila (también las líneas JSONL
+    que no se pudieron leer, ver fila_jsonl).
+    """
+    if not isinstance(fila, dict):
+        return {**dict.fromkeys(CAMPOS_IDENTIFICACION, ""), "error": "Se esperaba un objeto con los datos del centro"}
+    # Eco de la entrada; un 1e400 de JSON llega como inf y no se puede volver a escribir en JSON
+    salida = {
+        campo: str(valor) if isinstance(valor, float) and not math.isfinite(valor) else valor
+        for campo, valor in ((campo, fila.get(campo, "")) for campo in CAMPOS_IDENTIFICACION)
+    }
+    if list(fila) == ["error"]:
+        salida["error"] = fila["error"]
+        return salida
+    try:
+        centro = normalizar_fila(fila, regimen_defecto)
+        salida.update(centro)
+        del salida["horas"]
+        salida.update(evaluar_centro(centro["regimen"], centro["ocupacion"], centro["horas"]))
+        if "contratacion" in extras:
+            plan = optimizar_contratacion(centro["regimen"], centro["ocupacion"], centro["horas"], costes)
+            salida["coste_contratacion"] = plan["coste_adicional"]
+            salida["ejc_contratacion"] = plan["ejc_adicional"]
+            for cat, h in plan["horas_adicionales"].items():
+                salida[f"contratar_{cat}"] = h
+        if "capacidad" in extras:
+            capacidad = ocupacion_maxima(centro["regimen"], centro["horas"])
+            salida["ocupacion_maxima"] = capacidad["ocupacion_maxima"]
+            salida["plazas_disponibles"] = max(capacidad["ocupacion_maxima"] - centro["ocupacion"], 0)
+            salida["limitantes"] = " ".join(capacidad["limitantes"])
+    except (ValueError, TypeError, KeyError, OverflowError) as e:
+        salida["error"] = str(e)
+    return salida
+
+def _trocear(iterable, tam: int):
+    it = iter(iterable)
+    while True:
+        trozo = list(itertools.islice(it, tam))
+        if not trozo:
+            return
+        yield trozo
+
+def evaluar_flujo(filas, regimen_defecto: str = None, extras: tuple = (), costes: dict = None):
+    """
+    Genera un resultado por fila de entrada, en el mismo orden.
+    """
+    for fila in filas:
+        yield evaluar_fila(fila, regimen_defecto, extras, costes)
+
+# ----------------------------------------------------------------
+# PROCESAMIENTO POR TROZOS (serie o pool de procesos)
+# ----------------------------------------------------------------
+def _leer_trozos(fichero, formato: str, tam: int):
+    """
+    Genera (cabecera, trozo) con filas aún sin interpretar: listas de celdas
+    en CSV o líneas de texto en JSONL. Así el proceso principal solo lee y
+    escribe, y el coste de interpretar/serializar se reparte entre procesos.
+    """
+    if formato == "csv":
+        reader = csv.reader(fichero)
+        cabecera = next(reader, None)
+        for trozo in _trocear(reader, tam):
+            yield cabecera, trozo
+    else:
+        for trozo in _trocear(fichero, tam):
+            yield None, trozo
+
+def _serializar(resultados, formato: str, extras: tuple = ()) -> str:
+    buffer = io.StringIO()
+    if formato == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=campos_salida(extras), restval="", extrasaction="ignore")
+        writer.writerows(resultados)
+    else:
+        for fila in resultados:
+            buffer.write(json.dumps(fila, ensure_ascii=False) + "\n")
+    return buffer.getvalue()
+
+def _procesar_trozo(cabecera, trozo: list, formato_salida: str, regimen_defecto: str = None,
+                    extras: tuple = (), costes: dict = None):
+    """
+    Interpreta, evalúa y serializa un trozo. Devuelve (texto, nº de filas).
+    """
+    if cabecera is not None:
+        filas = [dict(zip(cabecera, celdas)) for celdas in trozo]
+    else:
+        filas = [fila_jsonl(linea) for linea in trozo if linea.strip()]
+    resultados = evaluar_flujo(filas, regimen_defecto, extras, costes)
+    return _serializar(resultados, formato_salida, extras), len(filas)
+
+def procesar(entrada, salida, formato_entrada: str, formato_salida: str,
+             regimen_defecto: str = None, procesos: int = 1, tam_lote: int = 1000,
+             extras: tuple = (), costes: dict = None) -> int:
+    """
+    Lee, evalúa y escribe en flujo. Con procesos > 1 reparte los trozos entre
+    procesos manteniendo el orden y como mucho 2 trozos en vuelo por proceso,
+    de modo que la memoria queda acotada. Devuelve el número de filas.
+    """
+    if formato_salida == "csv":
+        csv.writer(salida).writerow(campos_salida(extras))
+    trozos = _leer_trozos(entrada, formato_entrada, tam_lote)
+    n = 0
+    if procesos <= 1:
+        for cabecera, trozo in trozos:
+            texto, filas = _procesar_trozo(cabecera, trozo, formato_salida, regimen_defecto, extras, costes)
+            salida.write(texto)
+            n += filas
+        return n
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        en_vuelo = deque()
+        for cabecera, trozo in trozos:
+            en_vuelo.append(pool.submit(
+                _procesar_trozo, cabecera, trozo, formato_salida, regimen_defecto, extras, costes
+            ))
+            if len(en_vuelo) >= 2 * procesos:
+                texto, filas = en_vuelo.popleft().result()
+                salida.write(texto)
+                n += filas
+        while en_vuelo:
+            texto, filas = en_vuelo.popleft().result()
+            salida.write(texto)
+            n += filas
+    return n
+
+# ----------------------------------------------------------------
+# PUNTO DE ENTRADA
+# ----------------------------------------------------------------
+def construir_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m ratios",
+        description="Cálculo de cumplimiento de ratios por lotes (CSV/JSONL)."
+    )
+    parser.add_argument("entrada", help="Fichero CSV o JSONL de centros-semana ('-' para stdin).")
+    parser.add_argument("-o", "--salida", default="-", help="Fichero de resultados ('-' para stdout).")
+    parser.add_argument("--formato-entrada", choices=("csv", "jsonl"), help="Por defecto, según la extensión.")
+    parser.add_argument("--formato-salida", choices=("csv", "jsonl"), help="Por defecto, según la extensión.")
+    parser.add_argument("--regimen", choices=REGIMENES, help="Régimen para las filas sin columna 'regimen'.")
+    parser.add_argument("--procesos", type=int, default=1, help="Procesos en paralelo (1 = sin pool).")
+    parser.add_argument("--tam-lote", type=int, default=1000, help="Filas por lote enviado a cada proceso.")
+    parser.add_argument("--contratacion", action="store_true", help="Añadir el plan de contratación de mínimo coste.")
+    parser.add_argument("--costes", help="JSON {categoría: coste anual por EJC} para --contratacion.")
+    parser.add_argument("--ocupacion-maxima", action="store_true",
+                        help="Añadir la ocupación máxima admisible con la plantilla de cada fila.")
+    return parser
+
+def main(argv=None) -> int:
+    args = construir_parser().parse_args(argv)
+    formato_entrada = _formato(args.entrada, args.formato_entrada)
+    formato_salida = _formato(args.salida, args.formato_salida)
+    extras = tuple(
+        extra for extra, activo in (("contratacion", args.contratacion), ("capacidad", args.ocupacion_maxima)) if activo
+    )
+    costes = None
+    if args.costes:
+        with open(args.costes, encoding="utf-8") as f:
+            costes = json.load(f)
+    entrada = sys.stdin if args.entrada == "-" else open(args.entrada, newline="", encoding="utf-8")
+    salida = sys.stdout if args.salida == "-" else open(args.salida, "w", newline="", encoding="utf-8")
+    try:
+        n = procesar(
+            entrada, salida, formato_entrada, formato_salida,
+            args.regimen, args.procesos, args.tam_lote, extras, costes
+        )
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+        if salida is not sys.stdout:
+            salida.close()
+    print(f"{n} filas procesadas.", file=sys.stderr)
+    return 0
@@ -0,0 +1,215 @@
+"""
+Plan de contratación de mínimo coste: horas semanales adicionales por
+categoría, al menor coste anual, que hacen cumplir a la vez todas las
+comprobaciones de un régimen.
+
+Cada régimen se modela con:
+  - mínimos por categoría (horas/semana): fisioterapia/TO, enfermería
+    168 h, médico 5 h, trabajador social > 0, gerocultores (0,33 EJC/res.
+    en CAM AM, 225 h por cada 35 usuarios en centros de día) y los mínimos
+    del Ayuntamiento;
+  - coberturas de grupo: un conjunto de categorías cuya suma de horas
+    debe alcanzar un valor (ratios de atención directa / no directa,
+    gerocultores + aux. ruta).
+Todos los umbrales salen de los parámetros de la normativa (ratios.reglas).
+
+Primero se cubren los mínimos por categoría; lo que falte en cada grupo es
+un programa lineal de cobertura con, como mucho, tres restricciones, que se
+resuelve de forma exacta enumerando sus vértices (cada hora adicional se
+asigna a la categoría más barata de las que cubren los mismos grupos). Un
+centro se resuelve en bastante menos de un milisegundo.
+"""
+import itertools
+import math
+
+from ratios.calculo import (
+    HORAS_ANUALES_JORNADA_COMPLETA, SEMANAS_AL_ANO,
+    CATEGORIAS_DIRECTAS, CATEGORIAS_NO_DIRECTAS, CATEGORIAS_CAM_CD, CATEGORIAS_CD_TODAS, CATEGORIAS_AYTO,
+    calcular_equivalentes_jornada_completa, calcular_horas_fisio_to_residencia, calcular_orden2680,
+    calcular_horas_gerocultores_cam, calcular_minimos_ayuntamiento, coste_por_persona, parametro,
+)
+from ratios.evaluacion import evaluar_centro
+
+# Resolución de las horas propuestas (horas/semana)
+PASO_HORAS = 0.01
+
+# A igual coste y horas actuales, categorías preferidas para cubrir las ratios
+PRIORIDAD_EMPATE = ("Gerocultor", "Limpieza")
+
+_TOLERANCIA = 1e-9
+
+def _horas_por_ejc(ejc: float) -> float:
+    """
+    Horas semanales equivalentes a 'ejc' (inversa de calcular_equivalentes_jornada_completa).
+    """
+    return ejc * HORAS_ANUALES_JORNADA_COMPLETA / SEMANAS_AL_ANO
+
+# ----------------------------------------------------------------
+# MODELOS POR RÉGIMEN
+# ----------------------------------------------------------------
+def _modelo_orden2680(ocupacion: int, paso: float):
+    ejc_requerido = calcular_orden2680(ocupacion, {})["ejc_requerido"]
+    return CATEGORIAS_DIRECTAS, {}, [(CATEGORIAS_DIRECTAS, _horas_por_ejc(ejc_requerido))]
+
+def _modelo_cam_am(ocupacion: int, paso: float):
+    horas_terapia = calcular_horas_fisio_to_residencia(ocupacion)
+    minimos = {
+        "Gerocultor": _horas_por_ejc(parametro("cam_am", "ratio_min_gero") * ocupacion),
+        "Fisioterapeuta": horas_terapia,
+        "Terapeuta Ocupacional": horas_terapia,
+        "Trabajador Social": paso,
+        "Médico": parametro("cam_am", "horas_min_medico"),
+        "ATS/DUE (Enfermería)": parametro("cam_am", "horas_min_enfermeria"),
+    }
+    grupos = [
+        (CATEGORIAS_DIRECTAS, _horas_por_ejc(parametro("cam_am", "ratio_min_directa") * ocupacion)),
+        (CATEGORIAS_NO_DIRECTAS, _horas_por_ejc(parametro("cam_am", "ratio_min_no_directa") * ocupacion)),
+    ]
+    return CATEGORIAS_DIRECTAS + CATEGORIAS_NO_DIRECTAS, minimos, grupos
+
+def _modelo_cam_cd(ocupacion: int, paso: float):
+    minimos = {"Gerocultor": calcular_horas_gerocultores_cam(ocupacion)}
+    return CATEGORIAS_CAM_CD, minimos, [(CATEGORIAS_CAM_CD, _horas_por_ejc(parametro("cam_cd", "ratio_min_directa") * ocupacion))]
+
+def _modelo_ayuntamiento(ocupacion: int, paso: float):
+    return CATEGORIAS_AYTO, calcular_minimos_ayuntamiento(ocupacion), []
+
+def _modelo_cam_ayto(ocupacion: int, paso: float):
+    grupos = [
+        (CATEGORIAS_CAM_CD, _horas_por_ejc(parametro("cam_ayto", "ratio_min_directa") * ocupacion)),
+        (("Gerocultor", "Gerocultor (aux. ruta)"), calcular_horas_gerocultores_cam(ocupacion, "cam_ayto")),
+    ]
+    return CATEGORIAS_CD_TODAS, calcular_minimos_ayuntamiento(ocupacion, "cam_ayto"), grupos
+
+MODELOS = {
+    "orden2680": _modelo_orden2680,
+    "cam_am": _modelo_cam_am,
+    "cam_cd": _modelo_cam_cd,
+    "ayuntamiento": _modelo_ayuntamiento,
+    "cam_ayto": _modelo_cam_ayto,
+}
+
+# ----------------------------------------------------------------
+# RESOLUCIÓN
+# ----------------------------------------------------------------
+def _resolver_sistema(filas: list, b: list):
+    """
+    Resuelve un sistema cuadrado pequeño por eliminación gaussiana; None si es singular.
+    """
+    n = len(b)
+    m = [list(fila) + [valor] for fila, valor in zip(filas, b)]
+    for col in range(n):
+        pivote = max(range(col, n), key=lambda i: abs(m[i][col]))
+        if abs(m[pivote][col]) < _TOLERANCIA:
+            return None
+        m[col], m[pivote] = m[pivote], m[col]
+        for i in range(n):
+            if i != col and m[i][col]:
+                factor = m[i][col] / m[col][col]
+                m[i] = [a - factor * p for a, p in zip(m[i], m[col])]
+    return [m[i][n] / m[i][i] for i in range(n)]
+
+def resolver_cobertura(deficits: list, patrones: list, precios: list) -> list:
+    """
+    Mínimo de sum(precios[j] * y[j]) con y >= 0 y, para cada grupo g,
+    sum(y[j] para los j con g en patrones[j]) >= deficits[g].
+    Enumera las soluciones básicas (hay pocas: a lo sumo 3 grupos).
+    Lanza ValueError si algún grupo no se puede cubrir.
+    """
+    k = len(deficits)
+    mejor, mejor_coste = None, math.inf
+    for tam in range(1, k + 1):
+        for base in itertools.combinations(range(len(patrones)), tam):
+            for tensas in itertools.combinations(range(k), tam):
+                filas = [[1.0 if g in patrones[j] else 0.0 for j in base] for g in tensas]
+                y_base = _resolver_sistema(filas, [deficits[g] for g in tensas])
+                if y_base is None or min(y_base) < -_TOLERANCIA:
+                    continue
+                y = [0.0] * len(patrones)
+                for j, valor in zip(base, y_base):
+                    y[j] = max(valor, 0.0)
+                cubre = all(
+                    sum(y[j] for j, patron in enumerate(patrones) if g in patron) >= deficits[g] - _TOLERANCIA
+                    for g in range(k)
+                )
+                coste = sum(p * v for p, v in zip(precios, y))
+                if cubre and coste < mejor_coste:
+                    mejor, mejor_coste = y, coste
+    if mejor is None:
+        raise ValueError("No hay categorías que permitan cubrir todas las ratios del régimen.")
+    return mejor
+
+def _coste_hora(costes: dict, cat: str) -> float:
+    """
+    Coste anual de una hora semanal adicional de la categoría.
+    """
+    return calcular_equivalentes_jornada_completa(1.0) * (costes or {}).get(cat, coste_por_persona())
+
+def optimizar_contratacion(regimen: str, ocupacion: int, horas: dict, costes: dict = None,
+                           paso: float = PASO_HORAS) -> dict:
+    """
+    Horas adicionales de mínimo coste para cumplir todas las comprobaciones
+    del régimen.
+
+    :param horas: horas semanales actuales por categoría (como evaluar_centro).
+    :param costes: coste anual por EJC de cada categoría (por defecto, coste_por_persona()).
+    :param paso: resolución de las horas propuestas (se redondea hacia arriba).
+    :return: {"regimen", "ocupacion", "cumple_actual", "horas_adicionales" {cat: h},
+              "ejc_adicional", "coste_adicional", "horas_resultantes", "cumple"}
+    Lanza ValueError si el régimen no tiene modelo o la ocupación no es mayor que 0.
+    """
+    modelo = MODELOS.get(regimen)
+    if modelo is None:
+        raise ValueError(f"No hay plan de contratación para el régimen '{regimen}'. Opciones: {', '.join(MODELOS)}")
+    cumple_actual = evaluar_centro(regimen, ocupacion, horas)["cumple"]
+    categorias, minimos, grupos = modelo(ocupacion, paso)
+    actuales = {cat: horas.get(cat, 0.0) for cat in categorias}
+    adicionales = {cat: max(minimos.get(cat, 0.0) - actuales[cat], 0.0) for cat in categorias}
+
+    # Grupos que siguen sin cubrirse tras los mínimos por categoría
+    activos = []
+    for cats, requerido in grupos:
+        deficit = requerido - sum(actuales[c] + adicionales[c] for c in cats)
+        if deficit > _TOLERANCIA:
+            activos.append((set(cats), deficit))
+    if activos:
+        # Por cada combinación de grupos cubiertos, solo interesa la categoría más
+        # barata; a igual coste, la que ya tiene más horas (la plantilla habitual)
+        def preferencia(cat):
+            prioridad = PRIORIDAD_EMPATE.index(cat) if cat in PRIORIDAD_EMPATE else len(PRIORIDAD_EMPATE)
+            return _coste_hora(costes, cat), -actuales[cat], prioridad
+
+        mas_barata = {}
+        for cat in categorias:
+            patron = frozenset(g for g, (cats, _) in enumerate(activos) if cat in cats)
+            if patron and (patron not in mas_barata or preferencia(cat) < preferencia(mas_barata[patron])):
+                mas_barata[patron] = cat
+        patrones = list(mas_barata)
+        y = resolver_cobertura(
+            [deficit for _, deficit in activos], patrones,
+            [_coste_hora(costes, mas_barata[p]) for p in patrones]
+        )
+        for patron, valor in zip(patrones, y):
+            adicionales[mas_barata[patron]] += valor
+
+    adicionales = {cat: math.ceil(h / paso - _TOLERANCIA) * paso for cat, h in adicionales.items()}
+    resultantes = {**horas, **{cat: actuales[cat] + adicionales[cat] for cat in categorias}}
+    cumple = evaluar_centro(regimen, ocupacion, resultantes)["cumple"]
+    if not cumple:
+        # Solo por redondeo en el límite: un paso más en las categorías propuestas
+        for cat in categorias:
+            if adicionales[cat] > 0:
+                adicionales[cat] += paso
+                resultantes[cat] += paso
+        cumple = evaluar_centro(regimen, ocupacion, resultantes)["cumple"]
+    adicionales = {cat: h for cat, h in adicionales.items() if h > 0}
+    return {
+        "regimen": regimen,
+        "ocupacion": ocupacion,
+        "cumple_actual": cumple_actual,
+        "horas_adicionales": adicionales,
+        "ejc_adicional": sum(calcular_equivalentes_jornada_completa(h) for h in adicionales.values()),
+        "coste_adicional": sum(h * _coste_hora(costes, cat) for cat, h in adicionales.items()),
+        "horas_resultantes": resultantes,
+        "cumple": cumple,
+    }
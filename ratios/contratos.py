@@ -0,0 +1,355 @@
+"""
+Maestro de contratos: horas semanales contratadas por categoría para
+cualquier centro y cualquier semana, para recalcular ratios históricos sin
+agregar las horas a mano.
+
+Cada contrato tiene centro, categoría, horas semanales y fechas de inicio y
+fin (ambas incluidas; sin fin = indefinido). Una semana cuenta las horas de
+cada contrato en proporción a los días que estuvo vigente en ella (un alta
+en miércoles aporta 5/7 de sus horas).
+
+Índice por intervalo de fechas: por centro se guarda la función escalonada
+"horas contratadas vigentes" (un escalón por cada alta o baja, ordenados
+por fecha) junto con su integral acumulada hasta cada escalón. Las horas de
+cualquier periodo salen de dos búsquedas binarias (integral al final menos
+integral al inicio), sin recorrer los contratos: O(log n) por consulta
+frente a O(n) de un recorrido. Las horas se guardan en centésimas enteras,
+así que las sumas son exactas (resultado con 2 decimales).
+
+Las ausencias (bajas, vacaciones, permisos; ver ratios.ausencias) se
+descuentan como tramos de horas negativas en el mismo índice, de modo que
+las consultas devuelven horas efectivas con el mismo coste.
+
+Uso:
+  python -m ratios.contratos contratos.csv --desde 2024-01-01 --hasta 2024-12-31 -o horas.csv
+  python -m ratios.contratos contratos.csv --desde 2024-01-01 --hasta 2024-03-31 \\
+      --regimen orden2680 --ocupacion plazas.csv --evaluar -o historico.csv
+  python -m ratios.contratos contratos.csv --desde 2024-01-01 --hasta 2024-12-31 \\
+      --ausencias ausencias.csv -o horas_efectivas.csv
+"""
+import argparse
+import csv
+import itertools
+import json
+import sys
+from bisect import bisect_right
+from datetime import date, timedelta
+
+from ratios.calculo import CATEGORIAS
+from ratios.cli import _a_float, _formato, _serializar, campos_salida, evaluar_flujo
+from ratios.evaluacion import REGIMENES
+from ratios.fichajes import CAMPOS_HORAS, _serializar_horas, filas_centros, leer_ocupacion, resolver_categoria
+
+_POSICION = {cat: i for i, cat in enumerate(CATEGORIAS)}
+
+_CEROS = (0,) * len(CATEGORIAS)
+
+# Horas que tiene una semana: ningún contrato puede superarlas
+MAX_HORAS_SEMANALES = 7 * 24
+
+def lunes_de(dia: date) -> date:
+    """Lunes de la semana de 'dia'."""
+    return dia - timedelta(days=dia.weekday())
+
+# ----------------------------------------------------------------
+# ÍNDICE
+# ----------------------------------------------------------------
+def validar_contrato(contrato: dict):
+    """
+    Lanza ValueError si el contrato no es válido (categoría desconocida,
+    sin fecha de inicio, horas negativas o por encima de las de una semana,
+    o fin anterior al inicio).
+    """
+    if contrato["categoria"] not in _POSICION:
+        raise ValueError(f"Categoría desconocida '{contrato['categoria']}'")
+    if contrato["inicio"] is None:
+        raise ValueError("Falta la fecha de inicio")
+    if contrato["horas"] < 0:
+        raise ValueError("Las horas semanales de un contrato no pueden ser negativas")
+    if contrato["horas"] > MAX_HORAS_SEMANALES:
+        raise ValueError(f"Las horas semanales de un contrato no pueden superar {MAX_HORAS_SEMANALES} "
+                         f"(recibido {contrato['horas']})")
+    if contrato["fin"] is not None and contrato["fin"] < contrato["inicio"]:
+        raise ValueError(f"El contrato termina ({contrato['fin']}) antes de empezar ({contrato['inicio']})")
+
+class _IndiceCentro:
+    """
+    Función escalonada de las horas contratadas de un centro (en
+    centésimas de hora por categoría), menos los tramos descontados, y su
+    integral acumulada en centésimas·día.
+    """
+    __slots__ = ("fechas", "niveles", "acumulados")
+
+    def __init__(self, contratos: list, descuentos: list = ()):
+        eventos = {}  # ordinal -> [(posición de la categoría, variación)]
+        for contrato, signo in itertools.chain(((c, 1) for c in contratos), ((d, -1) for d in descuentos)):
+            i = _POSICION[contrato["categoria"]]
+            centesimas = signo * round(contrato["horas"] * 100)
+            eventos.setdefault(contrato["inicio"].toordinal(), []).append((i, centesimas))
+            if contrato["fin"] is not None:
+                eventos.setdefault(contrato["fin"].toordinal() + 1, []).append((i, -centesimas))
+        self.fechas = sorted(eventos)
+        self.niveles = []
+        self.acumulados = []
+        nivel = list(_CEROS)
+        acumulado = _CEROS
+        anterior = None
+        for fecha in self.fechas:
+            if anterior is not None:
+                dias = fecha - anterior
+                acumulado = tuple(a + v * dias for a, v in zip(acumulado, nivel))
+            for i, variacion in eventos[fecha]:
+                nivel[i] += variacion
+            self.niveles.append(tuple(nivel))
+            self.acumulados.append(acumulado)
+            anterior = fecha
+
+    def integral(self, ordinal: int) -> tuple:
+        """
+        Centésimas·día de cada categoría desde el primer alta hasta el día
+        'ordinal' (sin incluirlo).
+        """
+        i = bisect_right(self.fechas, ordinal) - 1
+        if i < 0:
+            return _CEROS
+        dias = ordinal - self.fechas[i]
+        return tuple(a + v * dias for a, v in zip(self.acumulados[i], self.niveles[i]))
+
+class Contratos:
+    """
+    Contratos indexados por centro e intervalo de fechas.
+
+        maestro = Contratos(leer_contratos(f)["contratos"])
+        maestro.horas_semana("Residencia Norte", date(2024, 3, 4))
+        -> {"Gerocultor": 1215.0, "ATS/DUE (Enfermería)": 190.71, ...}
+
+    Cada contrato es un dict {"centro", "categoria" (de CATEGORIAS), "horas"
+    (semanales), "inicio" (date), "fin" (date o None)} y opcionalmente
+    "empleado" (para descontar sus ausencias). El índice de un centro se
+    construye en su primera consulta y se rehace si se le añaden contratos
+    o descuentos.
+    """
+
+    def __init__(self, contratos=()):
+        self._contratos = {}   # centro -> [contrato]
+        self._descuentos = {}  # centro -> [tramo con la forma de un contrato]
+        self._indices = {}     # centro -> _IndiceCentro
+        self.agregar(contratos)
+
+    def agregar(self, contratos):
+        """
+        Añade contratos. Lanza ValueError si alguno no es válido
+        (validar_contrato).
+        """
+        for contrato in contratos:
+            validar_contrato(contrato)
+            self._contratos.setdefault(contrato["centro"], []).append(contrato)
+            self._indices.pop(contrato["centro"], None)
+
+    def descontar(self, tramos):
+        """
+        Resta horas: cada tramo tiene la forma de un contrato (centro,
+        categoría, horas semanales, inicio, fin) y se descuenta de las horas
+        de su centro en esas fechas (ratios.ausencias.tramos_ausencia).
+        Lanza ValueError si alguno no es válido (validar_contrato).
+        """
+        for tramo in tramos:
+            validar_contrato(tramo)
+            self._descuentos.setdefault(tramo["centro"], []).append(tramo)
+            self._indices.pop(tramo["centro"], None)
+
+    def __len__(self) -> int:
+        return sum(len(contratos) for contratos in self._contratos.values())
+
+    def __iter__(self):
+        for contratos in self._contratos.values():
+            yield from contratos
+
+    def centros(self) -> list:
+        """Centros con algún contrato, ordenados."""
+        return sorted(self._contratos)
+
+    def _indice(self, centro: str):
+        indice = self._indices.get(centro)
+        if indice is None and centro in self._contratos:
+            indice = self._indices[centro] = _IndiceCentro(self._contratos[centro], self._descuentos.get(centro, ()))
+        return indice
+
+    def horas_periodo(self, centro: str, inicio: date, fin: date) -> dict:
+        """
+        Horas semanales medias por categoría entre 'inicio' y 'fin' (ambos
+        incluidos): {categoría: horas} con las categorías que tienen horas.
+        Lanza ValueError si el periodo está vacío.
+        """
+        if fin < inicio:
+            raise ValueError(f"El periodo termina ({fin}) antes de empezar ({inicio})")
+        indice = self._indice(centro)
+        if indice is None:
+            return {}
+        desde, hasta = inicio.toordinal(), fin.toordinal() + 1
+        dias = hasta - desde
+        totales = (b - a for a, b in zip(indice.integral(desde), indice.integral(hasta)))
+        return {cat: round(total / dias / 100, 2) for cat, total in zip(CATEGORIAS, totales) if total}
+
+    def horas_semana(self, centro: str, semana: date) -> dict:
+        """
+        Horas por categoría de la semana (de lunes a domingo) que contiene
+        'semana', prorrateando los contratos vigentes solo parte de ella.
+        """
+        lunes = lunes_de(semana)
+        return self.horas_periodo(centro, lunes, lunes + timedelta(days=6))
+
+    def horas_por_semana(self, desde: date, hasta: date, centros=None) -> dict:
+        """
+        {(centro, lunes): {categoría: horas}} de todas las semanas entre
+        'desde' y 'hasta', en el formato de ratios.fichajes.agregar_turnos
+        (para filas_centros). De cada centro se incluyen las semanas entre
+        su primer alta y su última baja, aunque las ausencias dejen alguna
+        sin horas.
+        """
+        horas = {}
+        for centro in (centros if centros is not None else self.centros()):
+            contratos = self._contratos.get(centro)
+            if not contratos:
+                continue
+            primera = min(contrato["inicio"] for contrato in contratos)
+            ultima = None if any(c["fin"] is None for c in contratos) else max(c["fin"] for c in contratos)
+            lunes = lunes_de(max(desde, primera))
+            while lunes <= hasta and (ultima is None or lunes <= ultima):
+                horas[(centro, lunes)] = self.horas_semana(centro, lunes)
+                lunes += timedelta(days=7)
+        return horas
+
+# ----------------------------------------------------------------
+# LECTURA
+# ----------------------------------------------------------------
+def _fecha(texto: str):
+    texto = (texto or "").strip()
+    return date.fromisoformat(texto[:10]) if texto else None
+
+def leer_contratos(fichero, formato: str = "csv", alias: dict = None) -> dict:
+    """
+    Lee contratos de un CSV o JSONL con 'centro', 'categoria',
+    'horas_semanales' (u 'horas'), 'fecha_inicio', 'fecha_fin' (ISO; vacía
+    si es indefinido) y 'empleado' (opcional, para las ausencias). La
+    categoría se resuelve como en ratios.fichajes.
+    :return: {"contratos": [...], "descartados": [(fila, motivo)],
+              "categorias_desconocidas": {nombre: contratos}}
+    """
+    # Las líneas JSONL se decodifican fila a fila: una línea dañada se descarta
+    filas = csv.DictReader(fichero) if formato == "csv" else (linea for linea in fichero if linea.strip())
+    contratos = []
+    descartados = []
+    desconocidas = {}
+    for numero, fila in enumerate(filas, start=1):
+        try:
+            if formato != "csv":
+                fila = json.loads(fila)
+            if not isinstance(fila, dict):
+                raise ValueError("Se esperaba un objeto JSON")
+            nombre = str(fila.get("categoria") or "")
+            categoria = resolver_categoria(nombre, alias)
+            if categoria is None:
+                desconocidas[nombre] = desconocidas.get(nombre, 0) + 1
+                continue
+            contrato = {
+                "centro": str(fila.get("centro") or ""),
+                "empleado": str(fila.get("empleado") or ""),
+                "categoria": categoria,
+                "horas": _a_float(fila.get("horas_semanales", fila.get("horas"))),
+                "inicio": _fecha(fila.get("fecha_inicio")),
+                "fin": _fecha(fila.get("fecha_fin")),
+            }
+            validar_contrato(contrato)
+        except (ValueError, TypeError, AttributeError) as e:
+            descartados.append((numero, str(e)))
+            continue
+        contratos.append(contrato)
+    return {"contratos": contratos, "descartados": descartados, "categorias_desconocidas": desconocidas}
+
+# ----------------------------------------------------------------
+# LÍNEA DE COMANDOS
+# ----------------------------------------------------------------
+def construir_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m ratios.contratos",
+        description="Horas semanales contratadas por centro y categoría, semana a semana."
+    )
+    parser.add_argument("entrada", help="Fichero CSV o JSONL de contratos.")
+    parser.add_argument("--desde", type=date.fromisoformat, required=True, help="Primera semana (AAAA-MM-DD).")
+    parser.add_argument("--hasta", type=date.fromisoformat, required=True, help="Última semana (AAAA-MM-DD).")
+    parser.add_argument("-o", "--salida", default="-", help="Fichero de resultados ('-' para stdout).")
+    parser.add_argument("--formato-entrada", choices=("csv", "jsonl"), help="Por defecto, según la extensión.")
+    parser.add_argument("--formato-salida", choices=("csv", "jsonl"), help="Por defecto, según la extensión.")
+    parser.add_argument("--centros", nargs="+", help="Centros a incluir (por defecto, todos).")
+    parser.add_argument("--alias", help="JSON {nombre en el maestro: categoría de la aplicación}.")
+    parser.add_argument("--ausencias", help="CSV o JSONL de ausencias a descontar (ver ratios.ausencias).")
+    parser.add_argument("--tipos-ausencia", nargs="+", help="Descontar solo estos tipos de ausencia.")
+    parser.add_argument("--regimen", choices=REGIMENES, help="Régimen de las filas de salida.")
+    parser.add_argument("--ocupacion", help="CSV con 'centro', 'ocupacion' y opcionalmente 'semana'.")
+    parser.add_argument("--evaluar", action="store_true",
+                        help="Evaluar el cumplimiento de cada centro-semana (requiere --regimen y --ocupacion).")
+    return parser
+
+def main(argv=None) -> int:
+    args = construir_parser().parse_args(argv)
+    if args.evaluar and not (args.regimen and args.ocupacion):
+        print("--evaluar requiere --regimen y --ocupacion.", file=sys.stderr)
+        return 2
+    if args.hasta < args.desde:
+        print("--hasta es anterior a --desde.", file=sys.stderr)
+        return 2
+    formato_salida = _formato(args.salida, args.formato_salida)
+    alias = None
+    if args.alias:
+        with open(args.alias, encoding="utf-8") as f:
+            alias = json.load(f)
+    with open(args.entrada, newline="", encoding="utf-8") as f:
+        leido = leer_contratos(f, _formato(args.entrada, args.formato_entrada), alias)
+    ocupacion = None
+    if args.ocupacion:
+        with open(args.ocupacion, newline="", encoding="utf-8") as f:
+            ocupacion = leer_ocupacion(f)
+
+    maestro = Contratos(leido["contratos"])
+    if args.ausencias:
+        from ratios.ausencias import aplicar_ausencias, leer_ausencias
+        with open(args.ausencias, newline="", encoding="utf-8") as f:
+            ausencias = leer_ausencias(f, _formato(args.ausencias), args.tipos_ausencia)
+        aplicadas = aplicar_ausencias(maestro, ausencias["ausencias"])
+    filas = filas_centros(maestro.horas_por_semana(args.desde, args.hasta, args.centros), ocupacion, args.regimen)
+    if args.evaluar:
+        texto = _serializar(evaluar_flujo(filas), formato_salida)
+        cabecera = campos_salida()
+    else:
+        texto = _serializar_horas(filas, formato_salida)
+        cabecera = CAMPOS_HORAS
+    salida = sys.stdout if args.salida == "-" else open(args.salida, "w", newline="", encoding="utf-8")
+    try:
+        if formato_salida == "csv":
+            csv.writer(salida).writerow(cabecera)
+        salida.write(texto)
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+
+    print(f"{len(maestro)} contratos de {len(maestro.centros())} centros; {len(leido['descartados'])} descartados.",
+          file=sys.stderr)
+    for numero, motivo in leido["descartados"][:10]:
+        print(f"  fila {numero}: {motivo}", file=sys.stderr)
+    if leido["categorias_desconocidas"]:
+        desconocidas = ", ".join(f"{nombre!r} ({n})" for nombre, n in sorted(leido["categorias_desconocidas"].items()))
+        print(f"Categorías sin correspondencia (contratos descartados): {desconocidas}", file=sys.stderr)
+    if args.ausencias:
+        print(
+            f"{len(ausencias['ausencias'])} ausencias de {aplicadas['empleados']} empleados: {aplicadas['intervalos']} "
+            f"intervalos tras fusionar, {aplicadas['tramos']} tramos descontados; "
+            f"{aplicadas['sin_contrato']} empleados sin contrato; {len(ausencias['descartados'])} descartadas.",
+            file=sys.stderr
+        )
+        for numero, motivo in ausencias["descartados"][:10]:
+            print(f"  fila {numero}: {motivo}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Evaluación en cuadrícula: muchos centros a la vez (una fila por centro,
+una columna por categoría) frente a un régimen, con el cumplimiento por
+centro, por comprobación y por celda.
+
+Los regímenes incluidos se evalúan en una sola pasada vectorizada del motor
+por lotes (las mismas comprobaciones que ratios.barrido, con los mismos
+resultados que evaluar_centro); las normativas añadidas sin equivalente
+vectorizado se evalúan fila a fila. Las comprobaciones sobre las horas de
+una categoría (enfermería >= 168 h, mínimos del Ayuntamiento...) se asignan
+a la celda de esa categoría; las de ratio (atención directa, gerocultores
+por residente...) quedan como columnas propias de la fila.
+
+También lee tablas pegadas desde Excel (texto separado por tabuladores,
+con coma decimal y cabecera opcional).
+"""
+import numpy as np
+
+from ratios.barrido import VECTORIZADOS
+from ratios.evaluacion import REGIMENES
+from ratios.lotes import MatrizHoras
+from ratios.reglas import normativas
+
+COLUMNA_CENTRO = "Centro"
+COLUMNA_OCUPACION = "Ocupación"
+
+# ----------------------------------------------------------------
+# EVALUACIÓN
+# ----------------------------------------------------------------
+def _plan(regimen: str):
+    plan = normativas().get(regimen)
+    if plan is None:
+        raise ValueError(f"Régimen desconocido '{regimen}'. Opciones: {', '.join(REGIMENES)}")
+    return plan
+
+def comprobaciones_por_celda(regimen: str) -> dict:
+    """
+    {categoría: [comprobaciones sobre sus horas]} del régimen.
+    """
+    plan = _plan(regimen)
+    celdas = {}
+    for nombre, regla in plan.comprobaciones.items():
+        if regla.get("valor") in plan.categorias:
+            celdas.setdefault(regla["valor"], []).append(nombre)
+    return celdas
+
+def evaluar_cuadricula(regimen: str, ocupacion, horas) -> dict:
+    """
+    Evalúa todas las filas de la cuadrícula frente al régimen.
+
+    :param ocupacion: vector de ocupación por fila.
+    :param horas: matriz (filas × categorías del régimen, en el orden de
+                  normativas()[regimen].categorias) de horas semanales.
+    :return: {"valida" (ocupación > 0), "cumple", "comprobaciones" {nombre: array},
+              "celdas" {categoría: array}, "filas" {etiqueta: array}}; todos
+              los arrays tienen una entrada por fila y las filas no válidas
+              no cumplen nada.
+    Lanza ValueError si el régimen no existe o las dimensiones no cuadran.
+    """
+    plan = _plan(regimen)
+    ocupacion = np.asarray(ocupacion, dtype=np.int64)
+    matriz = MatrizHoras(horas, plan.categorias)
+    if ocupacion.shape != (matriz.horas.shape[0],):
+        raise ValueError("El vector de ocupación debe tener una entrada por fila")
+    valida = ocupacion > 0
+    if regimen in VECTORIZADOS:
+        comprobaciones = VECTORIZADOS[regimen](matriz, ocupacion)
+    else:
+        resultados = [
+            plan.evaluar(int(n), dict(zip(plan.categorias, fila))) if ok else {}
+            for n, fila, ok in zip(ocupacion, matriz.horas.tolist(), valida)
+        ]
+        comprobaciones = {
+            nombre: np.array([r.get(nombre, False) for r in resultados], dtype=bool)
+            for nombre in plan.comprobaciones
+        }
+    comprobaciones = {nombre: np.asarray(valores, dtype=bool) & valida for nombre, valores in comprobaciones.items()}
+
+    celdas = {
+        cat: np.logical_and.reduce([comprobaciones[nombre] for nombre in nombres])
+        for cat, nombres in comprobaciones_por_celda(regimen).items()
+    }
+    en_celda = {nombre for nombres in comprobaciones_por_celda(regimen).values() for nombre in nombres}
+    filas = {
+        regla.get("etiqueta", nombre): comprobaciones[nombre]
+        for nombre, regla in plan.comprobaciones.items() if nombre not in en_celda
+    }
+    cumple = np.logical_and.reduce([valida, *comprobaciones.values()])
+    return {
+        "valida": valida,
+        "cumple": cumple,
+        "comprobaciones": comprobaciones,
+        "celdas": celdas,
+        "filas": filas,
+    }
+
+# ----------------------------------------------------------------
+# PEGADO DESDE EXCEL
+# ----------------------------------------------------------------
+def _numero(texto: str) -> float:
+    """
+    Celda numérica pegada: vacío = 0, admite '37,5' y '1.234,5'.
+    """
+    texto = texto.strip().replace(" ", "").replace(" ", "")
+    if not texto:
+        return 0.0
+    if "," in texto:
+        texto = texto.replace(".", "").replace(",", ".")
+    try:
+        return float(texto)
+    except ValueError:
+        raise ValueError(f"'{texto}' no es un número válido")
+
+def leer_pegado(texto: str, categorias) -> dict:
+    """
+    Convierte una tabla copiada de Excel en filas
+    {COLUMNA_CENTRO, COLUMNA_OCUPACION, <categoría>: horas}.
+
+    Si la primera línea es una cabecera, las columnas se asocian por nombre
+    (Centro, Ocupación y las categorías, sin distinguir mayúsculas), las que
+    no son del régimen se ignoran y las categorías que falten valen 0; si no,
+    se esperan en orden: centro, ocupación y las horas de cada categoría.
+    :return: {"filas": [...], "ignoradas": [columnas de la cabecera no usadas]}
+    Lanza ValueError si un número no se reconoce.
+    """
+    lineas = [linea.rstrip("\r") for linea in texto.splitlines() if linea.strip()]
+    if not lineas:
+        return {"filas": [], "ignoradas": []}
+    separador = "\t" if any("\t" in linea for linea in lineas) else ";"
+    tabla = [linea.split(separador) for linea in lineas]
+    columnas = (COLUMNA_CENTRO, COLUMNA_OCUPACION) + tuple(categorias)
+
+    try:
+        _numero(tabla[0][1] if len(tabla[0]) > 1 else "")
+        cabecera = None
+    except ValueError:
+        cabecera = tabla.pop(0)
+    ignoradas = []
+    if cabecera is None:
+        orden = columnas
+    else:
+        por_nombre = {col.lower(): col for col in columnas}
+        por_nombre.setdefault("ocupacion", COLUMNA_OCUPACION)
+        orden = [por_nombre.get(nombre.strip().lower()) for nombre in cabecera]
+        ignoradas = [nombre.strip() for nombre, col in zip(cabecera, orden) if col is None and nombre.strip()]
+
+    filas = []
+    for numero, celdas in enumerate(tabla, start=1):
+        fila = {COLUMNA_CENTRO: f"Centro {numero}", COLUMNA_OCUPACION: 0, **{cat: 0.0 for cat in categorias}}
+        for columna, celda in zip(orden, celdas):
+            if columna == COLUMNA_CENTRO:
+                fila[columna] = celda.strip() or fila[columna]
+            elif columna == COLUMNA_OCUPACION:
+                fila[columna] = int(_numero(celda))
+            elif columna is not None:
+                fila[columna] = _numero(celda)
+        filas.append(fila)
+    return {"filas": filas, "ignoradas": ignoradas}
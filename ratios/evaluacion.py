@@ -0,0 +1,40 @@
+"""
+Evaluación de un centro frente a un régimen normativo, con resultado plano
+(un diccionario campo → valor) apto para CSV/JSONL y para integraciones.
+
+Los regímenes se definen como paquetes de reglas en ratios/normativas y se
+compilan una vez por proceso (ver ratios.reglas). Los incluidos reproducen
+las comprobaciones de las ramas de la interfaz:
+  - orden2680:    ratio directa >= 0,45 (> 50 plazas) / 0,37
+  - cam_am:       directa >= 0,47, no directa >= 0,15, gerocultores >= 0,33,
+                  fisioterapia/TO, trabajador social, médico y enfermería
+  - cam_cd:       ratio directa >= 0,23 y horas de gerocultores
+  - ayuntamiento: horas mínimas por categoría
+  - cam_ayto:     cam_cd (sumando aux. ruta) + ayuntamiento (modo 5)
+"""
+from ratios.reglas import normativas
+
+_PLANES = normativas()
+
+REGIMENES = tuple(_PLANES)
+
+# Campos de salida de cada régimen (en orden), para cabeceras CSV estables
+CAMPOS_REGIMEN = {regimen: plan.campos[1:] for regimen, plan in _PLANES.items()}
+
+# Unión ordenada de todos los campos de resultado
+CAMPOS_RESULTADO = ("cumple",) + tuple(dict.fromkeys(
+    campo for campos in CAMPOS_REGIMEN.values() for campo in campos
+))
+
+def evaluar_centro(regimen: str, ocupacion: int, horas: dict) -> dict:
+    """
+    Evalúa un centro-semana y devuelve {"cumple": bool, <campos del régimen>}.
+    Lanza ValueError si el régimen no existe o la ocupación no es mayor que 0
+    (la interfaz tampoco calcula en ese caso).
+    """
+    plan = _PLANES.get(regimen)
+    if plan is None:
+        raise ValueError(f"Régimen desconocido '{regimen}'. Opciones: {', '.join(REGIMENES)}")
+    if ocupacion <= 0:
+        raise ValueError("Debe introducir un número de usuarios/residentes mayor que 0.")
+    return plan.evaluar(ocupacion, horas)
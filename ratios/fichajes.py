@@ -0,0 +1,298 @@
+"""
+Ingesta de fichajes: convierte registros de entrada/salida (millones de
+turnos al mes) en horas semanales por centro y categoría, en el mismo
+formato de entrada que el modo por lotes (python -m ratios), para no tener
+que calcular a mano las horas que se teclean en la interfaz.
+
+Entrada: CSV o JSONL con un turno por fila y las columnas 'centro',
+'categoria', 'entrada' y 'salida' (fecha y hora ISO: '2024-03-04 07:58',
+'2024-03-04T07:58:00+01:00'...; otros nombres con --columnas y otros
+formatos de fecha con --formato-fecha). La categoría se asocia a las de la
+aplicación ('Gerocultor', 'ATS/DUE (Enfermería)', 'Gerocultor (aux.
+ruta)'...) sin distinguir mayúsculas, tildes ni espacios; --alias admite
+un JSON {nombre en los fichajes: categoría}.
+
+El fichero se lee en flujo por bloques y solo se acumulan las horas por
+(centro, semana, categoría), así que la memoria no depende del número de
+turnos. Las semanas van de lunes a domingo: un turno que cruza la noche
+del domingo se reparte entre las dos semanas. Se descartan (y se cuentan
+en el resumen) las filas ilegibles, los turnos sin salida, los que
+terminan antes de empezar y los de más de --max-horas-turno horas
+(fichajes de salida olvidados).
+
+Salida: una fila por centro-semana con 'centro', 'semana' (el lunes),
+'fecha_inicio', 'fecha_fin', 'regimen' y 'ocupacion' (si se indican) y una
+columna por categoría con sus horas (2 decimales). Con --evaluar las filas
+pasan directamente por el motor de cálculo y se escribe el resultado de
+cumplimiento (como python -m ratios).
+
+Uso:
+  python -m ratios.fichajes turnos.csv -o horas.csv
+  python -m ratios.fichajes turnos.csv --regimen cam_am --ocupacion plazas.csv --evaluar -o cumplimiento.csv
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import time as reloj
+from datetime import datetime, time, timedelta
+
+from ratios.calculo import CATEGORIAS, resolver_categoria
+from ratios.cli import _a_float, _formato, _serializar, campos_salida, evaluar_flujo
+from ratios.evaluacion import REGIMENES
+
+COLUMNAS = ("centro", "categoria", "entrada", "salida")
+
+# Turnos más largos que esto se descartan (fichaje de salida olvidado)
+MAX_HORAS_TURNO = 24.0
+
+# Tamaño del búfer de lectura
+TAM_BLOQUE = 1 << 20
+
+SEMANA = timedelta(days=7)
+
+# ----------------------------------------------------------------
+# LECTURA Y AGREGACIÓN
+# ----------------------------------------------------------------
+def leer_turnos(fichero, formato: str, columnas: dict = None):
+    """
+    Genera (centro, categoría, entrada, salida) como textos, en el orden
+    del fichero. 'columnas' traduce los nombres de COLUMNAS a los del
+    fichero. Lanza ValueError si al CSV le falta alguna columna.
+    """
+    nombres = {col: (columnas or {}).get(col, col) for col in COLUMNAS}
+    if formato == "csv":
+        lector = csv.reader(fichero)
+        cabecera = [c.strip().lower() for c in next(lector, [])]
+        faltan = [nombre for nombre in nombres.values() if nombre.lower() not in cabecera]
+        if faltan:
+            raise ValueError(f"Faltan columnas en los fichajes: {', '.join(faltan)}")
+        i_centro, i_cat, i_entrada, i_salida = (cabecera.index(nombres[col].lower()) for col in COLUMNAS)
+        for fila in lector:
+            try:
+                yield fila[i_centro], fila[i_cat], fila[i_entrada], fila[i_salida]
+            except IndexError:
+                yield None
+    else:
+        claves = [nombres[col] for col in COLUMNAS]
+        for linea in fichero:
+            if not linea.strip():
+                continue
+            try:
+                registro = json.loads(linea)
+                yield tuple(str(registro.get(clave) or "") for clave in claves)
+            except (ValueError, AttributeError):
+                yield None
+
+def agregar_turnos(turnos, alias: dict = None, formato_fecha: str = None,
+                   max_horas_turno: float = MAX_HORAS_TURNO) -> dict:
+    """
+    Suma la duración de los turnos por centro, semana (lunes) y categoría.
+    :param turnos: iterable de (centro, categoría, entrada, salida) como
+                   textos (leer_turnos) o None para una fila ilegible.
+    :return: {"horas": {(centro, lunes): {categoría: horas}}, "resumen": {"turnos",
+              "aceptados", "ilegibles", "sin_salida", "invalidos", "largos",
+              "horas_totales", "categorias_desconocidas" {nombre: turnos}}}
+    """
+    if formato_fecha:
+        def leer_fecha(texto):
+            return datetime.strptime(texto.strip(), formato_fecha)
+    else:
+        leer_fecha = datetime.fromisoformat
+    maximo = max_horas_turno * 3600
+    categorias = {}    # nombre en los fichajes -> categoría (o None), resuelto una vez
+    segundos = {}      # (centro, lunes) -> {categoría: segundos}
+    resumen = {"turnos": 0, "aceptados": 0, "ilegibles": 0, "sin_salida": 0, "invalidos": 0, "largos": 0}
+    desconocidas = {}
+
+    def sumar(centro, lunes, categoria, valor):
+        por_categoria = segundos.get((centro, lunes))
+        if por_categoria is None:
+            por_categoria = segundos[(centro, lunes)] = {}
+        por_categoria[categoria] = por_categoria.get(categoria, 0.0) + valor
+
+    for turno in turnos:
+        resumen["turnos"] += 1
+        if turno is None:
+            resumen["ilegibles"] += 1
+            continue
+        centro, nombre, texto_entrada, texto_salida = turno
+        if not texto_salida.strip():
+            resumen["sin_salida"] += 1
+            continue
+        try:
+            categoria = categorias[nombre]
+        except KeyError:
+            categoria = categorias[nombre] = resolver_categoria(nombre, alias)
+        if categoria is None:
+            desconocidas[nombre] = desconocidas.get(nombre, 0) + 1
+            continue
+        try:
+            entrada = leer_fecha(texto_entrada)
+            salida = leer_fecha(texto_salida)
+            duracion = (salida - entrada).total_seconds()
+        except (ValueError, TypeError):  # TypeError: una fecha con zona horaria y otra sin ella
+            resumen["ilegibles"] += 1
+            continue
+        if duracion <= 0:
+            resumen["invalidos"] += 1
+            continue
+        if duracion > maximo:
+            resumen["largos"] += 1
+            continue
+        resumen["aceptados"] += 1
+        dia = entrada.date()
+        lunes = dia - timedelta(days=dia.weekday())
+        fin_semana = datetime.combine(lunes + SEMANA, time.min, entrada.tzinfo)
+        while salida > fin_semana:
+            sumar(centro, lunes, categoria, (fin_semana - entrada).total_seconds())
+            entrada, lunes, fin_semana = fin_semana, lunes + SEMANA, fin_semana + SEMANA
+        sumar(centro, lunes, categoria, (salida - entrada).total_seconds())
+
+    horas = {
+        clave: {cat: round(valor / 3600, 2) for cat, valor in por_categoria.items()}
+        for clave, por_categoria in segundos.items()
+    }
+    resumen["horas_totales"] = round(sum(sum(por_categoria.values()) for por_categoria in segundos.values()) / 3600, 2)
+    resumen["categorias_desconocidas"] = desconocidas
+    return {"horas": horas, "resumen": resumen}
+
+def leer_ocupacion(fichero) -> dict:
+    """
+    Ocupación por centro de un CSV con 'centro', 'ocupacion' y opcionalmente
+    'semana' (el lunes, AAAA-MM-DD): {(centro, semana o ""): ocupación}.
+    """
+    return {
+        (fila["centro"], (fila.get("semana") or "").strip()): int(_a_float(fila.get("ocupacion")))
+        for fila in csv.DictReader(fichero)
+    }
+
+def filas_centros(horas: dict, ocupacion: dict = None, regimen: str = None):
+    """
+    Genera una fila por centro-semana, ordenadas, en el formato de entrada
+    del modo por lotes (ratios.cli): centro, semana, fecha_inicio, fecha_fin,
+    regimen, ocupacion y las horas por categoría (0 si no hay fichajes).
+    La ocupación se busca para la semana y, si no, para el centro.
+    """
+    ocupacion = ocupacion or {}
+    for centro, lunes in sorted(horas):
+        semana = lunes.isoformat()
+        fila = {
+            "centro": centro,
+            "semana": semana,
+            "fecha_inicio": semana,
+            "fecha_fin": (lunes + timedelta(days=6)).isoformat(),
+            "regimen": regimen or "",
+            "ocupacion": ocupacion.get((centro, semana), ocupacion.get((centro, ""), "")),
+        }
+        por_categoria = horas[(centro, lunes)]
+        fila.update({cat: por_categoria.get(cat, 0.0) for cat in CATEGORIAS})
+        yield fila
+
+# ----------------------------------------------------------------
+# LÍNEA DE COMANDOS
+# ----------------------------------------------------------------
+CAMPOS_HORAS = ("centro", "semana", "fecha_inicio", "fecha_fin", "regimen", "ocupacion") + CATEGORIAS
+
+def _serializar_horas(filas, formato: str) -> str:
+    if formato == "csv":
+        buffer = io.StringIO()
+        csv.DictWriter(buffer, fieldnames=CAMPOS_HORAS).writerows(filas)
+        return buffer.getvalue()
+    return "".join(json.dumps(fila, ensure_ascii=False) + "\n" for fila in filas)
+
+def _columna(texto: str):
+    columna, _, nombre = texto.partition("=")
+    if columna not in COLUMNAS or not nombre:
+        raise argparse.ArgumentTypeError(f"Formato esperado: columna=nombre, con columna en {', '.join(COLUMNAS)}")
+    return columna, nombre
+
+def construir_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m ratios.fichajes",
+        description="Horas semanales por centro y categoría a partir de los fichajes de entrada/salida."
+    )
+    parser.add_argument("entrada", help="Fichero CSV o JSONL de turnos ('-' para stdin).")
+    parser.add_argument("-o", "--salida", default="-", help="Fichero de resultados ('-' para stdout).")
+    parser.add_argument("--formato-entrada", choices=("csv", "jsonl"), help="Por defecto, según la extensión.")
+    parser.add_argument("--formato-salida", choices=("csv", "jsonl"), help="Por defecto, según la extensión.")
+    parser.add_argument("--columnas", nargs="+", type=_columna, default=[],
+                        help="Nombres de columna del fichero: centro=..., categoria=..., entrada=..., salida=...")
+    parser.add_argument("--formato-fecha", help="Formato strptime de las fechas (por defecto, ISO 8601).")
+    parser.add_argument("--alias", help="JSON {nombre en los fichajes: categoría de la aplicación}.")
+    parser.add_argument("--max-horas-turno", type=float, default=MAX_HORAS_TURNO,
+                        help="Los turnos más largos se descartan.")
+    parser.add_argument("--regimen", choices=REGIMENES, help="Régimen de las filas de salida.")
+    parser.add_argument("--ocupacion", help="CSV con 'centro', 'ocupacion' y opcionalmente 'semana'.")
+    parser.add_argument("--evaluar", action="store_true",
+                        help="Evaluar el cumplimiento de cada centro-semana (requiere --regimen y --ocupacion).")
+    return parser
+
+def main(argv=None) -> int:
+    args = construir_parser().parse_args(argv)
+    if args.evaluar and not (args.regimen and args.ocupacion):
+        print("--evaluar requiere --regimen y --ocupacion.", file=sys.stderr)
+        return 2
+    formato_entrada = _formato(args.entrada, args.formato_entrada)
+    formato_salida = _formato(args.salida, args.formato_salida)
+    alias = None
+    if args.alias:
+        with open(args.alias, encoding="utf-8") as f:
+            alias = json.load(f)
+        invalidos = sorted(set(alias.values()) - set(CATEGORIAS))
+        if invalidos:
+            print(f"Categorías desconocidas en los alias: {', '.join(invalidos)}", file=sys.stderr)
+            return 2
+    ocupacion = None
+    if args.ocupacion:
+        with open(args.ocupacion, newline="", encoding="utf-8") as f:
+            ocupacion = leer_ocupacion(f)
+
+    inicio = reloj.perf_counter()
+    entrada = sys.stdin if args.entrada == "-" else open(
+        args.entrada, newline="", encoding="utf-8", buffering=TAM_BLOQUE
+    )
+    try:
+        agregado = agregar_turnos(
+            leer_turnos(entrada, formato_entrada, dict(args.columnas)),
+            alias, args.formato_fecha, args.max_horas_turno
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+
+    filas = filas_centros(agregado["horas"], ocupacion, args.regimen)
+    if args.evaluar:
+        texto = _serializar(evaluar_flujo(filas), formato_salida)
+        cabecera = campos_salida()
+    else:
+        texto = _serializar_horas(filas, formato_salida)
+        cabecera = CAMPOS_HORAS
+    salida = sys.stdout if args.salida == "-" else open(args.salida, "w", newline="", encoding="utf-8")
+    try:
+        if formato_salida == "csv":
+            csv.writer(salida).writerow(cabecera)
+        salida.write(texto)
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+
+    resumen = agregado["resumen"]
+    print(
+        f"{resumen['turnos']} turnos leídos en {reloj.perf_counter() - inicio:.1f} s: {resumen['aceptados']} aceptados, "
+        f"{resumen['ilegibles']} ilegibles, {resumen['sin_salida']} sin salida, {resumen['invalidos']} con salida "
+        f"anterior a la entrada, {resumen['largos']} de más de {args.max_horas_turno:g} h; "
+        f"{len(agregado['horas'])} centros-semana, {resumen['horas_totales']} h.",
+        file=sys.stderr
+    )
+    if resumen["categorias_desconocidas"]:
+        desconocidas = ", ".join(f"{nombre!r} ({n})" for nombre, n in sorted(resumen["categorias_desconocidas"].items()))
+        print(f"Categorías sin correspondencia (turnos descartados): {desconocidas}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""
+Funciones de formateo de números y líneas de cumplimiento (sin Streamlit).
+"""
+import math
+from decimal import Decimal
+
+def formatear_numero(valor) -> str:
+    """
+    Devuelve un número con 2 decimales, separador decimal = ','
+    y separador de miles = '.'.
+    Ej: 12345.678 -> '12.345,68'
+    """
+    if not isinstance(valor, (int, float)):
+        return str(valor)
+    formatted = f"{valor:,.2f}"
+    return formatted.replace(',', 'X').replace('.', ',').replace('X', '.')
+
+def formatear_ratio(valor) -> str:
+    """
+    Formatea un float con 2 decimales y sustituye '.' por ',' para ratios.
+    """
+    if valor is None or not math.isfinite(valor):
+        return "Valor no válido"
+    return f"{Decimal(str(valor)).quantize(Decimal('0.00'))}".replace('.', ',')
+
+def si_cumple_texto(cumple: bool) -> str:
+    """Devuelve '✅ CUMPLE' o '❌ NO CUMPLE'."""
+    return "✅ CUMPLE" if cumple else "❌ NO CUMPLE"
+
+def colorear_linea(texto: str, cumple: bool) -> str:
+    """
+    Envuelve 'texto' en un <p> con color verde o rojo,
+    y añade en negrita la parte 'CUMPLE' o 'NO CUMPLE'.
+    """
+    color = "green" if cumple else "red"
+    return (
+        f"<p style='color:{color};'>"
+        f"{texto} "
+        f"<span style='font-weight:bold;'>{si_cumple_texto(cumple)}</span>"
+        f"</p>"
+    )
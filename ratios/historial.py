@@ -0,0 +1,541 @@
+"""
+Historial de cumplimiento en SQLite: cada cálculo (de la interfaz o
+importado de un fichero por lotes) se guarda con su centro, régimen,
+semana, ocupación, horas por categoría, ratios y marcas de cumplimiento,
+para consultas de tendencia ("todas las semanas de 2026 con ratio de
+gerocultores < 0,33") sobre millones de filas.
+
+Tabla 'calculos': una fila por cálculo con id, instante, origen, centro,
+semana (lunes, AAAA-MM-DD), regimen, ocupacion, vigente, horas (JSON) y
+una columna por campo de resultado (ratios.evaluacion.CAMPOS_RESULTADO;
+las marcas de cumplimiento como 0/1). Al volver a calcular un
+centro-semana-régimen, la fila anterior deja de ser 'vigente' y las
+consultas solo ven la última (salvo que se pidan todas); para eso hace
+falta el centro. La semana se guarda siempre como su lunes: se admite
+cualquier fecha de la semana o la semana ISO ('2026-W01').
+
+Índices: (centro, regimen, semana), (regimen, semana) y uno de cobertura
+por (regimen, semana, campo) para cada campo de INDICES_POR_DEFECTO
+(ratio_gero), que se crea al abrir la base de datos (la primera vez, sobre
+una base ya grande, tarda unos segundos). indexar(campo) añade el mismo
+índice para otros ratios. Con 2 millones de cálculos, "ratio_gero < 0,33
+en 2026" (unas 36.000 filas) se resuelve solo con el índice en ~12 ms; el
+resto de los ~160 ms de consultar() es convertir esas filas en objetos de
+Python, y crece con el número de filas devueltas, no con el tamaño de la
+tabla (con 'limite' o tendencia() se devuelve mucho menos).
+
+Escritura por lotes: registrar() solo encola (no bloquea la interfaz) y un
+hilo escritor vacía la cola en transacciones de hasta TAM_LOTE filas, así
+que con mucha carga las filas se agrupan solas. Las lecturas usan un pool
+de conexiones (modo WAL: lectores y escritor no se bloquean entre sí).
+
+Configuración (variables de entorno):
+  RATIOS_HISTORIAL=ruta           base de datos; sin definir (o 0) la interfaz
+                                  no guarda nada y la línea de comandos pide --db
+  RATIOS_HISTORIAL_LOTE=500       filas por transacción
+  RATIOS_HISTORIAL_CONEXIONES=4   conexiones de lectura del pool
+
+Uso (--db se puede omitir si RATIOS_HISTORIAL está definida):
+  python -m ratios.historial --db historial.sqlite3 importar centros.csv --regimen cam_am
+  python -m ratios.historial consultar --regimen cam_am --desde 2026-01-01 --hasta 2026-12-31 \\
+      --donde "ratio_gero<0.33"
+  python -m ratios.historial tendencia ratio_gero --regimen cam_am --centro "Residencia Norte"
+  python -m ratios.historial indexar ratio_gero
+"""
+import argparse
+import atexit
+import csv
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from ratios.cli import _formato, leer_filas, normalizar_fila
+from ratios.evaluacion import CAMPOS_RESULTADO, REGIMENES, evaluar_centro
+
+RUTA = os.environ.get("RATIOS_HISTORIAL", "")
+ACTIVO = RUTA.lower() not in ("", "0", "false", "no", "off")
+TAM_LOTE = int(os.environ.get("RATIOS_HISTORIAL_LOTE", "500"))
+CONEXIONES = int(os.environ.get("RATIOS_HISTORIAL_CONEXIONES", "4"))
+
+COLUMNAS_BASE = ("instante", "origen", "centro", "semana", "regimen", "ocupacion", "vigente", "horas")
+
+OPERADORES = ("<=", ">=", "!=", "<", ">", "=")
+
+# Campos con índice de cobertura desde la creación de la base de datos
+INDICES_POR_DEFECTO = ("ratio_gero",)
+
+_SEMANA_ISO = re.compile(r"^(\d{4})-?W(\d{2})(?:-?[1-7])?$", re.IGNORECASE)
+
+# Posición de cada campo de resultado en las filas a insertar
+_POSICION = {campo: len(COLUMNAS_BASE) + i for i, campo in enumerate(CAMPOS_RESULTADO)}
+_SIN_VALOR = (None,) * len(CAMPOS_RESULTADO)
+
+logger = logging.getLogger(__name__)
+
+def _columna(campo: str) -> str:
+    """Identificador SQL entrecomillado de un campo de resultado."""
+    return '"' + campo.replace('"', '""') + '"'
+
+def _valor(valor):
+    if isinstance(valor, bool):
+        return int(valor)
+    return valor
+
+def lunes_de_semana(semana) -> str:
+    """
+    Lunes (AAAA-MM-DD) de la semana de 'semana': una fecha (date, datetime o
+    'AAAA-MM-DD', cualquier día de la semana) o una semana ISO ('2026-W01').
+    Lanza ValueError si no es ninguna de las dos.
+    """
+    if isinstance(semana, datetime):
+        dia = semana.date()
+    elif isinstance(semana, date):
+        dia = semana
+    else:
+        texto = str(semana).strip()
+        iso = _SEMANA_ISO.match(texto)
+        try:
+            dia = date.fromisocalendar(int(iso.group(1)), int(iso.group(2)), 1) if iso else date.fromisoformat(texto)
+        except ValueError:
+            raise ValueError(f"Semana no válida '{semana}': se espera AAAA-MM-DD o AAAA-Www")
+    return (dia - timedelta(days=dia.weekday())).isoformat()
+
+def _nombre_indice(campo: str) -> str:
+    return "calculos_" + re.sub(r"\W", "_", campo.encode("ascii", "ignore").decode()).lower()
+
+def _crear_indice(conexion: sqlite3.Connection, campo: str):
+    conexion.execute(
+        f"CREATE INDEX IF NOT EXISTS {_columna(_nombre_indice(campo))} "
+        f"ON calculos (regimen, semana, {_columna(campo)}, vigente, cumple, centro, ocupacion)"
+    )
+
+# ----------------------------------------------------------------
+# HISTORIAL
+# ----------------------------------------------------------------
+class Historial:
+    """
+    Historial en un fichero SQLite, con escritura por lotes en un hilo
+    propio y un pool de conexiones de lectura. Seguro entre hilos.
+    """
+
+    def __init__(self, ruta: str = RUTA, conexiones: int = CONEXIONES, tam_lote: int = TAM_LOTE):
+        self.ruta = ruta
+        self.tam_lote = tam_lote
+        self.descartados = 0
+        self._max_conexiones = conexiones
+        self._creadas = 0
+        self._pool = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._lock_escritura = threading.Lock()
+        self._cola = queue.Queue()
+        self._escritor = None
+        self._conexion_escritura = self._conectar()
+        self._crear_esquema(self._conexion_escritura)
+
+    def _conectar(self) -> sqlite3.Connection:
+        conexion = sqlite3.connect(self.ruta, timeout=30, check_same_thread=False, isolation_level=None)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("PRAGMA synchronous=NORMAL")
+        return conexion
+
+    def _crear_esquema(self, conexion: sqlite3.Connection):
+        conexion.execute(
+            "CREATE TABLE IF NOT EXISTS calculos ("
+            "id INTEGER PRIMARY KEY, instante REAL NOT NULL, origen TEXT NOT NULL, centro TEXT NOT NULL, "
+            "semana TEXT NOT NULL, regimen TEXT NOT NULL, ocupacion INTEGER NOT NULL, "
+            "vigente INTEGER NOT NULL DEFAULT 1, horas TEXT NOT NULL)"
+        )
+        existentes = {fila[1] for fila in conexion.execute("PRAGMA table_info(calculos)")}
+        for campo in CAMPOS_RESULTADO:
+            if campo not in existentes:
+                conexion.execute(f"ALTER TABLE calculos ADD COLUMN {_columna(campo)} NUMERIC")
+        conexion.execute("CREATE INDEX IF NOT EXISTS calculos_centro ON calculos (centro, regimen, semana)")
+        conexion.execute("CREATE INDEX IF NOT EXISTS calculos_regimen ON calculos (regimen, semana)")
+        for campo in INDICES_POR_DEFECTO:
+            _crear_indice(conexion, campo)
+
+    @contextmanager
+    def conexion(self):
+        """
+        Conexión de lectura del pool (se crean bajo demanda hasta el máximo;
+        después se espera a que se libere una).
+        """
+        try:
+            conexion = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                crear = self._creadas < self._max_conexiones
+                if crear:
+                    self._creadas += 1
+            conexion = self._conectar() if crear else self._pool.get()
+        try:
+            yield conexion
+        finally:
+            self._pool.put(conexion)
+
+    # ------------------------------------------------------------
+    # ESCRITURA
+    # ------------------------------------------------------------
+    def registrar(self, regimen: str, ocupacion: int, horas: dict, centro: str = "", semana: str = None,
+                  resultado: dict = None, origen: str = "interfaz"):
+        """
+        Encola un cálculo para guardarlo (sin esperar a la base de datos).
+        Si no se da 'resultado' se evalúa con evaluar_centro en el hilo
+        escritor; los cálculos no válidos se descartan (y se cuentan en
+        'descartados', igual que los de semana no válida). 'semana' es
+        cualquier fecha de la semana o la semana ISO (por defecto, la actual).
+        """
+        with self._lock:
+            if self._escritor is None:
+                self._escritor = threading.Thread(target=self._escribir, name="ratios-historial", daemon=True)
+                self._escritor.start()
+        self._cola.put((time.time(), origen, centro, semana or date.today(), regimen, ocupacion, dict(horas), resultado))
+
+    def vaciar(self):
+        """Espera a que se hayan escrito todos los cálculos encolados."""
+        self._cola.join()
+
+    def _escribir(self):
+        while True:
+            lote = [self._cola.get()]
+            while len(lote) < self.tam_lote:
+                try:
+                    lote.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.registrar_lote(lote)
+            except Exception:
+                # Un error del historial no debe parar el hilo (ni la interfaz)
+                logger.exception("No se pudo escribir en el historial %s", self.ruta)
+            finally:
+                for _ in lote:
+                    self._cola.task_done()
+
+    def registrar_lote(self, calculos) -> int:
+        """
+        Guarda en una transacción una lista de cálculos
+        (instante, origen, centro, semana, regimen, ocupacion, horas, resultado o None).
+        La semana se guarda como su lunes (lunes_de_semana); los cálculos con
+        una semana o unos datos no válidos se descartan.
+        :return: filas guardadas.
+        """
+        filas = []
+        vigentes = {}  # (centro, semana, regimen) -> posición de su última fila en el lote
+        for instante, origen, centro, semana, regimen, ocupacion, horas, resultado in calculos:
+            try:
+                semana = lunes_de_semana(semana)
+                if resultado is None:
+                    resultado = evaluar_centro(regimen, ocupacion, horas)
+            except (ValueError, TypeError, KeyError, OverflowError):
+                self.descartados += 1
+                continue
+            if centro:
+                anterior = vigentes.get((centro, semana, regimen))
+                if anterior is not None:
+                    filas[anterior][6] = 0
+                vigentes[(centro, semana, regimen)] = len(filas)
+            fila = [instante, origen, centro, semana, regimen, int(ocupacion), 1, json.dumps(horas, ensure_ascii=False)]
+            fila.extend(_SIN_VALOR)
+            for campo, valor in resultado.items():
+                posicion = _POSICION.get(campo)
+                if posicion is not None:
+                    fila[posicion] = valor
+            filas.append(fila)
+        if not filas:
+            return 0
+        columnas = ", ".join(COLUMNAS_BASE + tuple(_columna(campo) for campo in CAMPOS_RESULTADO))
+        huecos = ", ".join("?" * (len(COLUMNAS_BASE) + len(CAMPOS_RESULTADO)))
+        conexion = self._conexion_escritura
+        with self._lock_escritura:
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                conexion.executemany(
+                    "UPDATE calculos SET vigente = 0 WHERE centro = ? AND semana = ? AND regimen = ? AND vigente = 1",
+                    list(vigentes)
+                )
+                conexion.executemany(f"INSERT INTO calculos ({columnas}) VALUES ({huecos})", filas)
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                raise
+            conexion.execute("COMMIT")
+        return len(filas)
+
+    def indexar(self, campo: str):
+        """
+        Crea (si no existe) un índice de cobertura por régimen, semana y un
+        campo de resultado: los filtros y tendencias de ese campo se
+        resuelven solo con el índice, sin leer la tabla. Actualiza las
+        estadísticas para que el planificador lo elija. Lanza ValueError si
+        el campo no existe.
+        """
+        if campo not in CAMPOS_RESULTADO:
+            raise ValueError(f"Campo desconocido '{campo}'")
+        with self._lock_escritura:
+            _crear_indice(self._conexion_escritura, campo)
+            self._conexion_escritura.execute("PRAGMA analysis_limit=1000")
+            self._conexion_escritura.execute("ANALYZE")
+
+    def cerrar(self):
+        """Escribe lo pendiente y cierra las conexiones."""
+        self.vaciar()
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._conexion_escritura.close()
+
+    # ------------------------------------------------------------
+    # CONSULTAS
+    # ------------------------------------------------------------
+    def _filtros(self, regimen, centro, desde, hasta, condiciones, incumple, todos):
+        where, parametros = [], []
+        if not todos:
+            where.append("vigente = 1")
+        for columna, operador, valor in (("regimen", "=", regimen), ("centro", "=", centro),
+                                         ("semana", ">=", desde), ("semana", "<=", hasta)):
+            if valor is not None:
+                where.append(f"{columna} {operador} ?")
+                parametros.append(str(valor))
+        if incumple:
+            where.append("cumple = 0")
+        for campo, operador, valor in condiciones:
+            if campo not in CAMPOS_RESULTADO:
+                raise ValueError(f"Campo desconocido '{campo}'")
+            if operador not in OPERADORES:
+                raise ValueError(f"Operador no válido '{operador}'. Opciones: {' '.join(OPERADORES)}")
+            where.append(f"{_columna(campo)} {operador} ?")
+            parametros.append(_valor(valor))
+        return (" WHERE " + " AND ".join(where)) if where else "", parametros
+
+    def consultar(self, regimen: str = None, centro: str = None, desde=None, hasta=None, condiciones=(),
+                  incumple: bool = False, todos: bool = False, limite: int = None, detalle: bool = False) -> list:
+        """
+        Cálculos que cumplen todos los filtros, por semana y centro.
+        :param desde, hasta: semanas límite (incluidas), 'AAAA-MM-DD' o date.
+        :param condiciones: [(campo de resultado, operador de OPERADORES, valor)].
+        :param incumple: solo los que no cumplen.
+        :param todos: incluir también los recálculos sustituidos.
+        :param detalle: devolver todos los campos y las horas; si no, solo la
+                        identificación, 'cumple' y los campos de las condiciones
+                        (lo que cubre el índice de indexar()).
+        :return: [{"id", "centro", "semana", "regimen", "ocupacion", "cumple",
+                  <campos con valor>}]
+        Lanza ValueError si un campo o un operador no son válidos.
+        """
+        where, parametros = self._filtros(regimen, centro, desde, hasta, condiciones, incumple, todos)
+        if detalle:
+            columnas = "*"
+        else:
+            campos = dict.fromkeys(("id", "centro", "semana", "regimen", "ocupacion", "cumple")
+                                   + tuple(campo for campo, _, _ in condiciones))
+            columnas = ", ".join(_columna(campo) for campo in campos)
+        sql = f"SELECT {columnas} FROM calculos{where} ORDER BY semana, centro"
+        if limite is not None:
+            sql += " LIMIT ?"
+            parametros.append(int(limite))
+        with self.conexion() as conexion:
+            cursor = conexion.execute(sql, parametros)
+            nombres = [d[0] for d in cursor.description]
+            filas = cursor.fetchall()
+        if not detalle:
+            # Sin 'vigente' ni 'horas': solo hay que quitar los valores nulos
+            return [dict(zip(nombres, fila)) if None not in fila else
+                    {n: v for n, v in zip(nombres, fila) if v is not None} for fila in filas]
+        resultado = []
+        for fila in filas:
+            registro = {n: v for n, v in zip(nombres, fila) if v is not None and n != "vigente"}
+            if "horas" in registro:
+                registro["horas"] = json.loads(registro["horas"])
+            resultado.append(registro)
+        return resultado
+
+    def tendencia(self, campo: str, regimen: str = None, centro: str = None, desde=None, hasta=None,
+                  todos: bool = False) -> list:
+        """
+        Evolución semanal de un campo de resultado:
+        [{"semana", "calculos", "media", "minimo", "maximo", "cumplen"}].
+        Lanza ValueError si el campo no existe.
+        """
+        if campo not in CAMPOS_RESULTADO:
+            raise ValueError(f"Campo desconocido '{campo}'")
+        where, parametros = self._filtros(regimen, centro, desde, hasta, (), False, todos)
+        columna = _columna(campo)
+        condicion = f"{columna} IS NOT NULL"
+        where = f"{where} AND {condicion}" if where else f" WHERE {condicion}"
+        sql = (
+            f"SELECT semana, COUNT(*), AVG({columna}), MIN({columna}), MAX({columna}), SUM(cumple) "
+            f"FROM calculos{where} GROUP BY semana ORDER BY semana"
+        )
+        with self.conexion() as conexion:
+            filas = conexion.execute(sql, parametros).fetchall()
+        return [
+            {"semana": semana, "calculos": n, "media": media, "minimo": minimo, "maximo": maximo, "cumplen": cumplen}
+            for semana, n, media, minimo, maximo, cumplen in filas
+        ]
+
+# ----------------------------------------------------------------
+# HISTORIAL DEL PROCESO (interfaz)
+# ----------------------------------------------------------------
+_proceso = {"historial": None}
+_lock_proceso = threading.Lock()
+
+def historial_del_proceso():
+    """
+    Historial compartido por todas las sesiones del proceso (en RUTA), o
+    None si está desactivado o no se puede abrir.
+    """
+    if not ACTIVO:
+        return None
+    with _lock_proceso:
+        if _proceso["historial"] is None:
+            try:
+                _proceso["historial"] = Historial(RUTA)
+            except sqlite3.Error:
+                logger.exception("No se pudo abrir el historial %s; no se guardarán cálculos", RUTA)
+                _proceso["historial"] = False
+            else:
+                atexit.register(_proceso["historial"].vaciar)
+        return _proceso["historial"] or None
+
+def registrar(regimen: str, ocupacion: int, horas: dict, centro: str = "", semana: str = None,
+              origen: str = "interfaz"):
+    """
+    Encola un cálculo en el historial del proceso (nada si está desactivado).
+    """
+    historial = historial_del_proceso()
+    if historial is not None:
+        historial.registrar(regimen, ocupacion, horas, centro, semana, origen=origen)
+
+# ----------------------------------------------------------------
+# LÍNEA DE COMANDOS
+# ----------------------------------------------------------------
+def _condicion(texto: str):
+    coincidencia = re.match(r"^\s*(.+?)\s*(<=|>=|!=|<|>|=)\s*(\S+)\s*$", texto)
+    if not coincidencia:
+        raise argparse.ArgumentTypeError("Formato esperado: campo<valor (operadores: <= >= != < > =)")
+    campo, operador, valor = coincidencia.groups()
+    try:
+        return campo, operador, float(valor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{valor}' no es un número")
+
+def _importar(historial: Historial, ruta: str, regimen: str = None, tam_lote: int = TAM_LOTE) -> int:
+    """
+    Evalúa y guarda las filas de un fichero de entrada del modo por lotes
+    (CSV o JSONL con centro, semana, regimen, ocupacion y horas).
+    """
+    n = 0
+    lote = []
+    with open(ruta, newline="", encoding="utf-8") as f:
+        for fila in leer_filas(f, _formato(ruta)):
+            try:
+                centro = normalizar_fila(fila, regimen)
+                resultado = evaluar_centro(centro["regimen"], centro["ocupacion"], centro["horas"])
+            except (ValueError, TypeError, KeyError):
+                historial.descartados += 1
+                continue
+            lote.append((time.time(), "importacion", centro["centro"], centro["semana"] or date.today(),
+                         centro["regimen"], centro["ocupacion"], centro["horas"], resultado))
+            if len(lote) >= tam_lote:
+                n += historial.registrar_lote(lote)
+                lote = []
+    return n + historial.registrar_lote(lote)
+
+def construir_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m ratios.historial",
+        description="Historial de cumplimiento en SQLite: importación y consultas de tendencia."
+    )
+    parser.add_argument("--db", default=RUTA if ACTIVO else None, required=not ACTIVO,
+                        help="Base de datos SQLite (por defecto, RATIOS_HISTORIAL).")
+    ordenes = parser.add_subparsers(dest="orden", required=True)
+
+    importar = ordenes.add_parser("importar", help="Evaluar y guardar un fichero del modo por lotes (CSV/JSONL).")
+    importar.add_argument("entrada", nargs="+")
+    importar.add_argument("--regimen", choices=REGIMENES, help="Régimen para las filas sin columna 'regimen'.")
+
+    def filtros(sub):
+        sub.add_argument("--regimen", choices=REGIMENES)
+        sub.add_argument("--centro")
+        sub.add_argument("--desde", help="Primera semana (AAAA-MM-DD).")
+        sub.add_argument("--hasta", help="Última semana (AAAA-MM-DD).")
+        sub.add_argument("--todos", action="store_true", help="Incluir los recálculos sustituidos.")
+        sub.add_argument("-o", "--salida", default="-", help="Fichero de resultados ('-' para stdout).")
+        sub.add_argument("--formato-salida", choices=("csv", "jsonl"), help="Por defecto, según la extensión.")
+
+    consultar = ordenes.add_parser("consultar", help="Cálculos que cumplen unos filtros.")
+    filtros(consultar)
+    consultar.add_argument("--donde", type=_condicion, action="append", default=[],
+                           help="Condición sobre un campo de resultado, p. ej. 'ratio_gero<0.33' (repetible).")
+    consultar.add_argument("--incumple", action="store_true", help="Solo los que no cumplen.")
+    consultar.add_argument("--limite", type=int)
+    consultar.add_argument("--detalle", action="store_true", help="Todos los campos y las horas de cada cálculo.")
+
+    tendencia = ordenes.add_parser("tendencia", help="Evolución semanal de un campo de resultado.")
+    tendencia.add_argument("campo")
+    filtros(tendencia)
+
+    indexar = ordenes.add_parser("indexar", help="Crear un índice por un campo de resultado.")
+    indexar.add_argument("campo")
+    return parser
+
+def _escribir_filas(filas: list, ruta: str, formato: str, campos: list):
+    salida = sys.stdout if ruta == "-" else open(ruta, "w", newline="", encoding="utf-8")
+    try:
+        if formato == "csv":
+            escritor = csv.DictWriter(salida, fieldnames=campos, extrasaction="ignore", restval="")
+            escritor.writeheader()
+            for fila in filas:
+                escritor.writerow({k: json.dumps(v, ensure_ascii=False) if isinstance(v, dict) else v for k, v in fila.items()})
+        else:
+            for fila in filas:
+                salida.write(json.dumps(fila, ensure_ascii=False) + "\n")
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+
+def main(argv=None) -> int:
+    args = construir_parser().parse_args(argv)
+    historial = Historial(args.db)
+    inicio = time.perf_counter()
+    try:
+        if args.orden == "importar":
+            n = sum(_importar(historial, ruta, args.regimen) for ruta in args.entrada)
+            print(f"{n} cálculos guardados, {historial.descartados} filas con errores descartadas "
+                  f"({time.perf_counter() - inicio:.1f} s).", file=sys.stderr)
+        elif args.orden == "indexar":
+            historial.indexar(args.campo)
+        elif args.orden == "consultar":
+            filas = historial.consultar(args.regimen, args.centro, args.desde, args.hasta, args.donde,
+                                        args.incumple, args.todos, args.limite, args.detalle)
+            if args.detalle:
+                campos = ["id", "instante", "origen", "centro", "semana", "regimen", "ocupacion", *CAMPOS_RESULTADO, "horas"]
+            else:
+                campos = list(dict.fromkeys(["id", "centro", "semana", "regimen", "ocupacion", "cumple",
+                                             *(campo for campo, _, _ in args.donde)]))
+            _escribir_filas(filas, args.salida, _formato(args.salida, args.formato_salida), campos)
+            print(f"{len(filas)} cálculos en {(time.perf_counter() - inicio) * 1000:.1f} ms.", file=sys.stderr)
+        else:
+            filas = historial.tendencia(args.campo, args.regimen, args.centro, args.desde, args.hasta, args.todos)
+            campos = ["semana", "calculos", "media", "minimo", "maximo", "cumplen"]
+            _escribir_filas(filas, args.salida, _formato(args.salida, args.formato_salida), campos)
+            print(f"{len(filas)} semanas en {(time.perf_counter() - inicio) * 1000:.1f} ms.", file=sys.stderr)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        historial.cerrar()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
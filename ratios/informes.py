@@ -0,0 +1,270 @@
+"""
+Generación de los informes semanales en HTML (Orden 2680/2024 y CAM AM).
+
+Cada informe lleva una única hoja de estilos: el logo se incrusta una sola
+vez (como fondo de la clase .logo) aunque aparezca en cabecera y pie, y los
+estilos de las líneas de cumplimiento son clases en lugar de atributos
+style= repetidos. comprimir_informe() genera la versión .html.gz.
+
+informe_cacheado() construye un informe solo cuando se pide y lo guarda en
+una caché LRU de proceso indexada por un hash del resultado, las fechas del
+periodo y el logo, de modo que las peticiones repetidas con los mismos datos
+no vuelven a generar ninguna cadena.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from ratios import metricas
+from ratios.calculo import verificar_cam_am
+from ratios.formato import formatear_numero, si_cumple_texto
+
+ESTILOS_INFORME = """body {
+      font-family: Arial, sans-serif; margin: 20px; line-height: 1.4; color: #333;
+    }
+    h1, h2, h3 {
+      color: #333;
+    }
+    table {
+      border-collapse: collapse; margin: 10px 0;
+    }
+    th, td {
+      border: 1px solid #aaa; padding: 8px;
+    }
+    .branding {
+      text-align: center; padding: 10px; margin-top: 10px;
+    }
+    .branding a {
+      color: blue; text-decoration: none; font-size: 20px;
+    }
+    .ok { color: green; }
+    .ko { color: red; }
+    .estado { font-weight: bold; }
+    .conclusion { font-size: 18px; }
+    .resaltado {
+      display: inline-block; font-weight: bold; background-color: yellow; padding: 0.2em;
+    }"""
+
+def _estilo_logo(logo: dict) -> str:
+    if not logo or not logo.get("data_uri"):
+        return ""
+    if logo.get("ancho") and logo.get("alto"):
+        proporcion = f"aspect-ratio: {logo['ancho']} / {logo['alto']};"
+    else:
+        proporcion = "height: 60px;"
+    return f"""
+    .logo {{
+      display: inline-block; width: 100%; max-width: {logo.get('max_width', 200)}px; {proporcion}
+      background: url({logo['data_uri']}) center / contain no-repeat;
+      -webkit-print-color-adjust: exact; print-color-adjust: exact;
+    }}"""
+
+def _branding(logo: dict) -> str:
+    logo = logo or {}
+    url = logo.get("url", "https://www.mayores.ai")
+    if logo.get("data_uri"):
+        contenido = f'<span class="logo" role="img" aria-label="{logo.get("alt", "Logo")}"></span>'
+    else:
+        contenido = url.split("://")[-1]
+    return f"""  <div class="branding">
+    <a href="{url}" target="_blank">{contenido}</a>
+  </div>"""
+
+def _firma_logo(logo: dict) -> tuple:
+    """
+    Identifica un logo sin recorrer su data URI (Python memoriza el hash
+    de cada cadena).
+    """
+    logo = logo or {}
+    return (
+        hash(logo.get("data_uri")), logo.get("ancho"), logo.get("alto"),
+        logo.get("max_width"), logo.get("alt"), logo.get("url"),
+    )
+
+_cabeceras = {}
+
+def _cabecera(titulo: str, logo: dict) -> str:
+    """
+    <head> del informe con la hoja de estilos y el logo incrustado. Es igual
+    para todos los informes de un mismo tipo y marca, así que se construye
+    una vez por proceso.
+    """
+    clave = (titulo, _firma_logo(logo))
+    cabecera = _cabeceras.get(clave)
+    if cabecera is None:
+        cabecera = _cabeceras[clave] = _construir_cabecera(titulo, logo)
+    return cabecera
+
+def _construir_cabecera(titulo: str, logo: dict) -> str:
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+  <meta charset="UTF-8">
+  <title>{titulo}</title>
+  <style>
+    {ESTILOS_INFORME}{_estilo_logo(logo)}
+  </style>
+</head>"""
+
+def linea_informe(texto: str, cumple: bool) -> str:
+    """
+    Equivalente a colorear_linea para informes: usa clases en vez de style=.
+    """
+    return (
+        f"<p class='{'ok' if cumple else 'ko'}'>{texto} "
+        f"<span class='estado'>{si_cumple_texto(cumple)}</span></p>"
+    )
+
+def _filas_horas(horas: dict) -> str:
+    return "".join(f"<tr><td>{cat}</td><td>{formatear_numero(h):s} h/sem</td></tr>" for cat, h in horas.items())
+
+def generar_html_orden2680(r2: dict, fecha_inicio, fecha_fin, logo: dict = None) -> str:
+    """
+    Informe semanal en HTML a partir del resultado de calcular_orden2680.
+    :param logo: {"data_uri", "ancho", "alto", "max_width", "alt", "url"}
+                 (ver ratios.activos.logo_activo y ratios.marcas).
+    """
+    td2 = r2["total_eq_directa"]
+    rd2 = r2["ratio_directa"]
+    rmin2 = r2["ratio_minima"]
+    cumple_orden = (rd2 >= rmin2)
+    branding = _branding(logo)
+    if r2["deficit"] > 0:
+        conclusion = (
+            "<p class='conclusion ko'>"
+            f"La ratio según los datos obtenidos es de {formatear_numero(rd2)}.<br>"
+            f"La ratio mínima por la ocupación de la residencia es de {formatear_numero(rmin2)}.<br>"
+            f"Para cumplir en esa ratio habría que contratar a {formatear_numero(r2['deficit'])} empleados.<br>"
+            "<span class='resaltado'>"
+            f"El coste anual adicional estimado es {formatear_numero(r2['coste_adicional'])} euros."
+            f"</span><br>(Se estima un coste por persona de {formatear_numero(r2['coste_por_persona'])} €/año)."
+            "</p>"
+        )
+    else:
+        conclusion = "<p class='conclusion ok'>El centro CUMPLE con la ratio mínima requerida.</p>"
+    return f"""{_cabecera("Informe Ratios - Orden 2680-2024", logo)}
+<body>
+  <h1>Informe de Ratios Semanal (Orden 2680-2024)</h1>
+{branding}
+  <p><b>Periodo:</b> {fecha_inicio} al {fecha_fin}</p>
+  <p><b>Plazas autorizadas/ocupadas:</b> {r2['ocupacion']}</p>
+  <h2>Horas Introducidas (Atención Directa)</h2>
+  <table>
+    <tr><th>Categoría</th><th>Horas/sem</th></tr>
+    {_filas_horas(r2["horas_directas"])}
+  </table>
+  <h2>Resultado</h2>
+  <p><b>Total EJC de Atención Directa:</b> {formatear_numero(td2)}</p>
+  <p><b>Ratio de Atención Directa (EJC/residente):</b> {formatear_numero(rd2)}</p>
+  <p><b>Ratio Mínima Requerida:</b> {formatear_numero(rmin2)}</p>
+  <p><b>EJC requeridos:</b> {formatear_numero(r2['ejc_requerido'])}</p>
+  <p><b>Déficit de EJC:</b> {formatear_numero(r2['deficit'])}</p>
+  <p><b>Coste adicional anual estimado:</b> {formatear_numero(r2['coste_adicional'])} €</p>
+  <h2>Verificación de cumplimiento</h2>
+  {linea_informe(f"Atención Directa (mínimo {formatear_numero(rmin2)}): {formatear_numero(rd2)} →", cumple_orden)}
+  {conclusion}
+  <hr>
+  <p>Informe generado automáticamente desde la aplicación (Orden 2680-2024).</p>
+{branding}
+</body>
+</html>"""
+
+def generar_html_cam_am(res: dict, fecha_inicio, fecha_fin, logo: dict = None) -> str:
+    """
+    Informe semanal en HTML a partir del resultado de calcular_cam_am.
+    :param logo: ver generar_html_orden2680.
+    """
+    td = res["total_eq_directa"]
+    tnd = res["total_eq_no_directa"]
+    rd = res["ratio_directa"]
+    rnd = res["ratio_no_directa"]
+    v = verificar_cam_am(res)
+    branding = _branding(logo)
+    return f"""{_cabecera("Informe Ratios - CAM AM", logo)}
+<body>
+  <h1>Informe de Ratios Semanal (CAM AM)</h1>
+{branding}
+  <p><b>Periodo:</b> {fecha_inicio} al {fecha_fin}</p>
+  <p><b>Plazas ocupadas:</b> {res['ocupacion']} residentes</p>
+  <h2>Horas Introducidas (Atención Directa)</h2>
+  <table>
+    <tr><th>Categoría</th><th>Horas/sem</th></tr>
+    {_filas_horas(res["horas_directas"])}
+  </table>
+  <h2>Horas Introducidas (Atención No Directa)</h2>
+  <table>
+    <tr><th>Categoría</th><th>Horas/sem</th></tr>
+    {_filas_horas(res["horas_no_directas"])}
+  </table>
+  <h2>Resultados del Cálculo de Ratios</h2>
+  <p>🔹 <b>Atención Directa</b> → Total EQ: <b>{formatear_numero(td)}</b> | Ratio: <b>{formatear_numero(rd)}</b> por cada 100 residentes</p>
+  <p>🔹 <b>Atención No Directa</b> → Total EQ: <b>{formatear_numero(tnd)}</b> | Ratio: <b>{formatear_numero(rnd)}</b> por cada 100 residentes</p>
+  <h2>Verificación de cumplimiento con la CAM</h2>
+  {linea_informe(f"Atención Directa (mínimo {formatear_numero(v['minimo_directa'])}): {formatear_numero(rd/100)} →", v["cumple_directa"])}
+  {linea_informe(f"Atención No Directa (mínimo {formatear_numero(v['minimo_no_directa'])}): {formatear_numero(rnd/100)} →", v["cumple_nodirecta"])}
+  {linea_informe(f"Gerocultores (mínimo {formatear_numero(v['minimo_gero'])}): {formatear_numero(v['ratio_gero'])} →", v["cumple_gero"])}
+  <h2>🩺 Cálculo de horas Fisioterapia y Terapia Ocupacional</h2>
+  <p><b>Plazas ocupadas:</b> {res['ocupacion']} residentes</p>
+  {linea_informe(f"Fisioterapeuta → Horas requeridas/semana: {formatear_numero(v['horas_req_terapia'])} | Horas introducidas: {formatear_numero(v['h_fisio'])} →", v["cumple_fisio"])}
+  {linea_informe(f"Terapeuta Ocupacional → Horas requeridas/semana: {formatear_numero(v['horas_req_terapia'])} | Horas introducidas: {formatear_numero(v['h_to'])} →", v["cumple_to"])}
+  <h2>🔎 Verificación de requisitos específicos</h2>
+  {linea_informe(f"Trabajador Social: {formatear_numero(v['horas_ts'])} h/sem → (mínimo > 0)", v["cumple_ts"])}
+  {linea_informe(f"Médico: {formatear_numero(v['horas_med'])} h/sem → (mínimo {v['minimo_medico']:g}h/sem)", v["cumple_med"])}
+  {linea_informe(f"Enfermería (ATS/DUE): {formatear_numero(v['horas_enf'])} h/sem → (mínimo {v['minimo_enfermeria']:g}h/sem)", v["cumple_enf"])}
+  <hr>
+  <p>Informe generado automáticamente desde la aplicación (CAM AM).</p>
+{branding}
+</body>
+</html>"""
+
+def comprimir_informe(html: str) -> bytes:
+    """
+    Versión gzip del informe (determinista: sin marca de tiempo).
+    """
+    return gzip.compress(html.encode("utf-8"), compresslevel=9, mtime=0)
+
+# ----------------------------------------------------------------
+# CACHÉ DE INFORMES
+# ----------------------------------------------------------------
+GENERADORES = {
+    "orden2680": generar_html_orden2680,
+    "cam_am": generar_html_cam_am,
+}
+
+MAX_INFORMES_EN_CACHE = 128
+
+_cache_informes = OrderedDict()
+_lock_informes = threading.Lock()
+
+def clave_informe(tipo: str, resultado: dict, fecha_inicio, fecha_fin, logo: dict = None,
+                  comprimido: bool = False) -> str:
+    """
+    Hash de todo lo que determina el contenido del informe.
+    """
+    contenido = json.dumps(
+        [tipo, resultado, str(fecha_inicio), str(fecha_fin), _firma_logo(logo), comprimido],
+        sort_keys=True, default=str, ensure_ascii=False
+    )
+    return hashlib.blake2b(contenido.encode("utf-8"), digest_size=16).hexdigest()
+
+def informe_cacheado(tipo: str, resultado: dict, fecha_inicio, fecha_fin, logo: dict = None,
+                     comprimido: bool = False):
+    """
+    Informe HTML (str) o comprimido (bytes) de tipo "orden2680" o "cam_am".
+    Solo se genera si no está ya en la caché.
+    """
+    clave = clave_informe(tipo, resultado, fecha_inicio, fecha_fin, logo, comprimido)
+    with _lock_informes:
+        if clave in _cache_informes:
+            _cache_informes.move_to_end(clave)
+            return _cache_informes[clave]
+    with metricas.tramo("html", tipo):
+        html = GENERADORES[tipo](resultado, fecha_inicio, fecha_fin, logo)
+    informe = comprimir_informe(html) if comprimido else html
+    with _lock_informes:
+        _cache_informes[clave] = informe
+        while len(_cache_informes) > MAX_INFORMES_EN_CACHE:
+            _cache_informes.popitem(last=False)
+    return informe
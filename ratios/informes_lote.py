@@ -0,0 +1,305 @@
+"""
+Informes HTML por lotes: un informe por centro-semana (Orden 2680/2024 y/o
+CAM AM) escritos en flujo dentro de un ZIP, para las auditorías de fin de mes.
+
+La entrada es la misma que la del modo por lotes (ver ratios.cli): CSV o
+JSONL con 'ocupacion', 'centro', 'semana' y una columna por categoría.
+Opcionalmente, 'fecha_inicio' y 'fecha_fin' por fila; si faltan se usan las
+indicadas por línea de comandos o, en su defecto, la semana.
+
+Los informes se generan en un pool de procesos y cada proceso entrega cada
+informe ya comprimido (deflate), de modo que el proceso principal solo copia
+bytes al ZIP. La cabecera de cada tipo de informe (estilos y logo) se
+construye una vez por proceso. El logo se guarda una sola vez en el ZIP
+(logo.png) y los informes lo enlazan; con --logo-incrustado cada informe
+lleva el suyo, al ancho con el que se muestra. Como en ratios.cli, hay como mucho 2 trozos
+en vuelo por proceso, así que la memoria no depende del número de centros,
+y el ZIP se escribe secuencialmente (admite stdout).
+
+Uso:
+  python -m ratios.informes_lote centros.csv -o informes.zip --procesos 8 --marca pad
+"""
+import argparse
+import base64
+import csv
+import io
+import re
+import struct
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from ratios import activos
+from ratios.calculo import CATEGORIAS_DIRECTAS, CATEGORIAS_NO_DIRECTAS, calcular_orden2680, calcular_cam_am
+from ratios.cli import _formato, _leer_trozos, fila_jsonl, normalizar_fila
+from ratios.informes import GENERADORES
+from ratios.marcas import MARCAS, MARCA_POR_DEFECTO, perfil_marca
+
+FORMATOS = tuple(GENERADORES)
+
+# Filas que se detallan como mucho en errores.csv (el resto solo se cuenta)
+MAX_ERRORES = 10000
+
+# ----------------------------------------------------------------
+# ESCRITURA DEL ZIP
+# ----------------------------------------------------------------
+class EscritorZip:
+    """
+    ZIP de escritura secuencial a partir de miembros ya comprimidos
+    (deflate sin cabecera, con su CRC-32 y tamaños). No necesita hacer seek,
+    por lo que sirve para ficheros, sockets o stdout. Sin ZIP64: admite
+    hasta 65535 miembros y 4 GiB en total.
+    """
+    _MAXIMO = 0xFFFFFFFF
+
+    def __init__(self, salida, fecha_hora: tuple = None):
+        self.salida = salida
+        self.desplazamiento = 0
+        self.central = []
+        anio, mes, dia, hora, minuto, segundo = (fecha_hora or time.localtime())[:6]
+        self._fecha = ((anio - 1980) << 9) | (mes << 5) | dia
+        self._hora = (hora << 11) | (minuto << 5) | (segundo // 2)
+
+    def _escribir(self, datos: bytes):
+        self.salida.write(datos)
+        self.desplazamiento += len(datos)
+
+    def anadir(self, nombre: str, comprimido: bytes, crc: int, tam: int, metodo: int = 8):
+        """
+        Añade un miembro ya comprimido (metodo 8 = deflate, 0 = sin comprimir).
+        """
+        if len(self.central) >= 0xFFFF or self.desplazamiento + len(comprimido) > self._MAXIMO:
+            raise ValueError("El ZIP supera 65535 informes o 4 GiB; divida la entrada en varios lotes.")
+        nombre_bytes = nombre.encode("utf-8")
+        # bit 11: nombres en UTF-8
+        comunes = struct.pack(
+            "<HHHHHIIIHH", 20, 0x0800, metodo, self._hora, self._fecha,
+            crc, len(comprimido), tam, len(nombre_bytes), 0
+        )
+        self.central.append((comunes, nombre_bytes, self.desplazamiento))
+        self._escribir(b"PK\x03\x04" + comunes + nombre_bytes)
+        self._escribir(comprimido)
+
+    def anadir_texto(self, nombre: str, texto: str):
+        datos = texto.encode("utf-8")
+        self.anadir(nombre, *comprimir_miembro(datos))
+
+    def cerrar(self):
+        """
+        Escribe el directorio central. No cierra 'salida'.
+        """
+        inicio = self.desplazamiento
+        for comunes, nombre_bytes, desplazamiento in self.central:
+            self._escribir(
+                b"PK\x01\x02" + struct.pack("<H", 20) + comunes
+                + struct.pack("<HHHII", 0, 0, 0, 0, desplazamiento) + nombre_bytes
+            )
+        n = len(self.central)
+        self._escribir(
+            b"PK\x05\x06" + struct.pack("<HHHHIIH", 0, 0, n, n, self.desplazamiento - inicio, inicio, 0)
+        )
+
+def comprimir_miembro(datos: bytes, nivel: int = 6) -> tuple:
+    """
+    (deflate sin cabecera, CRC-32, tamaño original) para EscritorZip.anadir.
+    """
+    compresor = zlib.compressobj(nivel, zlib.DEFLATED, -15)
+    return compresor.compress(datos) + compresor.flush(), zlib.crc32(datos), len(datos)
+
+# ----------------------------------------------------------------
+# GENERACIÓN (en cada proceso)
+# ----------------------------------------------------------------
+_logo = None
+
+def _iniciar_proceso(logo: dict):
+    """
+    Inicializador del pool: el logo se envía una vez por proceso, no por trozo.
+    """
+    global _logo
+    _logo = logo
+
+def logo_de_marca(nombre: str = None, escala: int = 2) -> dict:
+    """
+    Logo de los informes de una marca ({"data_uri", "ancho", "alto",
+    "max_width", "alt", "url"}), a 'escala' veces su ancho en pantalla
+    (2, como en la aplicación, para pantallas de alta densidad).
+    """
+    perfil = perfil_marca(nombre or MARCA_POR_DEFECTO)
+    activo = activos.logo_activo(perfil["logo"], escala * perfil["logo_max_width"])
+    return {**activo, "max_width": perfil["logo_max_width"], "alt": perfil["logo_alt"], "url": perfil["url"]}
+
+def _logo_compartido(zip_salida: EscritorZip, logo: dict) -> dict:
+    """
+    Guarda la imagen del logo una vez en la raíz del ZIP y devuelve el logo
+    que usan los informes, que la enlazan (../logo.<ext>, ya que están en
+    <formato>/) en lugar de incrustar cada uno la misma data URI.
+    """
+    cabecera, _, datos = logo["data_uri"].partition(",")
+    imagen = base64.b64decode(datos)
+    nombre = "logo." + cabecera[len("data:image/"):].split(";")[0]
+    # PNG y WebP ya van comprimidos: se guardan tal cual
+    zip_salida.anadir(nombre, imagen, zlib.crc32(imagen), len(imagen), metodo=0)
+    return {**logo, "data_uri": f"../{nombre}"}
+
+def _resultado(formato: str, ocupacion: int, horas: dict) -> dict:
+    directas = {cat: horas.get(cat, 0.0) for cat in CATEGORIAS_DIRECTAS}
+    if formato == "orden2680":
+        return calcular_orden2680(ocupacion, directas)
+    no_directas = {cat: horas.get(cat, 0.0) for cat in CATEGORIAS_NO_DIRECTAS}
+    return calcular_cam_am(ocupacion, directas, no_directas)
+
+def _nombre_base(centro, semana) -> str:
+    partes = [str(p) for p in (centro, semana) if p not in (None, "")]
+    return re.sub(r"[^\w.-]+", "_", "_".join(partes)).strip("_.")
+
+def renderizar_fila(fila: dict, formatos: tuple, fecha_inicio=None, fecha_fin=None, logo: dict = None):
+    """
+    Genera (formato, html) de cada formato pedido para una fila cruda.
+    Lanza ValueError si la fila no es válida.
+    """
+    # Los dos informes usan las categorías de CAM AM (directas + no directas),
+    # sea cual sea el régimen de la fila
+    centro = normalizar_fila({**fila, "regimen": "cam_am"})
+    if centro["ocupacion"] <= 0:
+        raise ValueError("Debe introducir un número de usuarios/residentes mayor que 0.")
+    inicio = fila.get("fecha_inicio") or fecha_inicio or centro["semana"]
+    fin = fila.get("fecha_fin") or fecha_fin or centro["semana"]
+    for formato in formatos:
+        resultado = _resultado(formato, centro["ocupacion"], centro["horas"])
+        yield formato, GENERADORES[formato](resultado, inicio, fin, logo)
+
+def _renderizar_trozo(cabecera, trozo: list, formatos: tuple, fecha_inicio=None, fecha_fin=None):
+    """
+    Genera y comprime los informes de un trozo. Devuelve, por fila,
+    (centro, semana, [(formato, miembro comprimido)], error); una línea JSONL
+    que no se puede leer es un error de esa fila (ver fila_jsonl).
+    """
+    if cabecera is not None:
+        filas = (dict(zip(cabecera, celdas)) for celdas in trozo)
+    else:
+        filas = (fila_jsonl(linea) for linea in trozo if linea.strip())
+    salida = []
+    for fila in filas:
+        if list(fila) == ["error"]:
+            salida.append(("", "", [], fila["error"]))
+            continue
+        centro, semana = fila.get("centro", ""), fila.get("semana", "")
+        try:
+            miembros = [
+                (formato, comprimir_miembro(html.encode("utf-8")))
+                for formato, html in renderizar_fila(fila, formatos, fecha_inicio, fecha_fin, _logo)
+            ]
+            salida.append((centro, semana, miembros, ""))
+        except (ValueError, TypeError, KeyError, OverflowError) as e:
+            salida.append((centro, semana, [], str(e)))
+    return salida
+
+# ----------------------------------------------------------------
+# LOTE COMPLETO
+# ----------------------------------------------------------------
+def generar_zip(entrada, salida, formato_entrada: str, formatos: tuple = FORMATOS, logo: dict = None,
+                fecha_inicio=None, fecha_fin=None, procesos: int = 1, tam_lote: int = 50,
+                logo_incrustado: bool = False) -> dict:
+    """
+    Escribe en 'salida' (binario) un ZIP con <formato>/<centro>_<semana>.html
+    por cada fila y formato, más errores.csv si alguna fila no es válida
+    (con el detalle de las MAX_ERRORES primeras). El logo se guarda una vez
+    como logo.<ext>, salvo con 'logo_incrustado', en que va dentro de cada
+    informe.
+    Devuelve {"informes": n, "errores": n}.
+    """
+    zip_salida = EscritorZip(salida)
+    if logo and not logo_incrustado and logo.get("data_uri", "").startswith("data:"):
+        logo = _logo_compartido(zip_salida, logo)
+    nombres = set()
+    errores = io.StringIO()
+    escritor_errores = csv.writer(errores)
+    cuenta = {"informes": 0, "errores": 0}
+    fila_n = 0
+
+    def volcar(resultados):
+        nonlocal fila_n
+        for centro, semana, miembros, error in resultados:
+            fila_n += 1
+            if error:
+                if cuenta["errores"] < MAX_ERRORES:
+                    escritor_errores.writerow((fila_n, centro, semana, error))
+                cuenta["errores"] += 1
+                continue
+            base = _nombre_base(centro, semana) or f"fila_{fila_n}"
+            for formato, miembro in miembros:
+                nombre = f"{formato}/{base}.html"
+                if nombre in nombres:
+                    nombre = f"{formato}/{base}_fila_{fila_n}.html"
+                nombres.add(nombre)
+                zip_salida.anadir(nombre, *miembro)
+                cuenta["informes"] += 1
+
+    trozos = _leer_trozos(entrada, formato_entrada, tam_lote)
+    if procesos <= 1:
+        _iniciar_proceso(logo)
+        for cabecera, trozo in trozos:
+            volcar(_renderizar_trozo(cabecera, trozo, formatos, fecha_inicio, fecha_fin))
+    else:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso, initargs=(logo,)) as pool:
+            en_vuelo = deque()
+            for cabecera, trozo in trozos:
+                en_vuelo.append(pool.submit(_renderizar_trozo, cabecera, trozo, formatos, fecha_inicio, fecha_fin))
+                if len(en_vuelo) >= 2 * procesos:
+                    volcar(en_vuelo.popleft().result())
+            while en_vuelo:
+                volcar(en_vuelo.popleft().result())
+    if cuenta["errores"]:
+        if cuenta["errores"] > MAX_ERRORES:
+            escritor_errores.writerow(("", "", "", f"... y {cuenta['errores'] - MAX_ERRORES} filas más con error"))
+        zip_salida.anadir_texto("errores.csv", "fila,centro,semana,error\n" + errores.getvalue())
+    zip_salida.cerrar()
+    return cuenta
+
+# ----------------------------------------------------------------
+# PUNTO DE ENTRADA
+# ----------------------------------------------------------------
+def construir_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m ratios.informes_lote",
+        description="Informes HTML por centro (Orden 2680/2024 y CAM AM) en un ZIP."
+    )
+    parser.add_argument("entrada", help="Fichero CSV o JSONL de centros-semana ('-' para stdin).")
+    parser.add_argument("-o", "--salida", default="-", help="Fichero ZIP ('-' para stdout).")
+    parser.add_argument("--formato-entrada", choices=("csv", "jsonl"), help="Por defecto, según la extensión.")
+    parser.add_argument("--formatos", nargs="+", choices=FORMATOS, default=list(FORMATOS),
+                        help="Informes a generar por centro.")
+    parser.add_argument("--marca", choices=tuple(MARCAS), help="Marca del logo de los informes.")
+    parser.add_argument("--sin-logo", action="store_true", help="Informes sin logo.")
+    parser.add_argument("--logo-incrustado", action="store_true",
+                        help="Incrustar el logo (a su ancho en pantalla) en cada informe en lugar de "
+                             "guardarlo una vez en el ZIP; cada informe es autónomo pero el ZIP pesa más.")
+    parser.add_argument("--fecha-inicio", help="Inicio del periodo para las filas sin 'fecha_inicio'.")
+    parser.add_argument("--fecha-fin", help="Fin del periodo para las filas sin 'fecha_fin'.")
+    parser.add_argument("--procesos", type=int, default=1, help="Procesos en paralelo (1 = sin pool).")
+    parser.add_argument("--tam-lote", type=int, default=50, help="Centros por lote enviado a cada proceso.")
+    return parser
+
+def main(argv=None) -> int:
+    args = construir_parser().parse_args(argv)
+    formato_entrada = _formato(args.entrada, args.formato_entrada)
+    logo = None if args.sin_logo else logo_de_marca(args.marca, 1 if args.logo_incrustado else 2)
+    entrada = sys.stdin if args.entrada == "-" else open(args.entrada, newline="", encoding="utf-8")
+    salida = sys.stdout.buffer if args.salida == "-" else open(args.salida, "wb")
+    try:
+        cuenta = generar_zip(
+            entrada, salida, formato_entrada, tuple(args.formatos), logo,
+            args.fecha_inicio, args.fecha_fin, args.procesos, args.tam_lote, args.logo_incrustado
+        )
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+        if salida is not sys.stdout.buffer:
+            salida.close()
+    print(f"{cuenta['informes']} informes generados, {cuenta['errores']} filas con error.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
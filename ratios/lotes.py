@@ -0,0 +1,242 @@
+"""
+Motor de cálculo por lotes (NumPy) para los cuatro regímenes de ratios.
+
+Recibe una matriz de horas semanales (centros × categorías) y un vector de
+ocupación, y devuelve en una sola pasada vectorizada las ratios, los mínimos
+y los indicadores de cumplimiento de:
+  - Orden 2680/2024 (residencias)
+  - CAM AM (residencias)
+  - CAM Centro de Día
+  - Ayuntamiento de Madrid (Centro de Día)
+
+Las operaciones reproducen el mismo orden aritmético que las funciones
+escalares de la aplicación, de modo que los resultados coinciden bit a bit,
+y toman los umbrales de los mismos parámetros de las normativas.
+"""
+import numpy as np
+
+from ratios.calculo import (
+    HORAS_ANUALES_JORNADA_COMPLETA, SEMANAS_AL_ANO,
+    CATEGORIAS, CATEGORIAS_DIRECTAS, CATEGORIAS_NO_DIRECTAS, CATEGORIAS_CAM_CD,
+    coste_por_persona, requisitos_ayuntamiento,
+)
+from ratios.reglas import parametro
+
+# ----------------------------------------------------------------
+# FUNCIONES VECTORIZADAS ELEMENTALES
+# ----------------------------------------------------------------
+def ejc_vectorizado(horas_semanales):
+    """
+    Versión vectorizada de calcular_equivalentes_jornada_completa.
+    """
+    horas_anuales = np.asarray(horas_semanales, dtype=np.float64) * SEMANAS_AL_ANO
+    return horas_anuales / HORAS_ANUALES_JORNADA_COMPLETA
+
+def _dividir(numerador, denominador):
+    """
+    numerador / denominador, devolviendo 0 donde el denominador es 0
+    (mismo criterio que calcular_ratio_cam_cd).
+    """
+    denominador = np.asarray(denominador, dtype=np.float64)
+    salida = np.zeros(np.broadcast(numerador, denominador).shape, dtype=np.float64)
+    return np.divide(numerador, denominador, out=salida, where=denominador > 0)
+
+def horas_fisio_to_vectorizado(plazas):
+    """
+    Versión vectorizada de calcular_horas_fisio_to_residencia.
+    """
+    plazas = np.asarray(plazas, dtype=np.int64)
+    plazas_base = parametro("cam_am", "terapia_plazas_base")
+    base_horas_diarias = parametro("cam_am", "terapia_horas_dia_base")
+    tramo = parametro("cam_am", "terapia_tramo_plazas")
+    horas_tramo = parametro("cam_am", "terapia_horas_dia_tramo")
+    dias_semana = parametro("cam_am", "dias_semana")
+    plazas_adicionales = np.maximum(plazas - plazas_base, 0)
+    incrementos_enteros = plazas_adicionales // tramo
+    resto = plazas_adicionales % tramo
+    horas_adicionales = incrementos_enteros * horas_tramo + (resto / tramo) * horas_tramo
+    return np.where(plazas <= plazas_base, base_horas_diarias * dias_semana, (base_horas_diarias + horas_adicionales) * dias_semana)
+
+def horas_gerocultores_cam_vectorizado(usuarios, normativa: str = "cam_cd"):
+    """
+    Versión vectorizada de calcular_horas_gerocultores_cam.
+    """
+    usuarios = np.asarray(usuarios, dtype=np.int64)
+    bloque = parametro(normativa, "gero_bloque_usuarios")
+    horas_bloque = parametro(normativa, "gero_horas_bloque")
+    bloques_completos = usuarios // bloque
+    resto = usuarios % bloque
+    return bloques_completos * horas_bloque + (resto / bloque) * horas_bloque
+
+def minimos_ayuntamiento_vectorizado(usuarios, normativa: str = "ayuntamiento"):
+    """
+    Versión vectorizada de calcular_minimos_ayuntamiento.
+    Devuelve {categoría: array de horas mínimas}.
+    """
+    usuarios = np.asarray(usuarios, dtype=np.int64)
+    bloque = parametro(normativa, "bloque_usuarios")
+    bloques_completos = usuarios // bloque
+    fraccion = (usuarios % bloque) / bloque
+    positivos = usuarios > 0
+    return {
+        cat: np.where(positivos, (bloques_completos * h) + (fraccion * h), 0.0)
+        for cat, h in requisitos_ayuntamiento(normativa).items()
+    }
+
+# ----------------------------------------------------------------
+# MATRIZ DE HORAS
+# ----------------------------------------------------------------
+class MatrizHoras:
+    """
+    Acceso por nombre de categoría a las columnas de una matriz
+    centros × categorías. Las categorías ausentes se tratan como 0 horas,
+    igual que horas_dict.get(cat, 0.0) en las funciones escalares.
+    """
+    def __init__(self, horas, categorias=CATEGORIAS):
+        horas = np.asarray(horas, dtype=np.float64)
+        if horas.ndim != 2 or horas.shape[1] != len(categorias):
+            raise ValueError(
+                f"La matriz de horas debe ser (centros × {len(categorias)}), "
+                f"se recibió {horas.shape}"
+            )
+        self.horas = horas
+        self.indices = {cat: i for i, cat in enumerate(categorias)}
+        self._ejc = ejc_vectorizado(horas)
+        self._ceros = np.zeros(horas.shape[0], dtype=np.float64)
+
+    def columna(self, cat):
+        i = self.indices.get(cat)
+        return self._ceros if i is None else self.horas[:, i]
+
+    def ejc(self, cat):
+        i = self.indices.get(cat)
+        return self._ceros if i is None else self._ejc[:, i]
+
+    def suma_ejc(self, categorias):
+        """
+        Suma acumulada columna a columna (en el mismo orden que sum() en
+        las funciones escalares) para conservar el redondeo exacto.
+        """
+        total = np.zeros_like(self._ceros)
+        for cat in categorias:
+            total = total + self.ejc(cat)
+        return total
+
+# ----------------------------------------------------------------
+# EVALUACIÓN POR RÉGIMEN
+# ----------------------------------------------------------------
+def evaluar_orden2680(matriz: MatrizHoras, ocupacion) -> dict:
+    """
+    Orden 2680/2024: ratio de atención directa (mínimo 0,45 si > 50 plazas,
+    0,37 en otro caso), EJC requeridos, déficit y coste adicional estimado.
+    """
+    ocupacion = np.asarray(ocupacion, dtype=np.int64)
+    total_eq_directa = matriz.suma_ejc(CATEGORIAS_DIRECTAS)
+    ratio_directa = _dividir(total_eq_directa, ocupacion)
+    ratio_minima = np.where(
+        ocupacion > parametro("orden2680", "plazas_umbral"),
+        parametro("orden2680", "ratio_minima_sobre_umbral"),
+        parametro("orden2680", "ratio_minima_hasta_umbral")
+    )
+    ejc_requerido = ocupacion * ratio_minima
+    deficit = np.maximum(ejc_requerido - total_eq_directa, 0)
+    return {
+        "total_eq_directa": total_eq_directa,
+        "ratio_directa": ratio_directa,
+        "ratio_minima": ratio_minima,
+        "ejc_requerido": ejc_requerido,
+        "deficit": deficit,
+        "coste_adicional": deficit * coste_por_persona(),
+        "cumple": ratio_directa >= ratio_minima,
+    }
+
+def evaluar_cam_am(matriz: MatrizHoras, ocupacion) -> dict:
+    """
+    CAM AM (residencias): ratios directa/no directa (por 100 residentes),
+    gerocultores, horas de fisioterapia/TO y requisitos específicos.
+    """
+    ocupacion = np.asarray(ocupacion, dtype=np.int64)
+    total_eq_directa = matriz.suma_ejc(CATEGORIAS_DIRECTAS)
+    total_eq_no_directa = matriz.suma_ejc(CATEGORIAS_NO_DIRECTAS)
+    ratio_directa = _dividir(total_eq_directa, ocupacion) * 100
+    ratio_no_directa = _dividir(total_eq_no_directa, ocupacion) * 100
+    ratio_gero = _dividir(matriz.ejc("Gerocultor"), ocupacion)
+    horas_req_terapia = horas_fisio_to_vectorizado(ocupacion)
+    cumple = {
+        "directa": (ratio_directa / 100) >= parametro("cam_am", "ratio_min_directa"),
+        "no_directa": (ratio_no_directa / 100) >= parametro("cam_am", "ratio_min_no_directa"),
+        "gerocultores": ratio_gero >= parametro("cam_am", "ratio_min_gero"),
+        "fisioterapia": matriz.columna("Fisioterapeuta") >= horas_req_terapia,
+        "terapia_ocupacional": matriz.columna("Terapeuta Ocupacional") >= horas_req_terapia,
+        "trabajador_social": matriz.columna("Trabajador Social") > 0,
+        "medico": matriz.columna("Médico") >= parametro("cam_am", "horas_min_medico"),
+        "enfermeria": matriz.columna("ATS/DUE (Enfermería)") >= parametro("cam_am", "horas_min_enfermeria"),
+    }
+    return {
+        "total_eq_directa": total_eq_directa,
+        "total_eq_no_directa": total_eq_no_directa,
+        "ratio_directa": ratio_directa,
+        "ratio_no_directa": ratio_no_directa,
+        "ratio_gero": ratio_gero,
+        "horas_req_terapia": horas_req_terapia,
+        "cumple_detalle": cumple,
+        "cumple": np.logical_and.reduce(list(cumple.values())),
+    }
+
+def evaluar_cam_cd(matriz: MatrizHoras, usuarios, sumar_ruta=False) -> dict:
+    """
+    CAM Centro de Día: ratio de atención directa (mínimo 0,23) y horas de
+    gerocultores (225h por cada 35 usuarios o fracción). Con sumar_ruta,
+    umbrales del paquete cam_ayto (como calcular_ratio_cam_cd).
+    """
+    normativa = "cam_ayto" if sumar_ruta else "cam_cd"
+    usuarios = np.asarray(usuarios, dtype=np.int64)
+    total_ejc_directa = matriz.suma_ejc(CATEGORIAS_CAM_CD)
+    ratio_directa = _dividir(total_ejc_directa, usuarios)
+    horas_min_gero = horas_gerocultores_cam_vectorizado(usuarios, normativa)
+    horas_gero = matriz.columna("Gerocultor")
+    if sumar_ruta:
+        horas_gero = horas_gero + matriz.columna("Gerocultor (aux. ruta)")
+    cumple_ratio = ratio_directa >= parametro(normativa, "ratio_min_directa")
+    cumple_gero = horas_gero >= horas_min_gero
+    return {
+        "ratio_directa": ratio_directa,
+        "cumple_ratio": cumple_ratio,
+        "horas_gero": horas_gero,
+        "horas_min_gero": horas_min_gero,
+        "cumple_gero": cumple_gero,
+        "cumple": cumple_ratio & cumple_gero,
+    }
+
+def evaluar_ayuntamiento(matriz: MatrizHoras, usuarios, normativa: str = "ayuntamiento") -> dict:
+    """
+    Ayuntamiento de Madrid (Centro de Día): horas mínimas por categoría
+    por bloque de 30 usuarios (o fracción).
+    """
+    requerido = minimos_ayuntamiento_vectorizado(usuarios, normativa)
+    cumple = {cat: matriz.columna(cat) >= req for cat, req in requerido.items()}
+    return {
+        "requerido": requerido,
+        "cumple_detalle": cumple,
+        "cumple": np.logical_and.reduce(list(cumple.values())),
+    }
+
+def evaluar_lote(horas, ocupacion, categorias=CATEGORIAS, sumar_ruta=False) -> dict:
+    """
+    Evalúa todos los centros frente a los cuatro regímenes en una pasada.
+
+    :param horas: matriz (centros × categorías) de horas semanales.
+    :param ocupacion: vector de plazas ocupadas / usuarios por centro.
+    :param categorias: nombre de cada columna de 'horas'.
+    :param sumar_ruta: para CAM Centro de Día, suma "Gerocultor (aux. ruta)".
+    """
+    matriz = horas if isinstance(horas, MatrizHoras) else MatrizHoras(horas, categorias)
+    ocupacion = np.asarray(ocupacion, dtype=np.int64)
+    if ocupacion.shape != (matriz.horas.shape[0],):
+        raise ValueError("El vector de ocupación debe tener una entrada por centro")
+    return {
+        "orden2680": evaluar_orden2680(matriz, ocupacion),
+        "cam_am": evaluar_cam_am(matriz, ocupacion),
+        "cam_cd": evaluar_cam_cd(matriz, ocupacion, sumar_ruta=sumar_ruta),
+        "ayuntamiento": evaluar_ayuntamiento(matriz, ocupacion),
+    }
@@ -0,0 +1,83 @@
+"""
+Perfiles de marca (tenant): logo, ancho del logo, texto alternativo y URL.
+
+Un mismo proceso sirve todas las marcas; la marca de cada sesión se elige,
+por este orden, con:
+  1. el parámetro de consulta ?marca=pad
+  2. la cabecera Host (p. ej. pad.ejemplo.com o un host listado en 'hosts')
+  3. la variable de entorno RATIOS_MARCA
+  4. MARCA_POR_DEFECTO
+
+Se pueden añadir o redefinir marcas con un JSON indicado en RATIOS_MARCAS:
+  {"otra": {"logo": "/ruta/logo_otra.png", "logo_max_width": 300, "logo_alt": "Otra"}}
+"""
+import json
+import os
+
+DIRECTORIO_BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MARCA_POR_DEFECTO = "mayores"
+
+MARCAS = {
+    "mayores": {
+        "logo": os.path.join(DIRECTORIO_BASE, "logo.png"),
+        "logo_max_width": 200,
+        "logo_alt": "Logo",
+        "url": "https://www.mayores.ai",
+        "hosts": (),
+    },
+    "pad": {
+        "logo": os.path.join(DIRECTORIO_BASE, "logo_pad.png"),
+        "logo_max_width": 600,
+        "logo_alt": "logo_pad",
+        "url": "https://www.mayores.ai",
+        "hosts": (),
+    },
+}
+
+def _cargar_marcas_extra():
+    ruta = os.environ.get("RATIOS_MARCAS")
+    if not ruta:
+        return
+    with open(ruta, encoding="utf-8") as f:
+        extra = json.load(f)
+    for nombre, perfil in extra.items():
+        base = dict(MARCAS.get(nombre, MARCAS[MARCA_POR_DEFECTO]))
+        base.update(perfil)
+        base["hosts"] = tuple(base.get("hosts", ()))
+        MARCAS[nombre] = base
+
+_cargar_marcas_extra()
+
+def _marca_por_host(host: str):
+    if not host:
+        return None
+    host = host.split(":")[0].lower()
+    for nombre, perfil in MARCAS.items():
+        if host in perfil["hosts"]:
+            return nombre
+    subdominio = host.split(".")[0]
+    return subdominio if subdominio in MARCAS else None
+
+def resolver_marca(query_params=None, host: str = None) -> str:
+    """
+    Devuelve el nombre de la marca para una petición (ver orden en el módulo).
+    """
+    solicitada = (query_params or {}).get("marca")
+    if isinstance(solicitada, list):
+        solicitada = solicitada[0] if solicitada else None
+    if solicitada in MARCAS:
+        return solicitada
+    por_host = _marca_por_host(host)
+    if por_host:
+        return por_host
+    por_entorno = os.environ.get("RATIOS_MARCA")
+    if por_entorno in MARCAS:
+        return por_entorno
+    return MARCA_POR_DEFECTO
+
+def perfil_marca(nombre: str) -> dict:
+    """
+    Perfil de una marca; si no existe, el de la marca por defecto.
+    """
+    return MARCAS.get(nombre, MARCAS[MARCA_POR_DEFECTO])
@@ -0,0 +1,248 @@
+"""
+Métricas de la aplicación: tramos de tiempo por fase de cada rerun y
+contadores por modo, exportables en formato de texto de Prometheus.
+
+  with tramo("calculo", "orden2680"):   # histograma ratios_fase_segundos
+      ...
+  contar("descargas", "cam_am")         # contador ratios_descargas_total
+  contar("descarga_bytes", "cam_am", len(informe))
+
+Fases medidas por la interfaz: rerun (completo), activos (logo), modo
+(widgets del modo, cálculo incluido), calculo, html (construcción del
+informe) y descarga (payload servido). Contadores: reruns, calculos,
+descargas, descarga_bytes. La exportación incluye también los contadores
+de las cachés de logos (ratios.activos) y de resultados
+(ratios.cache_resultados).
+
+Configuración (variables de entorno):
+  RATIOS_METRICAS=0             desactiva todo: tramo() devuelve un
+                                contexto nulo compartido y contar() no hace
+                                nada (sin reloj, sin lock, sin memoria)
+  RATIOS_METRICAS_FICHERO=ruta  escribe las métricas en un fichero (de forma
+                                atómica) como mucho cada
+                                RATIOS_METRICAS_INTERVALO segundos (10)
+  RATIOS_METRICAS_PUERTO=9108   sirve las métricas en http://127.0.0.1:<puerto>/metrics
+                                y el informe de causas de rerun (ratios.causas)
+                                en /causas (JSON)
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ACTIVAS = os.environ.get("RATIOS_METRICAS", "1").lower() not in ("0", "false", "no", "off")
+FICHERO = os.environ.get("RATIOS_METRICAS_FICHERO")
+PUERTO = os.environ.get("RATIOS_METRICAS_PUERTO")
+INTERVALO_SEGUNDOS = float(os.environ.get("RATIOS_METRICAS_INTERVALO", "10"))
+
+# Límites superiores (segundos) de los cubos del histograma
+CUBOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_AYUDA_CONTADORES = {
+    "reruns": "Reruns completos del script por modo.",
+    "calculos": "Cálculos de ratios por modo.",
+    "descargas": "Informes descargados por modo.",
+    "descarga_bytes": "Bytes de informes servidos por modo.",
+}
+
+_lock = threading.Lock()
+_contadores = {}    # (nombre, modo) -> valor
+_histogramas = {}   # (fase, modo) -> [conteos por cubo..., +Inf, suma]
+_exportacion = {"ultima": 0.0, "servidor": None}
+
+# ----------------------------------------------------------------
+# REGISTRO
+# ----------------------------------------------------------------
+def _observar(fase: str, modo: str, segundos: float):
+    with _lock:
+        valores = _histogramas.get((fase, modo))
+        if valores is None:
+            valores = _histogramas[(fase, modo)] = [0] * (len(CUBOS) + 1) + [0.0]
+        for i, limite in enumerate(CUBOS):
+            if segundos <= limite:
+                valores[i] += 1
+                break
+        else:
+            valores[len(CUBOS)] += 1
+        valores[-1] += segundos
+
+class _Tramo:
+    __slots__ = ("fase", "modo", "inicio")
+
+    def __init__(self, fase: str, modo: str):
+        self.fase = fase
+        self.modo = modo
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        _observar(self.fase, self.modo, time.perf_counter() - self.inicio)
+        return False
+
+_NULO = contextlib.nullcontext()
+
+if ACTIVAS:
+    def tramo(fase: str, modo: str = ""):
+        """
+        Contexto que mide la duración de una fase (también si termina con
+        una excepción, p. ej. st.stop()).
+        """
+        return _Tramo(fase, modo)
+
+    def contar(nombre: str, modo: str = "", valor: float = 1):
+        """
+        Suma 'valor' al contador 'nombre' del modo.
+        """
+        with _lock:
+            _contadores[(nombre, modo)] = _contadores.get((nombre, modo), 0) + valor
+else:
+    def tramo(fase: str, modo: str = ""):
+        return _NULO
+
+    def contar(nombre: str, modo: str = "", valor: float = 1):
+        pass
+
+def reiniciar():
+    """Pone a cero todos los contadores e histogramas."""
+    with _lock:
+        _contadores.clear()
+        _histogramas.clear()
+
+# ----------------------------------------------------------------
+# EXPORTACIÓN
+# ----------------------------------------------------------------
+def _etiqueta(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _numero(valor) -> str:
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+def _metricas_caches() -> list:
+    from ratios import activos, cache_resultados
+    lineas = []
+    for prefijo, datos in (("ratios_cache_logos", activos.estadisticas()),
+                           ("ratios_cache_resultados", cache_resultados.estadisticas())):
+        for nombre, valor in datos.items():
+            if nombre in ("entradas", "bytes_en_cache"):
+                lineas += [f"# TYPE {prefijo}_{nombre} gauge", f"{prefijo}_{nombre} {_numero(valor)}"]
+            else:
+                lineas += [f"# TYPE {prefijo}_{nombre}_total counter", f"{prefijo}_{nombre}_total {_numero(valor)}"]
+    return lineas
+
+def _metricas_causas() -> list:
+    from ratios import causas
+    resumen = causas.resumen_por_causa()
+    if not resumen:
+        return []
+    lineas = [
+        "# HELP ratios_rerun_causa_total Reruns por widget que los provocó.",
+        "# TYPE ratios_rerun_causa_total counter",
+    ]
+    lineas += [f'ratios_rerun_causa_total{{causa="{_etiqueta(causa)}"}} {reruns}' for causa, (reruns, _) in sorted(resumen.items())]
+    lineas += [
+        "# HELP ratios_rerun_causa_segundos_total Tiempo de rerun por widget que lo provocó.",
+        "# TYPE ratios_rerun_causa_segundos_total counter",
+    ]
+    lineas += [f'ratios_rerun_causa_segundos_total{{causa="{_etiqueta(causa)}"}} {_numero(segundos)}' for causa, (_, segundos) in sorted(resumen.items())]
+    return lineas
+
+def exportar_prometheus() -> str:
+    """
+    Métricas actuales en el formato de texto de Prometheus (versión 0.0.4).
+    """
+    with _lock:
+        contadores = dict(_contadores)
+        histogramas = {clave: list(valores) for clave, valores in _histogramas.items()}
+    lineas = []
+    for nombre in dict.fromkeys([nombre for nombre, _ in sorted(contadores)]):
+        metrica = f"ratios_{nombre}_total"
+        lineas.append(f"# HELP {metrica} {_AYUDA_CONTADORES.get(nombre, nombre)}")
+        lineas.append(f"# TYPE {metrica} counter")
+        for (n, modo), valor in sorted(contadores.items()):
+            if n == nombre:
+                lineas.append(f'{metrica}{{modo="{_etiqueta(modo)}"}} {_numero(valor)}')
+    if histogramas:
+        lineas.append("# HELP ratios_fase_segundos Duración de cada fase de un rerun.")
+        lineas.append("# TYPE ratios_fase_segundos histogram")
+        for (fase, modo), valores in sorted(histogramas.items()):
+            etiquetas = f'fase="{_etiqueta(fase)}",modo="{_etiqueta(modo)}"'
+            acumulado = 0
+            for limite, conteo in zip(CUBOS + ("+Inf",), valores[:-1]):
+                acumulado += conteo
+                lineas.append(f'ratios_fase_segundos_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+            lineas.append(f"ratios_fase_segundos_sum{{{etiquetas}}} {_numero(valores[-1])}")
+            lineas.append(f"ratios_fase_segundos_count{{{etiquetas}}} {acumulado}")
+    lineas += _metricas_causas()
+    lineas += _metricas_caches()
+    return "\n".join(lineas) + "\n"
+
+def escribir_fichero(ruta: str):
+    """
+    Escribe las métricas en 'ruta' de forma atómica (para el textfile
+    collector de node_exporter o para leerlas a mano).
+    """
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(exportar_prometheus())
+    os.replace(temporal, ruta)
+
+def informe_causas() -> dict:
+    """
+    {"interacciones", "tormentas"} de ratios.causas (servido en /causas).
+    """
+    from ratios import causas
+    return {"interacciones": causas.interacciones(), "tormentas": causas.tormentas()}
+
+class _Manejador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        ruta = self.path.split("?")[0]
+        if ruta in ("/", "/metrics"):
+            cuerpo = exportar_prometheus().encode("utf-8")
+            tipo = "text/plain; version=0.0.4; charset=utf-8"
+        elif ruta == "/causas":
+            cuerpo = json.dumps(informe_causas(), ensure_ascii=False, indent=2).encode("utf-8")
+            tipo = "application/json; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+def servir(puerto: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Sirve /metrics en un hilo de fondo y devuelve el servidor.
+    """
+    servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+    threading.Thread(target=servidor.serve_forever, name="ratios-metricas", daemon=True).start()
+    return servidor
+
+def exportar():
+    """
+    Se llama al final de cada rerun: arranca el endpoint una vez por
+    proceso (si hay RATIOS_METRICAS_PUERTO) y reescribe el fichero (si hay
+    RATIOS_METRICAS_FICHERO) como mucho cada INTERVALO_SEGUNDOS.
+    """
+    if not ACTIVAS or not (FICHERO or PUERTO):
+        return
+    ahora = time.monotonic()
+    with _lock:
+        arrancar = PUERTO and _exportacion["servidor"] is None
+        if arrancar:
+            _exportacion["servidor"] = True
+        escribir = FICHERO and ahora - _exportacion["ultima"] >= INTERVALO_SEGUNDOS
+        if escribir:
+            _exportacion["ultima"] = ahora
+    if arrancar:
+        _exportacion["servidor"] = servir(int(PUERTO))
+    if escribir:
+        escribir_fichero(FICHERO)
@@ -0,0 +1,339 @@
+"""
+Normativas declarativas: cada régimen se describe como datos (JSON, TOML o
+YAML) y se compila una sola vez en un plan de evaluación plano.
+
+Estructura de un paquete de reglas (ver ratios/normativas/*.json):
+
+  id             identificador del régimen ("orden2680", "cam_cd"...)
+  titulo         texto para la interfaz
+  orden          posición en los listados (opcional)
+  categorias     categorías de horas que se piden al usuario
+  grupos         listas de categorías con nombre, usables en suma_ejc/suma_horas
+  parametros     {nombre: número o expresión constante} con los umbrales de
+                 la normativa (ratios mínimas, horas mínimas, tamaño de los
+                 bloques, coste por persona...); se usan por nombre en las
+                 expresiones y en "minimo", y las funciones de ratios.calculo,
+                 el motor por lotes, el plan de contratación y los textos de
+                 la interfaz los leen con parametro(), así que editar un
+                 paquete cambia todos los cálculos
+  calculos       {nombre: expresión} evaluadas en orden; cada una puede usar
+                 las anteriores por nombre (o con valor('nombre') si el nombre
+                 no es un identificador válido)
+  comprobaciones {nombre: {"expr": expresión booleana, "etiqueta": texto,
+                  "valor": cálculo o categoría mostrados,
+                  "minimo": cálculo, parámetro o número}}
+
+Funciones disponibles en las expresiones:
+  ocupacion                  plazas ocupadas / usuarios
+  horas('Cat')               horas semanales de una categoría (0 si falta)
+  ejc('Cat')                 EJC de una categoría
+  suma_ejc(GRUPO)            suma de EJC de un grupo, en el orden del grupo
+  suma_horas(GRUPO)          suma de horas de un grupo
+  por_bloques(n, tam, h)     h horas por cada 'tam' usuarios o fracción
+  tramos(n, hasta, base, tam, inc)
+                             'base' hasta 'hasta' usuarios; +inc por cada
+                             'tam' adicionales o fracción
+  max, min, valor('nombre')  (nombre de un cálculo o de un parámetro)
+
+Cada paquete se traduce a una única función Python generada (sumas
+desenrolladas, sin diccionarios intermedios) y se compila con compile(),
+de modo que evaluar un centro no recorre ramas ni estructuras de reglas.
+Las operaciones se generan en el mismo orden que las funciones de
+ratios.calculo, por lo que los resultados coinciden exactamente.
+"""
+import ast
+import json
+import os
+
+from ratios import calculo
+
+DIRECTORIO_NORMATIVAS = os.path.join(os.path.dirname(__file__), "normativas")
+
+# Número de argumentos de cada función: (mínimo, máximo o None si no hay máximo)
+_ARIDAD = {
+    "horas": (1, 1), "ejc": (1, 1), "suma_ejc": (1, 1), "suma_horas": (1, 1), "valor": (1, 1),
+    "por_bloques": (3, 3), "tramos": (5, 5), "max": (2, None), "min": (2, None),
+}
+_NODOS_PERMITIDOS = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Call, ast.Name, ast.Constant, ast.Load, ast.Tuple, ast.List,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.USub, ast.UAdd,
+    ast.And, ast.Or, ast.Not, ast.Gt, ast.GtE, ast.Lt, ast.LtE, ast.Eq, ast.NotEq,
+)
+
+# ----------------------------------------------------------------
+# FUNCIONES AUXILIARES DE LAS EXPRESIONES
+# ----------------------------------------------------------------
+def por_bloques(n: int, tam: int, horas_por_bloque: float) -> float:
+    """
+    horas_por_bloque por cada 'tam' usuarios o fracción (proporcional).
+    """
+    return (n // tam) * horas_por_bloque + ((n % tam) / tam) * horas_por_bloque
+
+def tramos(n: int, hasta: int, base: float, tam: int, incremento: float) -> float:
+    """
+    'base' hasta 'hasta' usuarios; a partir de ahí +incremento por cada
+    'tam' usuarios adicionales o fracción (proporcional).
+    """
+    if n <= hasta:
+        return base
+    adicionales = n - hasta
+    return base + ((adicionales // tam) * incremento + ((adicionales % tam) / tam) * incremento)
+
+# ----------------------------------------------------------------
+# COMPILACIÓN
+# ----------------------------------------------------------------
+class _Traductor(ast.NodeTransformer):
+    """
+    Valida una expresión y la reescribe sobre las variables locales de la
+    función generada.
+    """
+    def __init__(self, normativa_id: str, grupos: dict, locales: dict, parametros: dict):
+        self.normativa_id = normativa_id
+        self.grupos = grupos
+        self.locales = locales
+        self.parametros = parametros
+
+    def error(self, mensaje: str):
+        raise ValueError(f"Normativa '{self.normativa_id}': {mensaje}")
+
+    def generic_visit(self, node):
+        if not isinstance(node, _NODOS_PERMITIDOS):
+            self.error(f"elemento no permitido en expresión: {type(node).__name__}")
+        return super().generic_visit(node)
+
+    def _categorias(self, node) -> list:
+        if isinstance(node, ast.Name) and node.id in self.grupos:
+            return list(self.grupos[node.id])
+        if isinstance(node, (ast.List, ast.Tuple)):
+            return [self._texto(elt) for elt in node.elts]
+        self.error("suma_ejc/suma_horas esperan un grupo o una lista de categorías")
+
+    def _texto(self, node) -> str:
+        if not (isinstance(node, ast.Constant) and isinstance(node.value, str)):
+            self.error("se esperaba un texto literal")
+        return node.value
+
+    @staticmethod
+    def _horas(cat: str):
+        return ast.Call(ast.Name("_h", ast.Load()), [ast.Constant(cat), ast.Constant(0.0)], [])
+
+    @staticmethod
+    def _ejc(nodo_horas):
+        return ast.BinOp(
+            ast.BinOp(nodo_horas, ast.Mult(), ast.Constant(calculo.SEMANAS_AL_ANO)),
+            ast.Div(), ast.Constant(calculo.HORAS_ANUALES_JORNADA_COMPLETA)
+        )
+
+    @staticmethod
+    def _suma(sumandos: list):
+        total = ast.Constant(0.0)
+        for sumando in sumandos:
+            total = ast.BinOp(total, ast.Add(), sumando)
+        return total
+
+    def visit_Name(self, node):
+        if node.id == "ocupacion":
+            return node
+        if node.id in self.locales:
+            return ast.Name(self.locales[node.id], ast.Load())
+        if node.id in self.parametros:
+            return ast.Constant(self.parametros[node.id])
+        self.error(f"nombre desconocido '{node.id}'")
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _ARIDAD or node.keywords:
+            self.error(f"llamada no permitida: {ast.unparse(node)}")
+        nombre = node.func.id
+        minimo, maximo = _ARIDAD[nombre]
+        if len(node.args) < minimo or (maximo is not None and len(node.args) > maximo):
+            esperados = str(minimo) if minimo == maximo else f"al menos {minimo}"
+            self.error(f"{nombre}() espera {esperados} argumento(s): {ast.unparse(node)}")
+        if nombre == "horas":
+            return self._horas(self._texto(node.args[0]))
+        if nombre == "ejc":
+            return self._ejc(self._horas(self._texto(node.args[0])))
+        if nombre == "suma_ejc":
+            return self._suma([self._ejc(self._horas(c)) for c in self._categorias(node.args[0])])
+        if nombre == "suma_horas":
+            return self._suma([self._horas(c) for c in self._categorias(node.args[0])])
+        if nombre == "valor":
+            referencia = self._texto(node.args[0])
+            if referencia in self.locales:
+                return ast.Name(self.locales[referencia], ast.Load())
+            if referencia in self.parametros:
+                return ast.Constant(self.parametros[referencia])
+            self.error(f"valor('{referencia}') no está definido antes de usarse")
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+def _traducir(traductor: _Traductor, expresion: str) -> str:
+    arbol = ast.parse(str(expresion), mode="eval")
+    return ast.unparse(traductor.visit(arbol).body)
+
+class PlanEvaluacion:
+    """
+    Régimen compilado: evaluar(ocupacion, horas) devuelve un diccionario
+    plano con "cumple", los cálculos y las comprobaciones del paquete.
+    """
+    def __init__(self, definicion: dict):
+        self.id = definicion["id"]
+        self.titulo = definicion.get("titulo", self.id)
+        self.categorias = tuple(definicion.get("categorias", ()))
+        self.calculos = tuple(definicion.get("calculos", {}))
+        self.comprobaciones = dict(definicion.get("comprobaciones", {}))
+        self.parametros = {}
+        self._umbrales = {}  # nombres -> tupla de valores (ver umbrales)
+        self._prefijos = {}  # prefijo -> {sufijo: valor} (ver con_prefijo)
+        self.campos = ("cumple",) + self.calculos + tuple(self.comprobaciones)
+        self.codigo = self._generar(definicion)
+        espacio = {"por_bloques": por_bloques, "tramos": tramos}
+        exec(compile(self.codigo, f"<normativa {self.id}>", "exec"), espacio)
+        self.evaluar = espacio["evaluar"]
+
+    def _generar(self, definicion: dict) -> str:
+        grupos = definicion.get("grupos", {})
+        locales = {}
+        traductor = _Traductor(self.id, grupos, locales, self.parametros)
+        for nombre, valor in definicion.get("parametros", {}).items():
+            self.parametros[nombre] = self._parametro(traductor, nombre, valor)
+        lineas = ["def evaluar(ocupacion, horas):", "    _h = horas.get"]
+        for i, (nombre, expresion) in enumerate(definicion.get("calculos", {}).items()):
+            if nombre in self.parametros:
+                traductor.error(f"'{nombre}' es a la vez parámetro y cálculo")
+            lineas.append(f"    c{i} = {_traducir(traductor, expresion)}")
+            locales[nombre] = f"c{i}"
+        comprobaciones = []
+        for i, (nombre, regla) in enumerate(self.comprobaciones.items()):
+            lineas.append(f"    k{i} = bool({_traducir(traductor, regla['expr'])})")
+            locales[nombre] = f"k{i}"
+            comprobaciones.append(f"k{i}")
+        cumple = " and ".join(comprobaciones) or "True"
+        campos = [f"'cumple': {cumple}"] + [f"{nombre!r}: {locales[nombre]}" for nombre in self.campos[1:]]
+        lineas.append("    return {" + ", ".join(campos) + "}")
+        return "\n".join(lineas) + "\n"
+
+    def umbrales(self, *nombres: str) -> tuple:
+        """
+        Valores de los parámetros 'nombres', en ese orden. Se resuelven la
+        primera vez y se reutilizan en las llamadas siguientes (el plan no
+        cambia una vez compilado). Lanza ValueError si falta alguno.
+        """
+        valores = self._umbrales.get(nombres)
+        if valores is None:
+            for nombre in nombres:
+                if nombre not in self.parametros:
+                    raise ValueError(f"La normativa '{self.id}' no define el parámetro '{nombre}'")
+            valores = self._umbrales[nombres] = tuple(self.parametros[nombre] for nombre in nombres)
+        return valores
+
+    def con_prefijo(self, prefijo: str) -> dict:
+        """
+        {sufijo: valor} de los parámetros '<prefijo><sufijo>', en el orden
+        del paquete. Se calcula una vez; el diccionario devuelto es compartido
+        y no debe modificarse.
+        """
+        valores = self._prefijos.get(prefijo)
+        if valores is None:
+            valores = self._prefijos[prefijo] = {
+                nombre[len(prefijo):]: valor
+                for nombre, valor in self.parametros.items() if nombre.startswith(prefijo)
+            }
+        return valores
+
+    @staticmethod
+    def _parametro(traductor: _Traductor, nombre: str, valor):
+        """
+        Valor numérico de un parámetro: un número o una expresión constante
+        ("17000 * 1.32"), que puede usar los parámetros anteriores.
+        """
+        if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            return valor
+        if not isinstance(valor, str):
+            traductor.error(f"el parámetro '{nombre}' debe ser un número o una expresión")
+        arbol = ast.fix_missing_locations(traductor.visit(ast.parse(valor, mode="eval")))
+        try:
+            valor = eval(compile(arbol, f"<parámetro {nombre}>", "eval"), {"__builtins__": {}, "max": max, "min": min,
+                                                                          "por_bloques": por_bloques, "tramos": tramos})
+        except NameError:
+            traductor.error(f"el parámetro '{nombre}' debe ser constante (sin ocupación ni horas)")
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            traductor.error(f"el parámetro '{nombre}' no es un número")
+        return valor
+
+# ----------------------------------------------------------------
+# CARGA
+# ----------------------------------------------------------------
+def leer_definicion(ruta: str) -> dict:
+    """
+    Lee un paquete de reglas en JSON, TOML o YAML (este último requiere PyYAML).
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == ".json":
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    if extension == ".toml":
+        import tomllib
+        with open(ruta, "rb") as f:
+            return tomllib.load(f)
+    if extension in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("Para normativas en YAML instale PyYAML (pip install pyyaml).") from e
+        with open(ruta, encoding="utf-8") as f:
+            return yaml.safe_load(f)
+    raise ValueError(f"Formato de normativa no soportado: '{ruta}'")
+
+def cargar_normativas(directorio: str = DIRECTORIO_NORMATIVAS) -> dict:
+    """
+    Compila todos los paquetes de reglas de un directorio. Devuelve {id: PlanEvaluacion}.
+    """
+    definiciones = [
+        leer_definicion(os.path.join(directorio, nombre))
+        for nombre in os.listdir(directorio)
+        if os.path.splitext(nombre)[1].lower() in (".json", ".toml", ".yaml", ".yml")
+    ]
+    definiciones.sort(key=lambda d: (d.get("orden", float("inf")), d["id"]))
+    return {d["id"]: PlanEvaluacion(d) for d in definiciones}
+
+_PLANES = None
+
+def normativas() -> dict:
+    """
+    Planes compilados de las normativas incluidas (y de las del directorio
+    indicado en RATIOS_NORMATIVAS, si existe). Se compilan una vez por proceso.
+    """
+    global _PLANES
+    if _PLANES is None:
+        planes = cargar_normativas()
+        extra = os.environ.get("RATIOS_NORMATIVAS")
+        if extra and os.path.isdir(extra):
+            planes.update(cargar_normativas(extra))
+        _PLANES = planes
+    return _PLANES
+
+def _plan(regimen: str) -> PlanEvaluacion:
+    """
+    Plan compilado del régimen. Lanza ValueError si no existe.
+    """
+    plan = normativas().get(regimen)
+    if plan is None:
+        raise ValueError(f"Régimen desconocido '{regimen}'")
+    return plan
+
+def parametro(regimen: str, nombre: str):
+    """
+    Valor de un parámetro de la normativa compilada 'regimen'. Lanza
+    ValueError si el régimen no existe o no define el parámetro (p. ej. un
+    paquete de RATIOS_NORMATIVAS que sustituye a uno incluido sin
+    declarar sus umbrales).
+    """
+    return _plan(regimen).umbrales(nombre)[0]
+
+def parametros(regimen: str, *nombres: str) -> tuple:
+    """
+    Valores de varios parámetros de la normativa 'regimen', en ese orden,
+    resueltos una vez por plan compilado (PlanEvaluacion.umbrales).
+    """
+    return _plan(regimen).umbrales(*nombres)
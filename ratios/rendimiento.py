@@ -0,0 +1,310 @@
+"""
+Micro-benchmarks de las funciones de cálculo, formateo e informes, con
+resultados en JSON para detectar regresiones entre versiones.
+
+Casos (cada uno a las escalas que admite):
+  ejc                 calcular_equivalentes_jornada_completa
+  ejc_vectorizado     ratios.lotes.ejc_vectorizado (solo lotes)
+  cam_cd              calcular_ratio_cam_cd
+  cam_cd_vectorizado  ratios.lotes.evaluar_cam_cd (solo lotes)
+  ayuntamiento        comprobar_cumplimiento_ayuntamiento
+  ayuntamiento_vectorizado
+                      ratios.lotes.evaluar_ayuntamiento (solo lotes)
+  formatear_numero, formatear_ratio
+  html_orden2680, html_cam_am
+                      generar_html_* sin caché de informes (1 y 10k)
+
+Escalas: "1" (una llamada, repetida las veces necesarias para medirla),
+"10k" y "1M" (un lote de entradas recorrido en una pasada). Las entradas
+se generan con una semilla fija fuera de la medición; de cada caso se
+guarda el mínimo y la mediana de varias repeticiones y el tiempo por
+operación.
+
+Uso:
+  python -m ratios.rendimiento -o base.json
+  python -m ratios.rendimiento -o nuevo.json --comparar base.json --umbral 0.10 \\
+      --umbral-caso html_cam_am@10k=0.25
+  python -m ratios.rendimiento --casos cam_cd ayuntamiento --escalas 1 10k
+
+Con --comparar, sale con código 1 si algún caso es más lento que en la
+referencia en más del umbral (relativo, sobre el mínimo).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import timeit
+from datetime import date, datetime, timezone
+
+from ratios.calculo import (
+    CATEGORIAS, CATEGORIAS_DIRECTAS, CATEGORIAS_NO_DIRECTAS, CATEGORIAS_CD_TODAS,
+    calcular_equivalentes_jornada_completa, calcular_ratio_cam_cd, comprobar_cumplimiento_ayuntamiento,
+    calcular_orden2680, calcular_cam_am,
+)
+from ratios.formato import formatear_numero, formatear_ratio
+
+ESCALAS = {"1": 1, "10k": 10_000, "1M": 1_000_000}
+
+SEMILLA = 2680
+
+# Umbral de regresión por defecto (0.10 = 10 % más lento)
+UMBRAL_POR_DEFECTO = 0.10
+
+# ----------------------------------------------------------------
+# ENTRADAS
+# ----------------------------------------------------------------
+def _horas(rnd: random.Random, categorias) -> dict:
+    return {cat: round(rnd.uniform(0, 400), 2) for cat in categorias}
+
+# Entradas distintas como máximo; los lotes mayores las repiten (1M de
+# diccionarios de horas ocuparía más de 1 GB)
+MAX_ENTRADAS_DISTINTAS = 10_000
+
+def _lista(n: int, generar) -> list:
+    rnd = random.Random(SEMILLA)
+    base = [generar(rnd) for _ in range(min(n, MAX_ENTRADAS_DISTINTAS))]
+    return (base * -(-n // len(base)))[:n]
+
+def _matriz(n: int):
+    import numpy as np
+    rnd = np.random.default_rng(SEMILLA)
+    return np.round(rnd.uniform(0, 400, (n, len(CATEGORIAS))), 2), rnd.integers(1, 150, n)
+
+# ----------------------------------------------------------------
+# CASOS
+# ----------------------------------------------------------------
+# Cada caso: (escalas, preparar(n) -> función sin argumentos que procesa n entradas)
+def _caso_ejc(n):
+    horas = _lista(n, lambda rnd: rnd.uniform(0, 400))
+    if n == 1:
+        h = horas[0]
+        return lambda: calcular_equivalentes_jornada_completa(h)
+    return lambda: [calcular_equivalentes_jornada_completa(h) for h in horas]
+
+def _caso_ejc_vectorizado(n):
+    from ratios.lotes import ejc_vectorizado
+    horas, _ = _matriz(n)
+    return lambda: ejc_vectorizado(horas)
+
+def _caso_cam_cd(n):
+    filas = _lista(n, lambda rnd: (rnd.randint(1, 150), _horas(rnd, CATEGORIAS_CD_TODAS)))
+    if n == 1:
+        usuarios, horas = filas[0]
+        return lambda: calcular_ratio_cam_cd(usuarios, horas)
+    return lambda: [calcular_ratio_cam_cd(usuarios, horas) for usuarios, horas in filas]
+
+def _caso_cam_cd_vectorizado(n):
+    from ratios.lotes import MatrizHoras, evaluar_cam_cd
+    horas, usuarios = _matriz(n)
+    return lambda: evaluar_cam_cd(MatrizHoras(horas), usuarios)
+
+def _caso_ayuntamiento(n):
+    filas = _lista(n, lambda rnd: (rnd.randint(1, 150), _horas(rnd, CATEGORIAS_CD_TODAS)))
+    if n == 1:
+        usuarios, horas = filas[0]
+        return lambda: comprobar_cumplimiento_ayuntamiento(usuarios, horas)
+    return lambda: [comprobar_cumplimiento_ayuntamiento(usuarios, horas) for usuarios, horas in filas]
+
+def _caso_ayuntamiento_vectorizado(n):
+    from ratios.lotes import MatrizHoras, evaluar_ayuntamiento
+    horas, usuarios = _matriz(n)
+    return lambda: evaluar_ayuntamiento(MatrizHoras(horas), usuarios)
+
+def _caso_formatear_numero(n):
+    valores = _lista(n, lambda rnd: rnd.uniform(0, 1_000_000))
+    if n == 1:
+        v = valores[0]
+        return lambda: formatear_numero(v)
+    return lambda: [formatear_numero(v) for v in valores]
+
+def _caso_formatear_ratio(n):
+    valores = _lista(n, lambda rnd: rnd.uniform(0, 2))
+    if n == 1:
+        v = valores[0]
+        return lambda: formatear_ratio(v)
+    return lambda: [formatear_ratio(v) for v in valores]
+
+def _caso_html(generar, calcular):
+    def preparar(n):
+        resultados = _lista(n, calcular)
+        inicio, fin = date(2024, 1, 1), date(2024, 1, 7)
+        if n == 1:
+            r = resultados[0]
+            return lambda: generar(r, inicio, fin, None)
+        return lambda: [generar(r, inicio, fin, None) for r in resultados]
+    return preparar
+
+def _resultado_orden2680(rnd):
+    return calcular_orden2680(rnd.randint(1, 150), _horas(rnd, CATEGORIAS_DIRECTAS))
+
+def _resultado_cam_am(rnd):
+    return calcular_cam_am(rnd.randint(1, 150), _horas(rnd, CATEGORIAS_DIRECTAS), _horas(rnd, CATEGORIAS_NO_DIRECTAS))
+
+def _casos() -> dict:
+    from ratios.informes import generar_html_orden2680, generar_html_cam_am
+    todas = tuple(ESCALAS)
+    lotes = ("10k", "1M")
+    return {
+        "ejc": (todas, _caso_ejc),
+        "ejc_vectorizado": (lotes, _caso_ejc_vectorizado),
+        "cam_cd": (todas, _caso_cam_cd),
+        "cam_cd_vectorizado": (lotes, _caso_cam_cd_vectorizado),
+        "ayuntamiento": (todas, _caso_ayuntamiento),
+        "ayuntamiento_vectorizado": (lotes, _caso_ayuntamiento_vectorizado),
+        "formatear_numero": (todas, _caso_formatear_numero),
+        "formatear_ratio": (todas, _caso_formatear_ratio),
+        "html_orden2680": (("1", "10k"), _caso_html(generar_html_orden2680, _resultado_orden2680)),
+        "html_cam_am": (("1", "10k"), _caso_html(generar_html_cam_am, _resultado_cam_am)),
+    }
+
+# ----------------------------------------------------------------
+# MEDICIÓN
+# ----------------------------------------------------------------
+def medir(funcion, operaciones: int, repeticiones: int) -> dict:
+    """
+    Mínimo y mediana (segundos por ejecución de 'funcion') de 'repeticiones'
+    mediciones con el recolector de basura desactivado (timeit). Las
+    funciones muy rápidas se ejecutan en bucle hasta superar 0,2 s.
+    """
+    temporizador = timeit.Timer(funcion)
+    bucles, _ = temporizador.autorange()  # sirve también de calentamiento
+    tiempos = [t / bucles for t in temporizador.repeat(repeat=repeticiones, number=bucles)]
+    minimo = min(tiempos)
+    return {
+        "operaciones": operaciones,
+        "repeticiones": repeticiones,
+        "bucles": bucles,
+        "minimo_s": minimo,
+        "mediana_s": statistics.median(tiempos),
+        "ns_por_operacion": minimo * 1e9 / operaciones,
+    }
+
+def entorno() -> dict:
+    """
+    Datos de la máquina y de las versiones, para interpretar los resultados.
+    """
+    try:
+        import numpy
+        version_numpy = numpy.__version__
+    except ImportError:
+        version_numpy = None
+    return {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementacion": platform.python_implementation(),
+        "numpy": version_numpy,
+        "sistema": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+def ejecutar(casos=None, escalas=None, repeticiones: int = 5, informar=None) -> dict:
+    """
+    Ejecuta los casos pedidos (todos por defecto) a las escalas que admiten.
+    :return: {"entorno", "semilla", "resultados" {"caso@escala": medición}}
+    Lanza ValueError si un caso o una escala no existen.
+    """
+    disponibles = _casos()
+    casos = list(casos or disponibles)
+    escalas = list(escalas or ESCALAS)
+    desconocidos = [c for c in casos if c not in disponibles] + [e for e in escalas if e not in ESCALAS]
+    if desconocidos:
+        raise ValueError(f"Casos o escalas desconocidos: {', '.join(desconocidos)}")
+    resultados = {}
+    for caso in casos:
+        admitidas, preparar = disponibles[caso]
+        for escala in escalas:
+            if escala not in admitidas:
+                continue
+            n = ESCALAS[escala]
+            resultados[f"{caso}@{escala}"] = medicion = medir(preparar(n), n, repeticiones)
+            if informar:
+                informar(f"{caso}@{escala}", medicion)
+    return {"entorno": entorno(), "semilla": SEMILLA, "resultados": resultados}
+
+def comparar(actual: dict, referencia: dict, umbral: float = UMBRAL_POR_DEFECTO, umbrales: dict = None) -> list:
+    """
+    Compara el mínimo de cada caso común a ambas ejecuciones.
+    :param umbrales: {"caso@escala" o "caso": umbral} que sustituyen al general.
+    :return: [{"caso", "referencia_s", "actual_s", "cambio", "umbral", "regresion"}]
+    """
+    umbrales = umbrales or {}
+    filas = []
+    for clave, medicion in actual["resultados"].items():
+        base = referencia.get("resultados", {}).get(clave)
+        if base is None:
+            continue
+        limite = umbrales.get(clave, umbrales.get(clave.split("@")[0], umbral))
+        cambio = medicion["minimo_s"] / base["minimo_s"] - 1
+        filas.append({
+            "caso": clave,
+            "referencia_s": base["minimo_s"],
+            "actual_s": medicion["minimo_s"],
+            "cambio": cambio,
+            "umbral": limite,
+            "regresion": cambio > limite,
+        })
+    return filas
+
+# ----------------------------------------------------------------
+# LÍNEA DE COMANDOS
+# ----------------------------------------------------------------
+def _tiempo(segundos: float) -> str:
+    for unidad, factor in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if segundos >= factor:
+            return f"{segundos / factor:.2f} {unidad}"
+    return f"{segundos * 1e9:.0f} ns"
+
+def _umbral_caso(texto: str):
+    caso, _, valor = texto.partition("=")
+    if not caso or not valor:
+        raise argparse.ArgumentTypeError("Formato esperado: caso[@escala]=umbral")
+    return caso, float(valor)
+
+def construir_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m ratios.rendimiento",
+        description="Micro-benchmarks de cálculo, formateo e informes."
+    )
+    parser.add_argument("-o", "--salida", help="Fichero JSON de resultados.")
+    parser.add_argument("--casos", nargs="+", help="Casos a medir (por defecto, todos).")
+    parser.add_argument("--escalas", nargs="+", choices=tuple(ESCALAS), help="Escalas (por defecto, todas).")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Mediciones por caso.")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior para detectar regresiones.")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_POR_DEFECTO,
+                        help="Empeoramiento relativo máximo admitido (0.10 = 10 %%).")
+    parser.add_argument("--umbral-caso", type=_umbral_caso, action="append", default=[],
+                        help="Umbral propio de un caso: caso[@escala]=umbral (repetible).")
+    return parser
+
+def main(argv=None) -> int:
+    args = construir_parser().parse_args(argv)
+
+    def informar(clave, medicion):
+        print(f"{clave:32} {_tiempo(medicion['minimo_s']):>12}  {medicion['ns_por_operacion']:12.1f} ns/op",
+              file=sys.stderr)
+
+    try:
+        datos = ejecutar(args.casos, args.escalas, args.repeticiones, informar)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(datos, f, ensure_ascii=False, indent=2)
+    if not args.comparar:
+        return 0
+    with open(args.comparar, encoding="utf-8") as f:
+        referencia = json.load(f)
+    filas = comparar(datos, referencia, args.umbral, dict(args.umbral_caso))
+    for fila in filas:
+        marca = "REGRESIÓN" if fila["regresion"] else "ok"
+        print(f"{fila['caso']:32} {_tiempo(fila['referencia_s']):>12} -> {_tiempo(fila['actual_s']):>12}"
+              f"  {fila['cambio']:+7.1%}  (umbral {fila['umbral']:.0%})  {marca}", file=sys.stderr)
+    return 1 if any(fila["regresion"] for fila in filas) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())